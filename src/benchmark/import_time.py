@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.dirname(SRC_DIR)
+
+# CLIs that drivers launch repeatedly; each is started with --help
+CLIS = (
+    "judge/judge.py",
+    "judge/combine_evaluations.py",
+    "judge/run_benchmark.py",
+    "rubrics_generator/generate_rubrics.py",
+    "rubrics_generator/combine_rubrics.py",
+    "rubrics_generator/assess_rubrics.py",
+)
+
+# Packages that must stay out of startup: they are only needed once a CLI has real work to do
+HEAVY_MODULES = ("tiktoken", "litellm", "pydantic_ai", "pydantic_ai_litellm", "openai", "httpx", "logfire", "sklearn", "networkx")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure CLI startup time and fail if heavy packages are imported before they are needed")
+    parser.add_argument("--clis", default=",".join(CLIS), help="Comma-separated scripts relative to src/ (default: every pipeline CLI)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per CLI; the median wall time is reported (default: 3)")
+    parser.add_argument("--max-seconds", type=float, default=0, help="Also fail when a CLI's median --help time exceeds this; 0 disables (default: 0)")
+    parser.add_argument("--top", type=int, default=5, help="Show this many slowest top-level imports per CLI (default: 5)")
+    parser.add_argument("--output", help="Where to write the JSON report (default: print only)")
+    return parser.parse_args()
+
+def parse_importtime(stderr):
+    """Cumulative microseconds per top-level package from `python -X importtime` output"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+        except ValueError:
+            continue
+        # Nested imports are indented; only top-level ones carry the full cost of their package
+        if not name.startswith("  "):
+            package = name.strip().split(".")[0]
+            packages[package] = packages.get(package, 0) + int(cumulative)
+        else:
+            packages.setdefault(name.strip().split(".")[0], 0)
+    return packages
+
+def measure(cli, repeat):
+    """Median wall time of `cli --help`, plus the packages it imported"""
+    script = os.path.join(SRC_DIR, cli)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")]))}
+    wall_times = []
+    packages = {}
+    returncode = 0
+    for _ in range(repeat):
+        started = time.monotonic()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", script, "--help"],
+            capture_output=True, text=True, env=env, cwd=PROJECT_ROOT,
+        )
+        wall_times.append(time.monotonic() - started)
+        returncode = returncode or process.returncode
+        packages = parse_importtime(process.stderr)
+    return {
+        "cli": cli,
+        "returncode": returncode,
+        "wall_time": statistics.median(wall_times),
+        "heavy_imports": sorted(package for package in HEAVY_MODULES if package in packages),
+        "top_imports": sorted(packages.items(), key=lambda item: -item[1]),
+    }
+
+def main():
+    args = parse_args()
+    results = [measure(cli.strip(), args.repeat) for cli in args.clis.split(",") if cli.strip()]
+
+    failed = False
+    print(f"{'CLI':<45} {'--help':>8}  heavy imports")
+    for result in results:
+        problems = list(result["heavy_imports"])
+        if result["returncode"]:
+            problems.append(f"exit {result['returncode']}")
+        if args.max_seconds and result["wall_time"] > args.max_seconds:
+            problems.append(f"over {args.max_seconds:.2f}s")
+        failed = failed or bool(problems)
+        print(f"{result['cli']:<45} {result['wall_time']:>7.2f}s  {', '.join(problems) or '-'}")
+        for package, cumulative in result["top_imports"][:args.top]:
+            print(f"{'':<47}{package:<28} {cumulative / 1e6:.3f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report saved to: {args.output}")
+
+    if failed:
+        print("Startup check failed: heavy packages imported at startup, a CLI failed or was too slow")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stand-in for the LLM proxy, for throughput benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=4000, help="Port to bind; point BASE_URL at http://host:port/ (default: 4000)")
+    parser.add_argument("--latency", default="lognormal:1.0,0.5", help="Per-request latency in seconds: 'fixed:S', 'uniform:LO,HI', 'exponential:MEAN' or 'lognormal:MEDIAN,SIGMA' (default: lognormal:1.0,0.5)")
+    parser.add_argument("--output-tokens-per-second", type=float, default=0, help="Add completion_tokens / rate to every latency sample; 0 disables (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an injected 429 (default: 0)")
+    parser.add_argument("--rpm", type=int, default=0, help="Answer 429 once more than this many requests arrive within 60s; 0 disables (default: 0)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s (default: 1)")
+    parser.add_argument("--trailing-tokens", type=int, default=0, help="Pad chat answers with this many tokens of prose after the JSON, like a verbose model (default: 0)")
+    parser.add_argument("--positive-rate", type=float, default=0.7, help="Fraction of criteria that get score 1 (default: 0.7)")
+    parser.add_argument("--responses-file", help="JSON list of {\"pattern\": regex, \"content\": str} canned responses, matched against the prompt before the built-in ones")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency sampling and error injection (default: 0)")
+    return parser.parse_args()
+
+class LatencyModel:
+    """Latency distribution parsed from 'kind:params', e.g. 'lognormal:1.0,0.5' (median 1s)"""
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(value) for value in params.split(",") if value.strip()]
+        expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+def count_tokens(text: str) -> int:
+    """Same 4-characters-per-token estimate the LLM layer uses before real usage is known"""
+    return max(1, len(text) // 4)
+
+def stable_fraction(*parts: str) -> float:
+    """Deterministic number in [0, 1) derived from the given strings"""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+class MockLLMServer:
+    """
+    OpenAI-compatible chat completions and embeddings with controllable latency and failures.
+
+    Answers are deterministic: judge prompts get a verdict whose score depends only on the model
+    and criteria text (plus a confidence when the prompt asks for one), batched prompts get one
+    verdict per listed criteria, rubric combination prompts get the largest input set back, and
+    embeddings are hashed bags of words so that similar texts stay similar.
+    """
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        output_tokens_per_second: float = 0,
+        error_rate: float = 0.0,
+        rpm: int = 0,
+        retry_after: float = 1.0,
+        positive_rate: float = 0.7,
+        trailing_tokens: int = 0,
+        responses: Optional[List[Dict[str, str]]] = None,
+        seed: int = 0,
+        embedding_dim: int = 256,
+    ):
+        self.latency = LatencyModel(latency)
+        self.output_tokens_per_second = output_tokens_per_second
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.positive_rate = positive_rate
+        self.trailing_tokens = trailing_tokens
+        self.responses = [(re.compile(entry["pattern"], re.DOTALL), entry["content"]) for entry in responses or []]
+        self.embedding_dim = embedding_dim
+        self.rng = random.Random(seed)
+        self._recent = deque()
+        self.reset()
+
+    def reset(self):
+        """Clear the request statistics"""
+        self.requests = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.streams_cancelled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies: List[float] = []
+        self.first_request_at: Optional[float] = None
+        self.last_response_at: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counts, throughput and latency percentiles since the last reset"""
+        active = (self.last_response_at - self.first_request_at) if self.first_request_at and self.last_response_at else 0.0
+        return {
+            "requests": self.requests,
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "streams_cancelled": self.streams_cancelled,
+            "peak_in_flight": self.peak_in_flight,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "active_seconds": active,
+            "requests_per_second": self.completed / active if active > 0 else 0.0,
+            "latency_mean": sum(self.latencies) / len(self.latencies) if self.latencies else 0.0,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p95": percentile(self.latencies, 95),
+        }
+
+    # --- Responses ---
+    def _verdict(self, model: str, criteria: str, **extra) -> Dict[str, Any]:
+        score = 1 if stable_fraction(model, criteria) < self.positive_rate else 0
+        return {
+            **extra,
+            "criteria": criteria,
+            "score": score,
+            "reasoning": "Mock verdict: criteria is covered" if score else "Mock verdict: criteria is not covered",
+            "evidence": "Mock evidence",
+        }
+
+    def _combined_rubrics(self, prompt: str) -> Dict[str, Any]:
+        start = prompt.find("{", prompt.find("Here are the rubrics to combine:"))
+        end = prompt.find("Please return ONLY")
+        try:
+            rubric_sets = json.loads(prompt[start:prompt.rfind("}", start, end) + 1])
+        except (ValueError, json.JSONDecodeError):
+            return {"rubrics": []}
+        return {"rubrics": max(rubric_sets.values(), key=lambda rubrics: len(json.dumps(rubrics)))}
+
+    def respond(self, model: str, messages: List[Dict[str, Any]]) -> str:
+        """Deterministic assistant content for a chat request"""
+        prompt = message_text(messages[-1]) if messages else ""
+        full_text = "\n".join(message_text(message) for message in messages)
+
+        for pattern, content in self.responses:
+            if pattern.search(full_text):
+                return content
+
+        if '"verdicts"' in prompt:
+            criteria = re.findall(r'^(\d+)\. "(.*)"$', prompt, re.MULTILINE)
+            return json.dumps({"verdicts": [self._verdict(model, text, id=int(number)) for number, text in criteria]})
+        match = re.search(r'Criteria: "(.*)"', prompt)
+        if match:
+            # Cascade prompts ask the judge to rate its certainty as well
+            extra = {"confidence": round(0.3 + 0.7 * stable_fraction(model, match.group(1), "confidence"), 2)} if '"confidence"' in full_text else {}
+            return json.dumps(self._verdict(model, match.group(1), **extra))
+        if "rubrics_set_1" in prompt:
+            return json.dumps(self._combined_rubrics(prompt))
+        return json.dumps({"response": "Mock response"})
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.embedding_dim
+        for token in re.findall(r"[a-z0-9]+", text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "big") % self.embedding_dim] += 1.0 if digest[4] % 2 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    # --- HTTP ---
+    def _rate_limited(self) -> Optional[float]:
+        """Retry-After for a request that should get a 429, or None to serve it"""
+        now = time.monotonic()
+        if self.rpm:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                return max(0.1, 60 - (now - self._recent[0]))
+            self._recent.append(now)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.retry_after
+        return None
+
+    def _admit(self) -> Optional[web.Response]:
+        """Count a new request; returns the 429 to send instead of serving it, if any"""
+        self.requests += 1
+        if self.first_request_at is None:
+            self.first_request_at = time.monotonic()
+        retry_after = self._rate_limited()
+        if retry_after is None:
+            return None
+        self.rate_limited += 1
+        return web.json_response(
+            {"error": {"message": "Rate limit exceeded (mock)", "type": "rate_limit_error", "code": 429}},
+            status=429,
+            headers={"retry-after": f"{retry_after:.3f}"},
+        )
+
+    async def _serve(self, completion_tokens: int, build):
+        rejection = self._admit()
+        if rejection is not None:
+            return rejection
+
+        latency = self.latency.sample(self.rng)
+        if self.output_tokens_per_second > 0:
+            latency += completion_tokens / self.output_tokens_per_second
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        self.latencies.append(latency)
+        self.last_response_at = time.monotonic()
+        return web.json_response(build())
+
+    async def _stream(self, request: web.Request, model: str, content: str, prompt_tokens: int, include_usage: bool):
+        """
+        Send `content` as server-sent events: the first token after a latency sample, then the rest at
+        output_tokens_per_second. A client that hangs up early stops the generation, as real providers do.
+        """
+        rejection = self._admit()
+        if rejection is not None:
+            return rejection
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        chunk_id = f"chatcmpl-mock-{self.requests}"
+        pieces = re.findall(r"\S*\s*", content)[:-1] or [content]
+        sent_tokens = 0
+        started = time.monotonic()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency.sample(self.rng))
+            for piece in pieces:
+                event = {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}],
+                }
+                await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                sent_tokens += count_tokens(piece)
+                if self.output_tokens_per_second > 0:
+                    await asyncio.sleep(count_tokens(piece) / self.output_tokens_per_second)
+            final = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            await response.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+            if include_usage:
+                usage = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model, "choices": [],
+                         "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": sent_tokens, "total_tokens": prompt_tokens + sent_tokens}}
+                await response.write(f"data: {json.dumps(usage)}\n\n".encode("utf-8"))
+            await response.write(b"data: [DONE]\n\n")
+            self.completed += 1
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.streams_cancelled += 1
+        finally:
+            self.in_flight -= 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += sent_tokens
+            self.latencies.append(time.monotonic() - started)
+            self.last_response_at = time.monotonic()
+        return response
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        model = body.get("model", "mock")
+        messages = body.get("messages", [])
+        content = self.respond(model, messages)
+        if self.trailing_tokens and not body.get("tools"):
+            content += "\n\nTo elaborate on this assessment:" + " the documentation was reviewed carefully." * max(1, self.trailing_tokens // 7)
+        if body.get("stream"):
+            prompt_tokens = count_tokens("".join(message_text(message) for message in messages))
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return await self._stream(request, model, content, prompt_tokens, include_usage)
+        prompt_tokens = count_tokens("".join(message_text(message) for message in messages))
+        completion_tokens = count_tokens(content)
+
+        # pydantic_ai asks for structured output through a "final_result" tool
+        output_tool = next(
+            (tool["function"]["name"] for tool in body.get("tools", [])
+             if tool.get("function", {}).get("name", "").startswith("final_result")),
+            None,
+        )
+        message = {"role": "assistant", "content": content}
+        finish_reason = "stop"
+        if output_tool is not None:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{self.requests}",
+                    "type": "function",
+                    "function": {"name": output_tool, "arguments": content},
+                }],
+            }
+            finish_reason = "tool_calls"
+
+        def build():
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            return {
+                "id": f"chatcmpl-mock-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+
+        return await self._serve(completion_tokens, build)
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        prompt_tokens = sum(count_tokens(text) for text in texts)
+
+        def build():
+            self.prompt_tokens += prompt_tokens
+            return {
+                "object": "list",
+                "model": body.get("model", "mock-embedding"),
+                "data": [{"object": "embedding", "index": i, "embedding": self.embed(text)} for i, text in enumerate(texts)],
+                "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+            }
+
+        return await self._serve(0, build)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def post_reset(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({"reset": True})
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=256 * 1024 * 1024)
+        for prefix in ("", "/v1"):
+            app.router.add_post(f"{prefix}/chat/completions", self.chat_completions)
+            app.router.add_post(f"{prefix}/embeddings", self.embeddings)
+        app.router.add_get("/stats", self.get_stats)
+        app.router.add_post("/reset", self.post_reset)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Serve in the running event loop.
+
+        Returns:
+            Tuple of (runner, bound port); call runner.cleanup() to stop. Port 0 picks a free port.
+        """
+        runner = web.AppRunner(self.build_app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        return runner, runner.addresses[0][1]
+
+
+async def main():
+    args = parse_args()
+    responses = None
+    if args.responses_file:
+        with open(args.responses_file, "r") as f:
+            responses = json.load(f)
+
+    server = MockLLMServer(
+        latency=args.latency,
+        output_tokens_per_second=args.output_tokens_per_second,
+        error_rate=args.error_rate,
+        rpm=args.rpm,
+        retry_after=args.retry_after,
+        positive_rate=args.positive_rate,
+        trailing_tokens=args.trailing_tokens,
+        responses=responses,
+        seed=args.seed,
+    )
+    runner, port = await server.start(args.host, args.port)
+    print(f"Mock LLM server listening on http://{args.host}:{port}/ (stats at /stats)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
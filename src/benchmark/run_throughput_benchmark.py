@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from mock_llm_server import MockLLMServer
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.dirname(SRC_DIR)
+STAGES = ("combine_rubrics", "assess_rubrics", "judge")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure pipeline throughput against the offline mock LLM server")
+    parser.add_argument("--repo-name", default="OpenHands", help="Repository under examples/ to run on (default: OpenHands)")
+    parser.add_argument("--reference", default="codewiki", help="Reference documentation folder to judge (default: codewiki)")
+    parser.add_argument("--examples-dir", default=os.path.join(PROJECT_ROOT, "examples"), help="Dataset folder to copy the repository from (default: examples/)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated stages to run, in order (default: {','.join(STAGES)})")
+    parser.add_argument("--models", default="mock-judge", help="Comma-separated judge models; any name works against the mock (default: mock-judge)")
+    parser.add_argument("--judge-args", default="--batch-size 16", help="Extra arguments for judge.py (default: \"--batch-size 16\")")
+    parser.add_argument("--latency", default="lognormal:1.0,0.5", help="Mock latency distribution, see mock_llm_server.py (default: lognormal:1.0,0.5)")
+    parser.add_argument("--output-tokens-per-second", type=float, default=0, help="Mock decode speed; 0 disables (default: 0)")
+    parser.add_argument("--trailing-tokens", type=int, default=0, help="Mock prose after each JSON answer, like a verbose model (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock requests answered with 429 (default: 0)")
+    parser.add_argument("--rpm", type=int, default=0, help="Mock requests-per-minute limit; 0 disables (default: 0)")
+    parser.add_argument("--seed", type=int, default=0, help="Mock random seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=1, help="Run every stage this many times from a fresh copy of the data (default: 1)")
+    parser.add_argument("--output", help="Where to write the JSON report (default: print only)")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the temporary data directory for inspection")
+    return parser.parse_args()
+
+def prepare_data(examples_dir, repo_name, data_dir):
+    """Copy one repository from the dataset without any previous outputs"""
+    shutil.copytree(
+        os.path.join(examples_dir, repo_name),
+        os.path.join(data_dir, repo_name),
+        ignore=shutil.ignore_patterns("evaluation_results", "combined_rubrics.json", "reliability_assessment.json"),
+    )
+    rubrics_dir = os.path.join(data_dir, repo_name, "rubrics")
+    os.makedirs(rubrics_dir, exist_ok=True)
+    # Repositories that ship a single rubrics.json have nothing to combine; use it as the combined set
+    shipped_rubrics = os.path.join(data_dir, repo_name, "rubrics.json")
+    if not os.listdir(rubrics_dir) and os.path.exists(shipped_rubrics):
+        shutil.copy(shipped_rubrics, os.path.join(rubrics_dir, "combined_rubrics.json"))
+
+def stage_command(stage, args, data_dir):
+    """Command line for one pipeline stage, or None if it has nothing to do on this data"""
+    rubrics_dir = os.path.join(data_dir, args.repo_name, "rubrics")
+    if stage == "combine_rubrics":
+        if os.path.exists(os.path.join(rubrics_dir, "combined_rubrics.json")):
+            return None
+        return [sys.executable, os.path.join(SRC_DIR, "rubrics_generator", "combine_rubrics.py"), "--repo-name", args.repo_name]
+    if stage == "assess_rubrics":
+        return [sys.executable, os.path.join(SRC_DIR, "rubrics_generator", "assess_rubrics.py"), "--repo-name", args.repo_name]
+    if stage == "judge":
+        return [
+            sys.executable, os.path.join(SRC_DIR, "judge", "judge.py"),
+            "--repo-name", args.repo_name, "--reference", args.reference, "--models", args.models,
+        ] + args.judge_args.split()
+    raise ValueError(f"Unknown stage: {stage}")
+
+async def run_stage(stage, command, env, log_path):
+    """Run one stage as a subprocess, logging its output; returns (exit code, wall time)"""
+    started = time.monotonic()
+    with open(log_path, "w") as log:
+        process = await asyncio.create_subprocess_exec(*command, stdout=log, stderr=asyncio.subprocess.STDOUT, env=env, cwd=PROJECT_ROOT)
+        returncode = await process.wait()
+    return returncode, time.monotonic() - started
+
+async def run(args):
+    server = MockLLMServer(
+        latency=args.latency,
+        output_tokens_per_second=args.output_tokens_per_second,
+        error_rate=args.error_rate,
+        rpm=args.rpm,
+        trailing_tokens=args.trailing_tokens,
+        seed=args.seed,
+    )
+    runner, port = await server.start()
+    base_url = f"http://127.0.0.1:{port}/"
+    print(f"Mock LLM server on {base_url} (latency {args.latency}, error rate {args.error_rate}, rpm {args.rpm or 'unlimited'})")
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="codewikibench-throughput-")
+    try:
+        for iteration in range(args.repeat):
+            data_dir = os.path.join(work_dir, f"run-{iteration}")
+            prepare_data(args.examples_dir, args.repo_name, data_dir)
+            env = {
+                **os.environ,
+                "BASE_URL": base_url,
+                "API_KEY": "mock",
+                "DATA_DIR": data_dir,
+                # assess_rubrics.py imports config/utils without adjusting sys.path itself
+                "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])),
+                "LLM_CACHE_MODE": "off",
+                "LLM_EMBEDDING_CACHE": "false",
+                "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+            }
+
+            for stage in stages:
+                command = stage_command(stage, args, data_dir)
+                if command is None:
+                    print(f"[{iteration}] {stage}: skipped (nothing to do)")
+                    continue
+
+                server.reset()
+                log_path = os.path.join(work_dir, f"run-{iteration}-{stage}.log")
+                returncode, wall_time = await run_stage(stage, command, env, log_path)
+                stats = server.stats()
+                results.append({"iteration": iteration, "stage": stage, "returncode": returncode, "wall_time": wall_time,
+                                "requests_per_wall_second": stats["completed"] / wall_time if wall_time else 0.0, "log": log_path, **stats})
+
+                status = "ok" if returncode == 0 else f"FAILED (exit {returncode}, see {log_path})"
+                print(
+                    f"[{iteration}] {stage}: {status} - wall {wall_time:.1f}s, {stats['completed']} requests "
+                    f"({stats['rate_limited']} 429s), {stats['requests_per_second']:.2f} req/s, "
+                    f"latency p50 {stats['latency_p50']:.2f}s p95 {stats['latency_p95']:.2f}s, peak in flight {stats['peak_in_flight']}"
+                )
+    finally:
+        await runner.cleanup()
+        if not args.keep_data:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            print(f"Data and logs kept in: {work_dir}")
+
+    report = {
+        "repo_name": args.repo_name,
+        "reference": args.reference,
+        "models": args.models,
+        "judge_args": args.judge_args,
+        "mock": {"latency": args.latency, "error_rate": args.error_rate, "rpm": args.rpm, "trailing_tokens": args.trailing_tokens, "seed": args.seed},
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run(args))
@@ -1,7 +1,14 @@
 import os
+import json
 from pathlib import Path
 from dotenv import load_dotenv
 
+# logfire registers a pydantic plugin that imports all of logfire when the first model class is
+# defined, which dominates CLI startup. It only records anything when LOGFIRE_PYDANTIC_PLUGIN_RECORD
+# is set, so it is skipped otherwise (import config before any module that defines pydantic models)
+if not os.getenv("LOGFIRE_PYDANTIC_PLUGIN_RECORD"):
+    os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "logfire-plugin")
+
 # Project root detection - find the directory containing this config file's parent
 PROJECT_ROOT = Path(__file__).parent.parent.absolute()
 
@@ -20,20 +27,25 @@ for env_path in possible_env_locations:
 
 if env_file:
     load_dotenv(env_file)
-    print(f"Loaded .env from: {env_file}")
 else:
-    print(f"Warning: No .env file found. Searched in: {[str(p) for p in possible_env_locations]}")
     load_dotenv()  # Try default behavior as fallback
 
 # Common data paths relative to project root
-DATA_DIR = PROJECT_ROOT / "data"
+DATA_DIR = Path(os.getenv("DATA_DIR", PROJECT_ROOT / "data"))
 SRC_DIR = PROJECT_ROOT / "src"
 
 API_KEY = os.getenv("API_KEY", "sk-1234")
 MODEL = os.getenv("MODEL", "claude-sonnet-4")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "gemini-embedding-001")
 BASE_URL = os.getenv("BASE_URL", "http://localhost:4000/")
-print(f"Using MODEL: {MODEL}, BASE_URL: {BASE_URL}")
+
+def print_settings():
+    """Report the .env file and the default model/endpoint; called by the CLIs that call LLMs once their arguments are parsed"""
+    if env_file:
+        print(f"Loaded .env from: {env_file}")
+    else:
+        print(f"Warning: No .env file found. Searched in: {[str(p) for p in possible_env_locations]}")
+    print(f"Using MODEL: {MODEL}, BASE_URL: {BASE_URL}")
 
 def get_project_path(*paths):
     """Get a path relative to the project root"""
@@ -46,5 +58,59 @@ def get_data_path(*paths):
 # max tokens per tool response
 MAX_TOKENS_PER_TOOL_RESPONSE = 36_000
 
+# Rate limits shared by every LLM call in the process (0 disables a budget).
+# LLM_RATE_LIMITS overrides them per model or provider prefix as JSON,
+# e.g. '{"gemini": {"rpm": 300, "tpm": 1000000}, "kimi-k2-instruct": {"rpm": 60}}'
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))
+LLM_RATE_LIMITS = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+# Maximum LLM requests in flight across the whole process (0 = unlimited); per model or provider
+# caps go into LLM_RATE_LIMITS as "in_flight", e.g. '{"gemini": {"rpm": 300, "in_flight": 8}}'
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "0"))
+LLM_MAX_RATE_LIMIT_RETRIES = int(os.getenv("LLM_MAX_RATE_LIMIT_RETRIES", "5"))
+
+# Pooled HTTP connections reused by every call to the same endpoint (0 = no limit on the pool size)
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "200"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "100"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "600"))
+LLM_HTTP_CONNECT_TIMEOUT = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "10"))
+
+# Several endpoints (proxies or providers with their own keys) for the same models, as JSON; requests
+# are spread by weight and fail over to another endpoint on 429s, server errors and lost connections, e.g.
+# '[{"base_url": "http://proxy-a:4000/", "api_key_env": "PROXY_A_KEY", "weight": 2}, {"base_url": "http://proxy-b:4000/"}]'
+# An endpoint failing LLM_ENDPOINT_EJECT_AFTER times in a row is skipped for LLM_ENDPOINT_EJECT_SECONDS (doubling)
+LLM_ENDPOINTS = json.loads(os.getenv("LLM_ENDPOINTS", "[]"))
+LLM_ENDPOINT_EJECT_AFTER = int(os.getenv("LLM_ENDPOINT_EJECT_AFTER", "3"))
+LLM_ENDPOINT_EJECT_SECONDS = float(os.getenv("LLM_ENDPOINT_EJECT_SECONDS", "30"))
+
+# Hedging: a request still unanswered after the LLM_HEDGE_PERCENTILE-th latency seen for its model
+# (at least LLM_HEDGE_MIN_DELAY seconds) is sent again, at most for LLM_HEDGE_MAX_FRACTION of calls
+# (0 disables). LLM_HEDGE_ALTERNATES sends the copy to another model, e.g. '{"kimi-k2-instruct": "gpt-4.1"}'
+LLM_HEDGE_MAX_FRACTION = float(os.getenv("LLM_HEDGE_MAX_FRACTION", "0"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))
+LLM_HEDGE_ALTERNATES = json.loads(os.getenv("LLM_HEDGE_ALTERNATES", "{}"))
+
+# Ask for JSON mode (response_format) on judge calls; models that reject it fall back automatically
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")
+
+# Stream native judge calls and stop reading as soon as a valid verdict has arrived
+LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() in ("1", "true", "yes")
+
+# Persistent LLM response cache: "off", "read_write" or "read_only"
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "llm_responses"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(2 * 1024**3)))
 
+# Embeddings: inputs are sent in chunks of LLM_EMBEDDING_BATCH_SIZE texts (the provider's batch limit),
+# LLM_EMBEDDING_CONCURRENCY chunks at a time, and vectors are kept on disk keyed by model and text hash
+LLM_EMBEDDING_BATCH_SIZE = int(os.getenv("LLM_EMBEDDING_BATCH_SIZE", "100"))
+LLM_EMBEDDING_CONCURRENCY = int(os.getenv("LLM_EMBEDDING_CONCURRENCY", "4"))
+LLM_EMBEDDING_CACHE = os.getenv("LLM_EMBEDDING_CACHE", "true").lower() in ("1", "true", "yes")
+LLM_EMBEDDING_CACHE_DIR = os.getenv("LLM_EMBEDDING_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "embeddings"))
 
+# Token prices in USD per million tokens, keyed by model name (or "default"), as JSON,
+# e.g. '{"default": {"input": 3, "output": 15}, "gpt-4.1-mini": {"input": 0.4, "output": 1.6}}'
+LLM_PRICES = json.loads(os.getenv("LLM_PRICES", "{}"))
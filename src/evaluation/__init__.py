@@ -0,0 +1,65 @@
+from .anytime import RunningScore, effective_weights
+from .budget import (
+    AgentBudget,
+    AgentBudgetExceeded,
+    BudgetTracker,
+    charge_docs_lookup,
+    configure_agent_budget,
+    current_budget,
+    get_agent_budget,
+    track_agent_budget,
+)
+from .checkpoint import EvaluationCheckpoint
+from .provenance import DocsProvenance, merge_provenance, record_docs_fetch, track_docs_fetches
+from .retrieval import BM25Index, DocsRetriever, collect_doc_sections, docs_skeleton
+from .sampling import StratifiedSample
+from .scheduler import SlidingWindowScheduler, TaskTiming
+from .triage import TRIAGE_MODES, LeafTriage, TriageDecision
+from .verdicts import (
+    JSON_OBJECT_RESPONSE_FORMAT,
+    BatchedVerdict,
+    BatchedVerdicts,
+    Verdict,
+    batched_verdicts_complete,
+    is_complete_verdict,
+    parse_batched_verdicts,
+    parse_verdict,
+    repair_json,
+)
+
+__all__ = [
+    "AgentBudget",
+    "AgentBudgetExceeded",
+    "BM25Index",
+    "BatchedVerdict",
+    "BatchedVerdicts",
+    "BudgetTracker",
+    "DocsProvenance",
+    "DocsRetriever",
+    "EvaluationCheckpoint",
+    "JSON_OBJECT_RESPONSE_FORMAT",
+    "LeafTriage",
+    "RunningScore",
+    "SlidingWindowScheduler",
+    "StratifiedSample",
+    "TRIAGE_MODES",
+    "TaskTiming",
+    "TriageDecision",
+    "Verdict",
+    "batched_verdicts_complete",
+    "charge_docs_lookup",
+    "collect_doc_sections",
+    "configure_agent_budget",
+    "current_budget",
+    "docs_skeleton",
+    "effective_weights",
+    "get_agent_budget",
+    "is_complete_verdict",
+    "merge_provenance",
+    "parse_batched_verdicts",
+    "parse_verdict",
+    "record_docs_fetch",
+    "repair_json",
+    "track_agent_budget",
+    "track_docs_fetches",
+]
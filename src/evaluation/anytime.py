@@ -0,0 +1,117 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+
+def effective_weights(rubrics: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Share of the overall score carried by each leaf: the product of its normalised weights along the path.
+
+    Matches `calculate_scores_bottom_up`, where every parent is the weighted average of its children
+    and the overall score the weighted average of the top-level items, so the overall score equals
+    the sum of leaf score times effective weight.
+    """
+    weights = {}
+
+    def traverse(items, path, share):
+        total = sum(item["weight"] for item in items)
+        for i, item in enumerate(items):
+            current_path = f"{path}.{i}" if path else str(i)
+            item_share = share * item["weight"] / total if total > 0 else 0.0
+            if item.get("sub_tasks"):
+                traverse(item["sub_tasks"], current_path, item_share)
+            else:
+                weights[current_path] = item_share
+
+    traverse(rubrics, "", 1.0)
+    return weights
+
+
+class RunningScore:
+    """
+    Overall score of a judge run while its leaves are still being evaluated.
+
+    With leaf scores in [0, 1], the exact overall score lies between `lower` (every unevaluated leaf
+    scores 0) and `upper` (every one scores 1); the gap is the unevaluated weight mass. `estimate`
+    extrapolates the evaluated leaves' weighted mean to the rest. When a `path` is given, every
+    update is published there as JSON, so progress can be read mid-run.
+    """
+
+    def __init__(self, weights: Dict[str, float], path: Optional[str] = None):
+        """
+        Args:
+            weights: Effective weight of every leaf path (see `effective_weights`)
+            path: JSON file the running score is written to after each update
+        """
+        self.weights = weights
+        self.path = path
+        self.total_mass = sum(weights.values())
+        self.scores: Dict[str, float] = {}
+        self.scored_mass = 0.0      # sum of effective weight times score over evaluated leaves
+        self.evaluated_mass = 0.0
+
+    def record(self, path: str, score: float):
+        """Add (or replace) the score of one leaf"""
+        weight = self.weights.get(path, 0.0)
+        if path in self.scores:
+            self.scored_mass -= weight * self.scores[path]
+            self.evaluated_mass -= weight
+        score = min(1.0, max(0.0, float(score)))
+        self.scores[path] = score
+        self.scored_mass += weight * score
+        self.evaluated_mass += weight
+
+    @property
+    def remaining_mass(self) -> float:
+        return max(0.0, self.total_mass - self.evaluated_mass)
+
+    @property
+    def lower(self) -> float:
+        return self.scored_mass
+
+    @property
+    def upper(self) -> float:
+        return self.scored_mass + self.remaining_mass
+
+    @property
+    def width(self) -> float:
+        return self.upper - self.lower
+
+    @property
+    def estimate(self) -> Optional[float]:
+        """Weighted mean of the evaluated leaves, or None before the first one"""
+        if self.evaluated_mass <= 0:
+            return None
+        return self.scored_mass / self.evaluated_mass
+
+    def settled(self, tolerance: Optional[float]) -> bool:
+        """Whether the bounds are within `tolerance` of each other (never without a tolerance)"""
+        return tolerance is not None and self.width <= tolerance
+
+    def order(self, leaves: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Leaves sorted by effective weight, largest first (rubric order among equals)"""
+        return sorted(leaves, key=lambda leaf: -self.weights.get(leaf["path"], 0.0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "estimate": self.estimate,
+            "lower": self.lower,
+            "upper": self.upper,
+            "evaluated_leaves": len(self.scores),
+            "total_leaves": len(self.weights),
+            "evaluated_weight": self.evaluated_mass,
+        }
+
+    def describe(self) -> str:
+        estimate = f"{self.estimate:.3f}" if self.estimate is not None else "-"
+        return f"score {estimate} in [{self.lower:.3f}, {self.upper:.3f}]"
+
+    def publish(self):
+        """Write the snapshot to `path` atomically, so readers never see a partial file"""
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temporary, self.path)
@@ -0,0 +1,154 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+LAST_LOOKUP_NOTE = (
+    "\nThis was your last documentation lookup for these criteria: "
+    "respond with your final verdict now, based on what you have read."
+)
+
+
+class AgentBudgetExceeded(Exception):
+    """Raised inside a tool-using judge run once its per-leaf budget is used up"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Agent budget exhausted: {reason}")
+        self.reason = reason
+
+
+@dataclass
+class AgentBudget:
+    """Per-leaf limits of a tool-using judge run; a limit of None is not enforced"""
+    max_tool_calls: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+    def scaled(self, leaves: int) -> "AgentBudget":
+        """Budget of one prompt that judges `leaves` criteria at once"""
+        leaves = max(1, leaves)
+        return AgentBudget(
+            self.max_tool_calls * leaves if self.max_tool_calls is not None else None,
+            self.max_tokens * leaves if self.max_tokens is not None else None,
+            self.max_seconds * leaves if self.max_seconds is not None else None,
+        )
+
+
+class BudgetTracker:
+    """
+    What one tool-using judge run has spent so far against its budget.
+
+    Tool calls are charged by the docs_navigator tool through `charge_docs_lookup`; tokens are read
+    from the usage_scope of the run, so they are checked between agent steps; wall time is enforced
+    by the caller. The tool result of the last allowed lookup asks the agent to answer; any lookup
+    after that (or once tokens or time ran out) raises AgentBudgetExceeded, and the caller forces a
+    final verdict from the sections in `paths`.
+    """
+
+    def __init__(self, budget: AgentBudget, usage):
+        """
+        Args:
+            budget: Limits of this run
+            usage: Usage collected by the usage_scope around the run
+        """
+        self.budget = budget
+        self.usage = usage
+        self.started = time.monotonic()
+        self.tool_calls = 0
+        self.paths: List[list] = []
+        self.exhausted: Optional[str] = None
+        self.forced = False
+
+    @property
+    def tokens(self) -> int:
+        return self.usage.input_tokens + self.usage.output_tokens
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def remaining_seconds(self) -> Optional[float]:
+        if self.budget.max_seconds is None:
+            return None
+        return max(0.0, self.budget.max_seconds - self.elapsed)
+
+    def exceed(self, reason: str):
+        self.exhausted = reason
+        raise AgentBudgetExceeded(reason)
+
+    def charge(self, paths: List[list]) -> Optional[str]:
+        """Charge one docs lookup of `paths`; returns a note for the tool result when it is the last one allowed"""
+        budget = self.budget
+        if budget.max_tool_calls is not None and self.tool_calls >= budget.max_tool_calls:
+            self.exceed(f"{budget.max_tool_calls} tool calls")
+        if budget.max_tokens is not None and self.tokens >= budget.max_tokens:
+            self.exceed(f"{budget.max_tokens} tokens")
+        if budget.max_seconds is not None and self.elapsed >= budget.max_seconds:
+            self.exceed(f"{budget.max_seconds:g}s")
+        self.tool_calls += 1
+        self.paths.extend(list(path) for path in paths)
+        if budget.max_tool_calls is not None and self.tool_calls >= budget.max_tool_calls:
+            return LAST_LOOKUP_NOTE
+        return None
+
+    def report(self) -> Dict[str, Any]:
+        """Budget usage recorded in the leaf evaluation"""
+        return {
+            "tool_calls": self.tool_calls,
+            "tokens": self.tokens,
+            "seconds": round(self.elapsed, 3),
+            "limits": asdict(self.budget),
+            "exhausted": self.exhausted,
+            "forced_verdict": self.forced,
+        }
+
+
+_active_tracker: ContextVar[Optional[BudgetTracker]] = ContextVar("agent_budget", default=None)
+_shared_budget: Optional[AgentBudget] = None
+
+
+def configure_agent_budget(max_tool_calls: Optional[int] = None, max_tokens: Optional[int] = None, max_seconds: Optional[float] = None) -> Optional[AgentBudget]:
+    """Set the per-leaf budget of tool-using judge runs for this process (e.g. from CLI flags); None when no limit is set"""
+    global _shared_budget
+    for name, value in (("tool calls", max_tool_calls), ("tokens", max_tokens), ("seconds", max_seconds)):
+        if value is not None and value <= 0:
+            raise ValueError(f"Invalid agent budget for {name}: {value} (expected more than 0)")
+    if max_tool_calls is None and max_tokens is None and max_seconds is None:
+        _shared_budget = None
+    else:
+        _shared_budget = AgentBudget(max_tool_calls, max_tokens, max_seconds)
+    return _shared_budget
+
+
+def get_agent_budget() -> Optional[AgentBudget]:
+    """Per-leaf budget set by configure_agent_budget, or None when tool runs are unbounded"""
+    return _shared_budget
+
+
+@contextmanager
+def track_agent_budget(budget: Optional[AgentBudget], usage, leaves: int = 1) -> Iterator[Optional[BudgetTracker]]:
+    """Enforce `budget`, scaled to `leaves` criteria, on the tool-using run inside the block; yields None without a budget"""
+    if budget is None:
+        yield None
+        return
+    tracker = BudgetTracker(budget.scaled(leaves), usage)
+    token = _active_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _active_tracker.reset(token)
+
+
+def current_budget() -> Optional[BudgetTracker]:
+    """Tracker of the run in progress, if it has a budget"""
+    return _active_tracker.get()
+
+
+def charge_docs_lookup(paths: List[list]) -> Optional[str]:
+    """Charge a docs_navigator call to the current run's budget (no-op outside track_agent_budget)"""
+    tracker = _active_tracker.get()
+    if tracker is None:
+        return None
+    return tracker.charge(paths)
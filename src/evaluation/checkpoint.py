@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+class EvaluationCheckpoint:
+    """
+    Append-only JSONL log of leaf evaluations for one judge run.
+
+    Every completed leaf is written as one line `{"path", "requirement", "evaluation"}` and
+    flushed immediately, so an interrupted run loses at most the leaves that were in flight.
+    When a path appears more than once (e.g. after a retry), the last line wins.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the .jsonl checkpoint file (created on first append)
+        """
+        self.path = path
+
+    def load(self, leaf_requirements: Optional[list] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Read all checkpointed evaluations.
+
+        Args:
+            leaf_requirements: If given, only keep entries whose path still exists with the same
+                requirement text, so a checkpoint from an edited rubric is not reused blindly
+
+        Returns:
+            Mapping from leaf path to its latest evaluation
+        """
+        evaluations = {}
+        if not os.path.exists(self.path):
+            return evaluations
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                evaluations[record["path"]] = record
+
+        if leaf_requirements is not None:
+            requirements = {leaf["path"]: leaf["requirement"] for leaf in leaf_requirements}
+            evaluations = {
+                path: record for path, record in evaluations.items()
+                if requirements.get(path) == record.get("requirement")
+            }
+
+        return {path: record["evaluation"] for path, record in evaluations.items()}
+
+    def append(self, leaf: Dict[str, Any], evaluation: Dict[str, Any]):
+        """Durably record the evaluation of one leaf"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        record = {"path": leaf["path"], "requirement": leaf["requirement"], "evaluation": evaluation}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,111 @@
+import ast
+import hashlib
+import json
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+_docs_fetches: ContextVar[Optional[List[list]]] = ContextVar("docs_fetches", default=None)
+
+# Navigator-style paths quoted in free-text evidence, e.g. ['subpages', 2, 'content', 'Setup']
+_PATH_PATTERN = re.compile(r"\[\s*['\"]subpages['\"][^\[\]]*\]")
+
+
+def content_hash(value: Any) -> str:
+    """Stable short hash of a JSON-serialisable value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def record_docs_fetch(path: List[Any]):
+    """Note that the current judge call read the docs section at `path` (no-op outside track_docs_fetches)"""
+    fetches = _docs_fetches.get()
+    if fetches is not None:
+        fetches.append(list(path))
+
+
+@contextmanager
+def track_docs_fetches(fetches: Optional[List[list]] = None) -> Iterator[List[list]]:
+    """Collect every docs path read by the navigator tool or the retriever while the block runs"""
+    fetches = [] if fetches is None else fetches
+    token = _docs_fetches.set(fetches)
+    try:
+        yield fetches
+    finally:
+        _docs_fetches.reset(token)
+
+
+def evidence_paths(evidence: Any) -> List[list]:
+    """Docs paths quoted in a verdict's evidence text"""
+    paths = []
+    for match in _PATH_PATTERN.findall(str(evidence or "")):
+        try:
+            path = ast.literal_eval(match)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(path, list):
+            paths.append(path)
+    return paths
+
+
+class DocsProvenance:
+    """
+    Content hashes of the documentation inputs behind each leaf verdict.
+
+    A verdict depends on the documentation context embedded in its prompt (the full tree, or the
+    skeleton when retrieval is on) and on every section it read: navigator fetches, retrieved
+    sections and paths quoted in the evidence. When the docs are regenerated, a verdict whose
+    hashes all still match can be carried forward instead of being judged again.
+    """
+
+    def __init__(self, docs_tree: Dict[str, Any], structured_docs: Dict[str, Any], prompt_context: Any = None):
+        """
+        Args:
+            docs_tree: Tree embedded in judge prompts
+            structured_docs: Full documentation the section paths point into
+            prompt_context: What the prompts embed instead of the full tree (e.g. the retriever skeleton)
+        """
+        self.structured_docs = structured_docs
+        self.context_hash = content_hash(docs_tree if prompt_context is None else prompt_context)
+        self._section_hashes: Dict[str, Optional[str]] = {}
+
+    def section_hash(self, path: List[Any]) -> Optional[str]:
+        """Hash of the section at `path`, or None if the path does not exist in these docs"""
+        key = json.dumps(path)
+        if key not in self._section_hashes:
+            node = self.structured_docs
+            try:
+                for step in path:
+                    node = node[int(step)] if isinstance(node, list) else node[step]
+                self._section_hashes[key] = content_hash(node)
+            except (KeyError, IndexError, TypeError, ValueError):
+                self._section_hashes[key] = None
+        return self._section_hashes[key]
+
+    def record(self, fetched_paths: List[list], evidence: Any = None) -> Dict[str, Any]:
+        """Provenance entry stored with a verdict"""
+        paths = list(fetched_paths) + evidence_paths(evidence)
+        return {
+            "context": self.context_hash,
+            "sections": {json.dumps(path): self.section_hash(path) for path in paths},
+        }
+
+    def is_current(self, provenance: Optional[Dict[str, Any]]) -> bool:
+        """Whether every input recorded in `provenance` is unchanged in these docs"""
+        if not provenance or provenance.get("context") != self.context_hash:
+            return False
+        return all(
+            self.section_hash(json.loads(path)) == section_hash
+            for path, section_hash in provenance.get("sections", {}).items()
+        )
+
+
+def merge_provenance(entries: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Combine the provenance of several verdicts that were merged into one (e.g. an ensemble)"""
+    entries = [entry for entry in entries if entry]
+    if not entries:
+        return None
+    sections = {}
+    for entry in entries:
+        sections.update(entry.get("sections", {}))
+    return {"context": entries[0]["context"], "sections": sections}
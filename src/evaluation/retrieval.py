@@ -0,0 +1,195 @@
+import json
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .provenance import record_docs_fetch
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "into", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "this", "to", "via", "what", "when", "which",
+    "with", "within", "without",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, used for both documents and queries"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS and len(token) > 1]
+
+
+def flatten_text(value: Any) -> str:
+    """Concatenate every string inside a (possibly nested) content value"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return "\n".join(f"{key}\n{flatten_text(item)}" for key, item in value.items())
+    if isinstance(value, list):
+        return "\n".join(flatten_text(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def collect_doc_sections(structured_docs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Split structured_docs.json into retrievable sections.
+
+    Each section is a content entry of a page, addressed with the same path the `docs_navigator`
+    tool understands (e.g. ['subpages', 2, 'content', 'Usage', 'Install']).
+    """
+    sections = []
+
+    def add_section(path, titles, value):
+        text = flatten_text(value)
+        if text.strip():
+            sections.append({"path": path, "title": " > ".join(titles), "text": text})
+
+    def walk_content(node, path, titles):
+        for key, value in node.items():
+            if isinstance(value, dict) and value:
+                walk_content(value, path + [key], titles + [key])
+            else:
+                add_section(path + [key], titles + [key], value)
+
+    def walk_page(page, path, titles):
+        title = page.get("title")
+        page_titles = titles + [str(title)] if path and title else titles
+        content = page.get("content")
+        if isinstance(content, dict) and content:
+            walk_content(content, path + ["content"], page_titles)
+        elif isinstance(content, (str, list)) and content:
+            add_section(path + ["content"], page_titles, content)
+        for i, subpage in enumerate(page.get("subpages") or []):
+            walk_page(subpage, path + ["subpages", i], page_titles)
+
+    walk_page(structured_docs, [], [])
+    return sections
+
+
+def docs_skeleton(docs_tree: Dict[str, Any], include_headings: bool = False) -> Dict[str, Any]:
+    """
+    Compact outline of the docs tree with page titles only (optionally their top-level headings).
+
+    Page paths follow the nesting: the i-th entry of a page's "subpages" lives at [..., 'subpages', i].
+    """
+
+    def outline(page):
+        entry = {"title": page.get("title")}
+        if include_headings and isinstance(page.get("content"), dict) and page["content"]:
+            entry["sections"] = list(page["content"].keys())
+        subpages = [outline(subpage) for subpage in page.get("subpages") or []]
+        if subpages:
+            entry["subpages"] = subpages
+        return entry
+
+    return outline(docs_tree)
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents"""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(document)) for document in documents]
+        self.doc_lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+        document_freqs = Counter()
+        for tf in self.term_freqs:
+            document_freqs.update(tf.keys())
+        num_docs = len(documents)
+        self.idf = {
+            term: math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            for term, df in document_freqs.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """BM25 score of every document for `query`"""
+        query_terms = set(tokenize(query))
+        results = []
+        for tf, length in zip(self.term_freqs, self.doc_lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            for term in query_terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+
+class DocsRetriever:
+    """
+    Rank documentation sections against a criteria and build a narrowed judge context.
+
+    Ranking uses BM25 over the sections of structured_docs.json; after `prepare_embeddings`,
+    BM25 scores (normalised per query) are blended with embedding cosine similarity.
+    """
+
+    def __init__(self, docs_tree: Dict[str, Any], structured_docs: Dict[str, Any], top_k: int = 5, embedding_weight: float = 0.5):
+        """
+        Args:
+            docs_tree: Parsed docs_tree.json, used for the skeleton of the remaining docs
+            structured_docs: Parsed structured_docs.json, the source of section contents
+            top_k: Number of sections kept per criteria
+            embedding_weight: Share of the embedding similarity in the hybrid score
+        """
+        self.top_k = top_k
+        self.sections = collect_doc_sections(structured_docs)
+        self.index = BM25Index([f"{section['title']}\n{section['text']}" for section in self.sections])
+        self.skeleton = docs_skeleton(docs_tree)
+        self.embedding_weight = embedding_weight
+        self.section_embeddings = None
+
+    async def prepare_embeddings(self, max_chars: int = 4000):
+        """Embed every section once so later rankings can blend in semantic similarity"""
+        import numpy as np
+        from utils import embed_texts
+
+        # The embedding service splits the sections into provider-sized chunks and caches them on disk
+        matrix = await embed_texts([f"{section['title']}\n{section['text']}"[:max_chars] for section in self.sections])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.section_embeddings = matrix / np.maximum(norms, 1e-12)
+
+    async def rank(self, query: str) -> List[float]:
+        """Relevance of every section for `query` (BM25, optionally blended with embeddings)"""
+        scores = self.index.scores(query)
+        if self.section_embeddings is None:
+            return scores
+
+        import numpy as np
+        from utils import embed_texts
+
+        best = max(scores) if scores else 0.0
+        lexical = np.asarray(scores, dtype=np.float32) / best if best > 0 else np.zeros(len(scores), dtype=np.float32)
+        query_vector = (await embed_texts([query]))[0]
+        query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+        semantic = self.section_embeddings @ query_vector
+        return list((1 - self.embedding_weight) * lexical + self.embedding_weight * semantic)
+
+    async def top_sections(self, queries: List[str], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Union of the top_k sections of each query, best first"""
+        top_k = top_k or self.top_k
+        best_scores = {}
+        for query in queries:
+            scores = await self.rank(query)
+            ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
+            for i in ranked:
+                if scores[i] > 0:
+                    best_scores[i] = max(best_scores.get(i, 0.0), float(scores[i]))
+        ordered = sorted(best_scores, key=lambda i: best_scores[i], reverse=True)
+        return [self.sections[i] for i in ordered]
+
+    async def render_context(self, queries: List[str], top_k: Optional[int] = None) -> str:
+        """JSON block with the most relevant sections in full plus a compact skeleton of the whole tree"""
+        relevant = []
+        for section in await self.top_sections(queries, top_k):
+            record_docs_fetch(section["path"])
+            relevant.append({"path": json.dumps(section["path"]), "title": section["title"], "content": section["text"]})
+        return (
+            "Relevant documentation sections (most relevant first):\n"
+            f"```json\n{json.dumps(relevant, indent=2, ensure_ascii=False)}\n```\n\n"
+            "Skeleton of the complete documentation tree (the i-th entry of a page's subpages is at [..., 'subpages', i]):\n"
+            f"```json\n{json.dumps(self.skeleton, separators=(',', ':'), ensure_ascii=False)}\n```"
+        )
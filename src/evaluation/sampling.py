@@ -0,0 +1,152 @@
+import math
+import random
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Dict, List
+
+
+@dataclass
+class Stratum:
+    """Leaves of one top-level rubric item and the ones drawn from it"""
+    name: str
+    paths: List[str]                                   # every leaf, heaviest first
+    weight: float                                      # total effective weight of the leaves
+    sampled: List[str] = field(default_factory=list)
+
+
+def _allocate(strata: List[Stratum], sample_size: int, min_per_stratum: int) -> Dict[str, int]:
+    """Sample size of each stratum: proportional to its weight (largest remainder), at least min_per_stratum"""
+    sizes = {stratum.name: min(len(stratum.paths), min_per_stratum) for stratum in strata}
+    remaining = sample_size - sum(sizes.values())
+    total_weight = sum(stratum.weight for stratum in strata)
+    if remaining <= 0 or total_weight <= 0:
+        return sizes
+
+    quotas = {stratum.name: remaining * stratum.weight / total_weight for stratum in strata}
+    for stratum in strata:
+        sizes[stratum.name] = min(len(stratum.paths), sizes[stratum.name] + int(quotas[stratum.name]))
+    # Hand out what is left by largest remainder, skipping strata that are already fully sampled
+    by_remainder = sorted(strata, key=lambda stratum: -(quotas[stratum.name] % 1))
+    while sum(sizes.values()) < sample_size:
+        open_strata = [stratum for stratum in by_remainder if sizes[stratum.name] < len(stratum.paths)]
+        if not open_strata:
+            break
+        for stratum in open_strata:
+            if sum(sizes.values()) >= sample_size:
+                break
+            sizes[stratum.name] += 1
+    return sizes
+
+
+class StratifiedSample:
+    """
+    Stratified sample of rubric leaves and a confidence interval for the overall score it implies.
+
+    Strata are the top-level rubric items. Each gets a share of the sample proportional to its
+    weight in the overall score (at least `min_per_stratum` leaves, so its variance can be
+    estimated). Within a stratum, leaves are drawn systematically from the list sorted by effective
+    weight, so heavy and light leaves are both represented.
+
+    The estimate is a ratio estimator per stratum: the stratum's known weight times the weighted
+    mean score of its sampled leaves. Summed over strata, it reproduces `calculate_scores_bottom_up`
+    exactly once every leaf is sampled. The interval uses the linearised variance of the ratio
+    estimator, with the finite population correction and a binomial floor for small strata.
+    """
+
+    def __init__(self, leaf_requirements: List[Dict[str, Any]], weights: Dict[str, float], fraction: float, seed: int = 0, min_per_stratum: int = 2):
+        """
+        Args:
+            leaf_requirements: Leaves as returned by collect_leaf_requirements
+            weights: Effective weight of every leaf path (see `effective_weights`)
+            fraction: Share of the leaves to sample, in (0, 1]
+            seed: Seed of the random starts, so a sample can be drawn again
+            min_per_stratum: Smallest number of leaves drawn from every top-level item that has them
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError(f"Invalid sample fraction: {fraction} (expected more than 0, at most 1)")
+        self.fraction = fraction
+        self.seed = seed
+        self.weights = weights
+        self.leaves_by_path = {leaf["path"]: leaf for leaf in leaf_requirements}
+
+        by_top_level: Dict[str, List[str]] = {}
+        for leaf in leaf_requirements:
+            by_top_level.setdefault(leaf["path"].split(".")[0], []).append(leaf["path"])
+        self.strata = [
+            Stratum(name, sorted(paths, key=lambda path: -weights.get(path, 0.0)), sum(weights.get(path, 0.0) for path in paths))
+            for name, paths in by_top_level.items()
+        ]
+
+        rng = random.Random(seed)
+        sample_size = max(1, math.ceil(fraction * len(leaf_requirements)))
+        sizes = _allocate(self.strata, sample_size, min_per_stratum)
+        for stratum in self.strata:
+            size = sizes[stratum.name]
+            if size <= 0:
+                continue
+            # Systematic draw over the weight-sorted leaves: one leaf from each of `size` equal runs
+            step = len(stratum.paths) / size
+            start = rng.random() * step
+            stratum.sampled = [stratum.paths[min(len(stratum.paths) - 1, int(start + i * step))] for i in range(size)]
+
+    @property
+    def leaves(self) -> List[Dict[str, Any]]:
+        """Sampled leaves in rubric order"""
+        sampled = {path for stratum in self.strata for path in stratum.sampled}
+        return [leaf for path, leaf in self.leaves_by_path.items() if path in sampled]
+
+    def estimate(self, scores: Dict[str, float], confidence: float = 0.95) -> Dict[str, Any]:
+        """
+        Estimated overall score and its confidence interval from the scores of sampled leaves.
+
+        Sampled leaves without a score (e.g. the cost budget ran out) are left out; a stratum with
+        no scored leaf at all contributes the midpoint of its weight with the largest possible variance.
+        """
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        total = 0.0
+        variance = 0.0
+        strata = []
+        for stratum in self.strata:
+            scored = [path for path in stratum.sampled if path in scores]
+            n, size = len(scored), len(stratum.paths)
+            if n == 0:
+                stratum_estimate = stratum.weight / 2
+                stratum_variance = stratum.weight ** 2 / 4
+            else:
+                sampled_weight = sum(self.weights.get(path, 0.0) for path in scored)
+                ratio = sum(self.weights.get(path, 0.0) * scores[path] for path in scored) / sampled_weight if sampled_weight > 0 else 0.0
+                stratum_estimate = stratum.weight * ratio
+                if n >= size or n < 2:
+                    # Fully enumerated strata are exact; a single leaf of a larger stratum gives no spread
+                    stratum_variance = 0.0 if n >= size else stratum.weight ** 2 / 4
+                else:
+                    residuals = [self.weights.get(path, 0.0) * (scores[path] - ratio) for path in scored]
+                    spread = sum(residual ** 2 for residual in residuals) / (n - 1)
+                    # Two or three 0/1 verdicts often agree and would claim zero variance; the spread
+                    # never drops below that of a binomial with a Laplace-smoothed rate
+                    smoothed = (ratio * n + 1) / (n + 2)
+                    mean_square_weight = sum(self.weights.get(path, 0.0) ** 2 for path in scored) / n
+                    spread = max(spread, mean_square_weight * smoothed * (1 - smoothed))
+                    stratum_variance = size ** 2 * (1 - n / size) * spread / n
+            total += stratum_estimate
+            variance += stratum_variance
+            strata.append({
+                "stratum": stratum.name,
+                "leaves": size,
+                "sampled": n,
+                "weight": stratum.weight,
+                "estimate": stratum_estimate,
+                "std_error": math.sqrt(stratum_variance),
+            })
+
+        std_error = math.sqrt(variance)
+        return {
+            "estimate": total,
+            "std_error": std_error,
+            "confidence": confidence,
+            "lower": max(0.0, total - z * std_error),
+            "upper": min(1.0, total + z * std_error),
+            "sampled_leaves": sum(stratum["sampled"] for stratum in strata),
+            "total_leaves": len(self.leaves_by_path),
+            "strata": strata,
+        }
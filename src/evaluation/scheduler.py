@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from llm.stats import percentile
+
+
+@dataclass
+class TaskTiming:
+    """Wall-clock breakdown of one scheduled task"""
+    queue_wait: float = 0.0  # seconds between submission and getting a slot
+    latency: float = 0.0     # seconds spent inside the worker itself
+
+
+class SlidingWindowScheduler:
+    """
+    Keep up to `max_in_flight` tasks running and start the next item as soon as any slot frees up.
+
+    Unlike fixed batches awaited with `asyncio.gather`, a slow task only holds its own slot,
+    so one straggler no longer stalls the rest of the work.
+    """
+
+    def __init__(self, max_in_flight: int = 5):
+        """
+        Args:
+            max_in_flight: Maximum number of worker calls running at the same time
+        """
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.timings: List[TaskTiming] = []
+        self.wall_time = 0.0
+        self.stopped_early = False
+        self.not_started = 0
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        worker: Callable[[Any], Awaitable[Any]],
+        on_result: Optional[Callable[[Any, Any, TaskTiming], Any]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> List[Tuple[Any, Any, TaskTiming]]:
+        """
+        Run `worker` over `items` with a sliding window of concurrent calls.
+
+        Args:
+            items: Work items, started in the given order
+            worker: Coroutine function called once per item
+            on_result: Optional callback (sync or async) invoked as each item completes
+            should_stop: Optional predicate checked before each new item is started; once it
+                returns True no further items are started and in-flight ones are allowed to finish
+
+        Returns:
+            List of (item, result, timing) tuples in completion order. Exceptions raised by
+            the worker are returned as the result instead of being propagated.
+        """
+        pending = deque(items)
+        results = []
+        submitted_at = time.monotonic()
+
+        async def slot():
+            while pending:
+                if should_stop is not None and should_stop():
+                    self.stopped_early = True
+                    return
+                item = pending.popleft()
+                started_at = time.monotonic()
+                try:
+                    result = await worker(item)
+                except Exception as e:
+                    result = e
+                timing = TaskTiming(
+                    queue_wait=started_at - submitted_at,
+                    latency=time.monotonic() - started_at,
+                )
+                self.timings.append(timing)
+                results.append((item, result, timing))
+                if on_result is not None:
+                    callback_result = on_result(item, result, timing)
+                    if asyncio.iscoroutine(callback_result):
+                        await callback_result
+
+        num_slots = min(self.max_in_flight, len(pending))
+        await asyncio.gather(*(slot() for _ in range(num_slots)))
+        self.wall_time += time.monotonic() - submitted_at
+        self.not_started = len(pending)
+        return results
+
+    def summary(self) -> Dict[str, float]:
+        """Aggregate queue wait and worker latency statistics over all completed tasks"""
+        waits = [t.queue_wait for t in self.timings]
+        latencies = [t.latency for t in self.timings]
+        return {
+            "tasks": len(self.timings),
+            "max_in_flight": self.max_in_flight,
+            "wall_time": self.wall_time,
+            "queue_wait_mean": sum(waits) / len(waits) if waits else 0.0,
+            "queue_wait_p95": percentile(waits, 95),
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+        }
@@ -0,0 +1,129 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from .retrieval import DocsRetriever, tokenize
+
+TRIAGE_MODES = ("off", "flag", "resolve")
+
+
+def _stem(term: str) -> str:
+    """Crude prefix stem so that e.g. 'configure' and 'configuration' count as the same term"""
+    return term[:6]
+
+
+@dataclass
+class TriageDecision:
+    """Local, LLM-free assessment of one leaf against the parsed documentation"""
+    path: str
+    section_coverage: float             # share of the criteria's terms found in its best BM25 section
+    docs_coverage: float                # share of its terms found anywhere in the docs
+    semantic: Optional[float] = None    # best cosine similarity to a section, when embeddings are prepared
+    best_section: Optional[str] = None
+    decision: Optional[str] = None      # "covered", "absent", or None when the LLM has to decide
+
+
+class LeafTriage:
+    """
+    Sort out the leaves whose verdict is obvious from the documentation text alone.
+
+    A leaf is "covered" when nearly all of its terms appear in one section (and, with embeddings,
+    that section is semantically close), and "absent" when hardly any of its terms occur anywhere
+    in the docs (and no section is semantically close). Everything in between is left to the judge.
+    Thresholds are deliberately strict; `agreement` compares decisions with LLM verdicts so they
+    can be tuned on a run in "flag" mode before leaves are resolved without the LLM.
+    """
+
+    def __init__(
+        self,
+        retriever: DocsRetriever,
+        covered_threshold: float = 0.9,
+        absent_threshold: float = 0.25,
+        semantic_covered: float = 0.8,
+        semantic_absent: float = 0.3,
+        min_terms: int = 3,
+    ):
+        """
+        Args:
+            retriever: Docs retriever whose BM25 index (and embeddings, if prepared) are reused
+            covered_threshold: Minimum share of terms found in the best section for "covered"
+            absent_threshold: Maximum share of terms found anywhere in the docs for "absent"
+            semantic_covered: With embeddings, minimum best-section similarity for "covered"
+            semantic_absent: With embeddings, maximum best-section similarity for "absent"
+            min_terms: Criteria with fewer content terms are always left to the judge
+        """
+        self.retriever = retriever
+        self.covered_threshold = covered_threshold
+        self.absent_threshold = absent_threshold
+        self.semantic_covered = semantic_covered
+        self.semantic_absent = semantic_absent
+        self.min_terms = min_terms
+        self.section_stems = [{_stem(term) for term in term_freqs} for term_freqs in retriever.index.term_freqs]
+        self.docs_stems = set().union(*self.section_stems) if self.section_stems else set()
+
+    async def assess(self, leaf_requirements: List[Dict[str, Any]]) -> Dict[str, TriageDecision]:
+        """Triage decision of every leaf, keyed by path"""
+        semantic_scores = [None] * len(leaf_requirements)
+        if self.retriever.section_embeddings is not None and leaf_requirements:
+            import numpy as np
+            from utils import embed_texts
+
+            queries = await embed_texts([leaf["requirement"] for leaf in leaf_requirements])
+            queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+            semantic_scores = [float(value) for value in (queries @ self.retriever.section_embeddings.T).max(axis=1)]
+
+        decisions = {}
+        for leaf, semantic in zip(leaf_requirements, semantic_scores):
+            decisions[leaf["path"]] = self._decide(leaf, semantic)
+        return decisions
+
+    def _decide(self, leaf: Dict[str, Any], semantic: Optional[float]) -> TriageDecision:
+        stems = {_stem(term) for term in tokenize(leaf["requirement"])}
+        if not stems or not self.section_stems:
+            return TriageDecision(leaf["path"], 0.0, 0.0, semantic)
+
+        scores = self.retriever.index.scores(leaf["requirement"])
+        best = max(range(len(scores)), key=lambda i: scores[i])
+        section_coverage = len(stems & self.section_stems[best]) / len(stems)
+        docs_coverage = len(stems & self.docs_stems) / len(stems)
+        decision = TriageDecision(leaf["path"], section_coverage, docs_coverage, semantic, self.retriever.sections[best]["title"])
+
+        if len(stems) < self.min_terms:
+            return decision
+        if section_coverage >= self.covered_threshold and (semantic is None or semantic >= self.semantic_covered):
+            decision.decision = "covered"
+        elif docs_coverage <= self.absent_threshold and (semantic is None or semantic <= self.semantic_absent):
+            decision.decision = "absent"
+        return decision
+
+    @staticmethod
+    def evaluation(decision: TriageDecision) -> Dict[str, Any]:
+        """Leaf evaluation standing in for an LLM verdict on a resolved leaf"""
+        covered = decision.decision == "covered"
+        if covered:
+            reasoning = f"[TRIAGE] {decision.section_coverage:.0%} of the criteria's terms appear in one section"
+        else:
+            reasoning = f"[TRIAGE] Only {decision.docs_coverage:.0%} of the criteria's terms appear anywhere in the documentation"
+        return {
+            "score": 1 if covered else 0,
+            "reasoning": reasoning,
+            "evidence": (decision.best_section or "") if covered else "",
+            "tokens": {"input": 0, "output": 0},
+            "triage": asdict(decision),
+        }
+
+    @staticmethod
+    def agreement(decisions: Dict[str, TriageDecision], evaluations: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """How often triage decisions match the (valid) LLM verdicts of the same leaves, per decision"""
+        report = {}
+        for label, expected in (("covered", 1), ("absent", 0)):
+            flagged = [path for path, decision in decisions.items() if decision.decision == label]
+            judged = [path for path in flagged if path in evaluations and not evaluations[path].get("reasoning", "").startswith("[TRIAGE]")]
+            agreed = sum(1 for path in judged if evaluations[path].get("score") == expected)
+            report[label] = {
+                "flagged": len(flagged),
+                "judged": len(judged),
+                "agreed": agreed,
+                "agreement": agreed / len(judged) if judged else None,
+            }
+        report["undecided"] = sum(1 for decision in decisions.values() if decision.decision is None)
+        return report
@@ -0,0 +1,217 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+
+class Verdict(BaseModel):
+    """Binary judge verdict for one leaf criteria"""
+    criteria: str = Field(default="", description="The specific criteria text")
+    score: int = Field(description="1 if the documentation covers the criteria, 0 otherwise")
+    reasoning: str = Field(default="No reasoning provided", description="Brief explanation of why this score was assigned")
+    evidence: str = Field(default="No evidence provided", description="Specific documentation sections or content that support the score")
+    confidence: Optional[float] = Field(default=None, description="How sure the judge is of the score, from 0 (a guess) to 1 (certain)")
+
+    @field_validator("score", mode="before")
+    @classmethod
+    def coerce_score(cls, value: Any) -> int:
+        # Accept the spellings models commonly produce for a binary score: true/false, "1", 1.0
+        if isinstance(value, str):
+            value = value.strip().lower()
+            value = {"true": 1, "false": 0, "yes": 1, "no": 0}.get(value, value)
+        try:
+            score = int(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"score must be 0 or 1, got {value!r}")
+        if score not in (0, 1) or float(value) != score:
+            raise ValueError(f"score must be 0 or 1, got {value!r}")
+        return score
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def coerce_confidence(cls, value: Any) -> Optional[float]:
+        # Confidence is advisory: words and percentages are mapped to [0, 1], anything else is dropped
+        # rather than failing an otherwise valid verdict
+        if value is None or isinstance(value, bool):
+            return None
+        if isinstance(value, str):
+            value = value.strip().lower().rstrip("%")
+            value = {"high": 0.9, "medium": 0.6, "low": 0.3}.get(value, value)
+        try:
+            confidence = float(value)
+        except (TypeError, ValueError):
+            return None
+        if 1 < confidence <= 100:
+            confidence /= 100
+        return confidence if 0 <= confidence <= 1 else None
+
+    @field_validator("reasoning", "evidence", "criteria", mode="before")
+    @classmethod
+    def coerce_text(cls, value: Any) -> str:
+        # Evidence in particular often comes back as a list of sections
+        if value is None:
+            return ""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value)
+        return str(value)
+
+
+class BatchedVerdict(Verdict):
+    """Verdict for one criteria of a batched prompt, identified by its 1-based position in the list"""
+    id: int = Field(description="Number of the criteria in the list")
+
+
+class BatchedVerdicts(BaseModel):
+    """All verdicts of a batched prompt; JSON mode requires an object at the top level"""
+    verdicts: List[BatchedVerdict] = Field(default_factory=list)
+
+
+JSON_OBJECT_RESPONSE_FORMAT = {"type": "json_object"}
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def extract_json_text(output: str, opening: str = "{") -> str:
+    """Cut the outermost JSON value starting with `opening` out of a model response"""
+    closing = "}" if opening == "{" else "]"
+    fenced = _FENCE_PATTERN.findall(output)
+    candidates = [block for block in fenced if opening in block] or [output]
+    text = candidates[0]
+    start = text.find(opening)
+    if start == -1:
+        raise ValueError(f"No JSON {'object' if opening == '{' else 'array'} found in response")
+    end = text.rfind(closing) + 1
+    # A response cut off mid-object has no closing bracket; repair_json balances it
+    return text[start:end] if end > start else text[start:]
+
+
+def repair_json(text: str) -> str:
+    """
+    Cheap local fixes for near-valid JSON, tried before spending another LLM call:
+    smart quotes, Python literals, trailing commas, raw newlines inside strings and
+    unbalanced closing brackets of a truncated response.
+    """
+    text = text.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+
+    repaired = []
+    stack = []
+    in_string = False
+    escaped = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                char = "\\n"
+            repaired.append(char)
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+        elif char.isascii() and char.isalpha():
+            # Bare words such as None/True; other letters (e.g. é, CJK) are copied like any character
+            word = re.match(r"[A-Za-z]+", text[i:]).group(0)
+            repaired.append(_PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        repaired.append(char)
+        i += 1
+
+    if in_string:
+        repaired.append('"')
+    text = "".join(repaired).rstrip().rstrip(",")
+    text += "".join(reversed(stack))
+    return _TRAILING_COMMA_PATTERN.sub(r"\1", text)
+
+
+def load_json_leniently(text: str) -> Any:
+    """
+    json.loads, falling back to the local repair step.
+
+    Raises:
+        ValueError: If the text is not valid JSON even after repair (json.JSONDecodeError included)
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        repaired = repair_json(text)
+    except Exception as e:
+        raise ValueError(f"JSON repair failed: {e}") from e
+    return json.loads(repaired)
+
+
+def parse_verdict(output: str) -> Verdict:
+    """
+    Parse and validate a single-criteria verdict from a model response.
+
+    Raises:
+        ValueError: If no valid verdict can be recovered, so the caller can fall back or retry
+    """
+    try:
+        return Verdict.model_validate(load_json_leniently(extract_json_text(output)))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid verdict: {e}") from e
+
+
+def parse_batched_verdicts(output: str, num_criteria: int) -> Dict[int, BatchedVerdict]:
+    """
+    Parse the verdicts of a batched prompt, keeping only valid entries keyed by 1-based id.
+
+    Accepts both `{"verdicts": [...]}` (JSON mode) and a bare array.
+
+    Raises:
+        ValueError: If the response holds no JSON at all
+    """
+    stripped = output.strip()
+    opening = "[" if stripped.find("[") != -1 and (stripped.find("{") == -1 or stripped.find("[") < stripped.find("{")) else "{"
+    try:
+        data = load_json_leniently(extract_json_text(output, opening))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid verdicts: {e}") from e
+    if isinstance(data, dict):
+        data = data.get("verdicts", [])
+
+    verdicts = {}
+    for item in data if isinstance(data, list) else []:
+        try:
+            verdict = BatchedVerdict.model_validate(item)
+        except ValidationError:
+            continue
+        if 1 <= verdict.id <= num_criteria:
+            verdicts[verdict.id] = verdict
+    return verdicts
+
+
+def is_complete_verdict(text: str) -> bool:
+    """Whether `text` already holds a valid single-criteria verdict (used to stop a stream early)"""
+    try:
+        parse_verdict(text)
+    except ValueError:
+        return False
+    return True
+
+
+def batched_verdicts_complete(num_criteria: int) -> Callable[[str], bool]:
+    """Predicate accepting a batched response once it holds a valid verdict for every criteria"""
+    def complete(text: str) -> bool:
+        try:
+            return len(parse_batched_verdicts(text, num_criteria)) == num_criteria
+        except ValueError:
+            return False
+    return complete
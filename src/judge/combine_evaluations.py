@@ -21,7 +21,8 @@ def parse_args():
                        default="average", help="Combination method (default: average)")
     parser.add_argument("--weights", help="Comma-separated weights for weighted average (e.g., '0.4,0.3,0.3')")
     parser.add_argument("--confidence-threshold", type=float, default=0.0, 
-                       help="Minimum confidence threshold for including evaluations (default: 0.0)")
+                       help="Minimum judge confidence for including a leaf evaluation; evaluations without a confidence are always included, and a leaf keeps all its evaluations if none qualifies (default: 0.0)")
+    parser.add_argument("--subfolder", help="Combine the results in this subfolder of evaluation_results (e.g. cascade) instead of the per-model results")
     return parser.parse_args()
 
 def is_leaf_node(rubric_item):
@@ -107,8 +108,8 @@ def combine_std_weighted(stds: List[float], weights: List[float]) -> float:
     weighted_variance = sum(w**2 * s**2 for w, s in zip(weights, stds))
     return math.sqrt(weighted_variance) / total_weight
 
-def combine_leaf_evaluations(all_leaf_evaluations: List[Dict], method: str, weights: List[float] = None) -> Dict:
-    """Combine leaf evaluations from multiple LLMs"""
+def combine_leaf_evaluations(all_leaf_evaluations: List[Dict], method: str, weights: List[float] = None, confidence_threshold: float = 0.0) -> Dict:
+    """Combine leaf evaluations from multiple LLMs, leaving out those below confidence_threshold"""
     if not all_leaf_evaluations:
         return {}
     
@@ -126,16 +127,19 @@ def combine_leaf_evaluations(all_leaf_evaluations: List[Dict], method: str, weig
         evidences = []
         all_tokens = {"input": 0, "output": 0}
         
-        for leaf_evals in all_leaf_evaluations:
-            if path in leaf_evals:
-                eval_data = leaf_evals[path]
-                scores.append(eval_data.get("score", 0))
-                reasonings.append(eval_data.get("reasoning", ""))
-                evidences.append(str(eval_data.get("evidence", "")))
-                
-                tokens = eval_data.get("tokens", {})
-                all_tokens["input"] += tokens.get("input", 0)
-                all_tokens["output"] += tokens.get("output", 0)
+        # Evaluations that report a confidence below the threshold are left out, unless that would leave none
+        candidates = [(i, leaf_evals[path]) for i, leaf_evals in enumerate(all_leaf_evaluations) if path in leaf_evals]
+        confident = [(i, eval_data) for i, eval_data in candidates if eval_data.get("confidence") is None or eval_data["confidence"] >= confidence_threshold]
+        included = confident or candidates
+
+        for _, eval_data in included:
+            scores.append(eval_data.get("score", 0))
+            reasonings.append(eval_data.get("reasoning", ""))
+            evidences.append(str(eval_data.get("evidence", "")))
+
+            tokens = eval_data.get("tokens", {})
+            all_tokens["input"] += tokens.get("input", 0)
+            all_tokens["output"] += tokens.get("output", 0)
         
         if not scores:
             continue
@@ -147,8 +151,8 @@ def combine_leaf_evaluations(all_leaf_evaluations: List[Dict], method: str, weig
             combined_score = combine_scores_majority_vote([int(s) for s in scores])
         elif method == "weighted_average" and weights:
             # Only use weights if we have enough
-            if len(weights) >= len(scores):
-                combined_score = combine_scores_weighted_average(scores, weights[:len(scores)])
+            if all(i < len(weights) for i, _ in included):
+                combined_score = combine_scores_weighted_average(scores, [weights[i] for i, _ in included])
             else:
                 combined_score = combine_scores_average(scores)
         elif method == "max":
@@ -216,59 +220,13 @@ def calculate_scores_bottom_up(rubrics, leaf_evaluations):
     
     return scored_rubrics
 
-def load_evaluation_files(repo_name: str, reference: str) -> List[Dict]:
-    """Load all evaluation files matching the pattern"""
-    base_path = config.get_data_path(repo_name, reference, "evaluation_results")
-    
-    file_pattern = os.path.join(base_path, "*.json")
-    
-    all_files = glob.glob(file_pattern)
-    evaluation_files = [f for f in all_files if "combined" not in os.path.basename(f)]
-    
-    if not evaluation_files:
-        raise ValueError(f"No evaluation files found matching pattern: {file_pattern}")
-    
-    print(f"Found {len(evaluation_files)} evaluation files:")
-    for file_path in evaluation_files:
-        print(f"  - {os.path.basename(file_path)}")
-    
-    evaluations = []
-    for file_path in evaluation_files:
-        try:
-            with open(file_path, "r") as f:
-                evaluation = json.load(f)
-                evaluations.append(evaluation)
-                print(f"✓ Loaded: {os.path.basename(file_path)}")
-        except Exception as e:
-            print(f"✗ Error loading {file_path}: {e}")
-    
-    return evaluations
+def build_combined_results(evaluations: List[Any], method: str, weights: List[float] = None, confidence_threshold: float = 0.0):
+    """
+    Combine several scored-rubrics evaluations into one result with combination metadata.
 
-def main():
-    args = parse_args()
-    
-    # Load all evaluation files
-    print("Loading evaluation files...")
-    evaluations = load_evaluation_files(args.repo_name, args.reference)
-    
-    if len(evaluations) < 2:
-        print("Error: Need at least 2 evaluation files to combine")
-        return
-    
-    print(f"Combining {len(evaluations)} evaluations using method: {args.method}")
-    
-    # Parse weights if provided
-    weights = None
-    if args.weights:
-        try:
-            weights = [float(w.strip()) for w in args.weights.split(",")]
-            print(f"Using weights: {weights}")
-            if len(weights) != len(evaluations):
-                print(f"Warning: Number of weights ({len(weights)}) doesn't match number of evaluations ({len(evaluations)})")
-        except Exception as e:
-            print(f"Error parsing weights: {e}")
-            weights = None
-    
+    Returns:
+        Tuple of (result to save, combined scored rubrics, combined leaf evaluations)
+    """
     # Extract leaf evaluations from all evaluations
     all_leaf_evaluations = []
     for evaluation in evaluations:
@@ -278,10 +236,20 @@ def main():
     
     # Combine leaf evaluations
     print("Combining leaf evaluations...")
-    combined_leaf_evaluations = combine_leaf_evaluations(all_leaf_evaluations, args.method, weights)
+    combined_leaf_evaluations = combine_leaf_evaluations(all_leaf_evaluations, method, weights, confidence_threshold)
     
     # Use the first evaluation as template and update with combined scores
-    combined_rubrics = json.loads(json.dumps(evaluations[0]))  # Deep copy
+    result, combined_rubrics = finalize_combined_results(evaluations[0], combined_leaf_evaluations, method, len(evaluations), weights, confidence_threshold)
+    return result, combined_rubrics, combined_leaf_evaluations
+
+def finalize_combined_results(template_rubrics: Any, combined_leaf_evaluations: Dict, method: str, num_evaluations: int, weights: List[float] = None, confidence_threshold: float = 0.0):
+    """
+    Score a rubrics template bottom-up from combined leaf evaluations and attach combination metadata.
+
+    Returns:
+        Tuple of (result to save, combined scored rubrics)
+    """
+    combined_rubrics = json.loads(json.dumps(template_rubrics))  # Deep copy
     
     # Calculate combined scores bottom-up
     print("Calculating combined scores...")
@@ -312,21 +280,16 @@ def main():
     
     # Add metadata about the combination
     combination_metadata = {
-        "combination_method": args.method,
-        "num_evaluations_combined": len(evaluations),
+        "combination_method": method,
+        "num_evaluations_combined": num_evaluations,
         "weights": weights,
-        "confidence_threshold": args.confidence_threshold,
+        "confidence_threshold": confidence_threshold,
         "overall_score": overall_score_for_metadata,
         "overall_std": overall_std_for_metadata,
         "overall_score_range": [overall_score_for_metadata - overall_std_for_metadata, 
                                overall_score_for_metadata + overall_std_for_metadata]
     }
     
-    # Save combined results
-    base_path = config.get_data_path(args.repo_name, args.reference, "evaluation_results")
-    output_file = args.output_file or "combined_evaluation_results.json"
-    output_path = os.path.join(base_path, output_file)
-    
     # Add metadata to the combined results
     if isinstance(combined_rubrics, list):
         result = {
@@ -336,6 +299,74 @@ def main():
     else:
         result = combined_rubrics
         result["combination_metadata"] = combination_metadata
+
+    return result, combined_rubrics
+
+def load_evaluation_files(repo_name: str, reference: str, subfolder: str = None) -> List[Dict]:
+    """Load all evaluation files matching the pattern (per-model results, or those in a subfolder such as cascade/)"""
+    base_path = config.get_data_path(repo_name, reference, "evaluation_results")
+    if subfolder:
+        base_path = os.path.join(base_path, subfolder)
+    
+    file_pattern = os.path.join(base_path, "*.json")
+    
+    all_files = glob.glob(file_pattern)
+    evaluation_files = [f for f in all_files if "combined" not in os.path.basename(f)]
+    
+    if not evaluation_files:
+        raise ValueError(f"No evaluation files found matching pattern: {file_pattern}")
+    
+    print(f"Found {len(evaluation_files)} evaluation files:")
+    for file_path in evaluation_files:
+        print(f"  - {os.path.basename(file_path)}")
+    
+    evaluations = []
+    for file_path in evaluation_files:
+        try:
+            with open(file_path, "r") as f:
+                evaluation = json.load(f)
+                evaluations.append(evaluation)
+                print(f"✓ Loaded: {os.path.basename(file_path)}")
+        except Exception as e:
+            print(f"✗ Error loading {file_path}: {e}")
+    
+    return evaluations
+
+def main():
+    args = parse_args()
+    
+    # Load all evaluation files
+    print("Loading evaluation files...")
+    evaluations = load_evaluation_files(args.repo_name, args.reference, args.subfolder)
+    
+    if len(evaluations) < 2:
+        print("Error: Need at least 2 evaluation files to combine")
+        return
+    
+    print(f"Combining {len(evaluations)} evaluations using method: {args.method}")
+    
+    # Parse weights if provided
+    weights = None
+    if args.weights:
+        try:
+            weights = [float(w.strip()) for w in args.weights.split(",")]
+            print(f"Using weights: {weights}")
+            if len(weights) != len(evaluations):
+                print(f"Warning: Number of weights ({len(weights)}) doesn't match number of evaluations ({len(evaluations)})")
+        except Exception as e:
+            print(f"Error parsing weights: {e}")
+            weights = None
+    
+    result, combined_rubrics, combined_leaf_evaluations = build_combined_results(
+        evaluations, args.method, weights, args.confidence_threshold
+    )
+    
+    # Save combined results
+    base_path = config.get_data_path(args.repo_name, args.reference, "evaluation_results")
+    if args.subfolder:
+        base_path = os.path.join(base_path, args.subfolder)
+    output_file = args.output_file or "combined_evaluation_results.json"
+    output_path = os.path.join(base_path, output_file)
     
     with open(output_path, "w") as f:
         json.dump(result, f, indent=2)
@@ -1,37 +1,90 @@
+from __future__ import annotations
+
 import json
 import asyncio
 import argparse
 import os
+from dataclasses import asdict
 from pathlib import Path
+from typing import TYPE_CHECKING
 from tqdm import tqdm
 import traceback
-import logfire
-
-try:
-    logfire.configure()
-    logfire.instrument_pydantic_ai()
-except Exception as e:
-    print(f"Failed to configure logfire: {e}")
-
-from pydantic_ai import Agent
+from collections import Counter
 
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from tools import AgentDeps, docs_navigator_tool
-from utils import get_llm, run_llm_natively
 import config
+# pydantic_ai, the docs tools and logfire are imported when first needed, so --help and
+# runs whose results already exist return without loading them
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+    from tools import AgentDeps
+from evaluation import (
+    JSON_OBJECT_RESPONSE_FORMAT,
+    BatchedVerdicts,
+    DocsRetriever,
+    EvaluationCheckpoint,
+    LeafTriage,
+    RunningScore,
+    SlidingWindowScheduler,
+    StratifiedSample,
+    TRIAGE_MODES,
+    Verdict,
+    DocsProvenance,
+    batched_verdicts_complete,
+    configure_agent_budget,
+    current_budget,
+    effective_weights,
+    get_agent_budget,
+    is_complete_verdict,
+    merge_provenance,
+    parse_batched_verdicts,
+    parse_verdict,
+    track_agent_budget,
+    track_docs_fetches,
+)
+from utils import get_llm, run_llm_natively, run_agent
+from llm import CACHE_MODES, Usage, closing_clients, configure_hedging, configure_response_cache, current_usage_ledger, get_router, get_stream_profiler, ledger_scope, usage_scope
+from combine_evaluations import build_combined_results, combine_leaf_evaluations, finalize_combined_results
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description="Evaluate documentation against hierarchical rubrics")
     parser.add_argument("--repo-name", required=True, help="Name of the repository")
     parser.add_argument("--reference", required=True, help="Name of the folder that contains the reference documentation needed for evaluation")
     parser.add_argument("--use-tools", action="store_true", help="Enable tools for document navigation")
     parser.add_argument("--model", help="Model to use (default: claude-sonnet-4)")
+    parser.add_argument("--models", help="Comma-separated list of judge models evaluated concurrently in one process (overrides --model)")
+    parser.add_argument("--model-concurrency", help="Per-model in-flight limits as 'model=N,model=N' (default: --batch-size for every model)")
+    parser.add_argument("--combine", action="store_true", help="With --models, also write combined_evaluation_results.json")
+    parser.add_argument("--combination-method", choices=["average", "majority_vote", "max", "min"], help="Combination method (default: average for --combine, majority_vote for --adaptive-ensemble)")
+    parser.add_argument("--adaptive-ensemble", action="store_true", help="Judge every leaf with all --models and call --escalation-models only where their verdicts disagree or are invalid")
+    parser.add_argument("--escalation-models", help="Comma-separated extra or stronger judges for --adaptive-ensemble, called one at a time in this order")
+    parser.add_argument("--cascade-model", help="Stronger judge for a cascade: --model judges every leaf first and reports a confidence; only leaves below --confidence-threshold or with invalid output are judged again by this model")
+    parser.add_argument("--confidence-threshold", type=float, default=0.8, help="With --cascade-model, escalate leaves whose cheap verdict is less confident than this (default: 0.8)")
     parser.add_argument("--rubrics-file", help="Path to existing rubrics file for evaluation mode")
-    parser.add_argument("--batch-size", type=int, default=5, help="Number of requirements to evaluate concurrently in each batch (default: 5)")
+    parser.add_argument("--batch-size", type=int, default=5, help="Maximum number of requirements evaluated concurrently; the next one starts as soon as a slot frees up (default: 5)")
     parser.add_argument("--enable-retry", action="store_true", default=False, help="Enable re-evaluation of error cases (default: False)")
     parser.add_argument("--max-retries", type=int, default=2, help="Maximum number of retries for error cases (default: 2)")
-    return parser.parse_args()
+    parser.add_argument("--criteria-per-prompt", type=int, default=1, help="Number of sibling criteria judged together in one prompt; missing or malformed verdicts fall back to per-leaf evaluation (default: 1)")
+    parser.add_argument("--retrieval-top-k", type=int, default=0, help="Send only the top-k documentation sections ranked by BM25 against each criteria plus a compact skeleton, instead of the whole docs tree (default: 0, whole tree)")
+    parser.add_argument("--retrieval-embeddings", action="store_true", help="Blend embedding similarity into the retrieval ranking (requires --retrieval-top-k)")
+    parser.add_argument("--triage", choices=TRIAGE_MODES, default="off", help="Local BM25/embedding triage before the judge (per-model runs): 'flag' records its decisions and their agreement with the LLM verdicts in evaluation_results/triage/, 'resolve' also scores the obvious leaves without an LLM call (default: off)")
+    parser.add_argument("--triage-covered", type=float, default=0.9, help="Share of a criteria's terms that must appear in one section for triage to call it covered (default: 0.9)")
+    parser.add_argument("--triage-absent", type=float, default=0.25, help="Share of a criteria's terms found anywhere in the docs at or below which triage calls it absent (default: 0.25)")
+    parser.add_argument("--max-tool-calls", type=int, help="With --use-tools, docs_navigator calls allowed per leaf before the judge must give its verdict (default: unlimited)")
+    parser.add_argument("--max-leaf-tokens", type=int, help="With --use-tools, tokens an agent run may spend per leaf before its verdict is forced (default: unlimited)")
+    parser.add_argument("--max-leaf-seconds", type=float, help="With --use-tools, wall time per leaf before its verdict is forced (default: unlimited)")
+    parser.add_argument("--max-cost", type=float, help="Stop scheduling new leaves once the estimated spend reaches this many USD (per judge model when several are evaluated side by side); the run can be resumed from its checkpoint")
+    parser.add_argument("--score-tolerance", type=float, help="Stop starting new leaves once the overall score is bounded within this width; leaves left unevaluated get the evaluated leaves' weighted mean (per-model runs only)")
+    parser.add_argument("--sample", type=float, help="Judge only this fraction of the leaves, stratified by top-level rubric and weight, and report an estimated overall score with a confidence interval to evaluation_results/samples/ (e.g. 0.15); every top-level item gets at least two leaves, so small rubrics may judge more than the fraction")
+    parser.add_argument("--sample-seed", type=int, default=0, help="Seed of the --sample draw (default: 0)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the --sample interval (default: 0.95)")
+    parser.add_argument("--incremental", action="store_true", help="Re-evaluate only leaves whose documentation inputs changed since the previous run and carry the other verdicts forward")
+    parser.add_argument("--hedge-fraction", type=float, help="Hedge slow LLM requests with a duplicate, for at most this fraction of calls (default: LLM_HEDGE_MAX_FRACTION, 0 = off)")
+    parser.add_argument("--hedge-percentile", type=float, help="Latency percentile after which a request is hedged (default: LLM_HEDGE_PERCENTILE, 95)")
+    parser.add_argument("--stream", action="store_true", help="Stream native judge calls and stop reading as soon as a valid verdict has arrived (default: LLM_STREAM)")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, help="LLM response cache mode (default: LLM_CACHE_MODE from the environment, 'off' if unset)")
+    return parser.parse_args(argv)
 
 
 
@@ -64,11 +117,42 @@ For each criteria evaluated, respond with:
 ```
 """.strip()
 
+# The cheap judge of a cascade also rates its certainty, which decides whether the leaf is escalated
+CASCADE_SYSTEM_PROMPT = EVALUATION_SYSTEM_PROMPT + """
+
+# CONFIDENCE
+Also include a "confidence" field: a number from 0 to 1 stating how sure you are of the score.
+Use 0.9 or more only when the documentation clearly settles the question, around 0.5 when you are
+guessing, and lower values when the relevant section may be missing from what you could see.
+""".rstrip()
+
+
+def budget_exhausted(max_cost):
+    """Check whether the spend recorded in the current usage ledger (e.g. of this judge model) has reached max_cost"""
+    return max_cost is not None and current_usage_ledger().total_cost >= max_cost
+
+async def in_ledger_scope(coroutine):
+    """Await `coroutine` with a usage ledger of its own, so its usage file, cost lines and --max-cost only count its calls"""
+    with ledger_scope():
+        return await coroutine
+
+async def render_docs_context(docs_tree, criteria, retriever: DocsRetriever = None):
+    """Documentation block of a judge prompt: the whole tree, or only the sections relevant to the criteria"""
+    if retriever is None:
+        return f"Documentation tree:\n```json\n{json.dumps(docs_tree, indent=2)}\n```"
+    return await retriever.render_context(criteria)
 
 def is_leaf_node(rubric_item):
     """Check if a rubric item is a leaf node (has no sub_tasks)"""
     return "sub_tasks" not in rubric_item or not rubric_item["sub_tasks"]
 
+ERROR_MARKERS = ["[AUTOMATIC PARSING FALLBACK]", "[PARSING ERROR]", "[EVALUATION ERROR]"]
+
+def is_error_evaluation(evaluation):
+    """Check if an evaluation came from a parsing fallback or a failed LLM call"""
+    reasoning = evaluation.get("reasoning", "").lower()
+    return any(marker.lower() in reasoning for marker in ERROR_MARKERS)
+
 def collect_leaf_requirements(rubrics):
     """Collect all leaf-level requirements from the rubrics hierarchy"""
     leaf_requirements = []
@@ -89,6 +173,133 @@ def collect_leaf_requirements(rubrics):
     traverse(rubrics)
     return leaf_requirements
 
+def group_sibling_leaves(leaf_requirements, max_group_size):
+    """Group leaves that share a parent into chunks of at most max_group_size, keeping rubric order"""
+    groups_by_parent = {}
+    for leaf in leaf_requirements:
+        parent = leaf["path"].rsplit(".", 1)[0] if "." in leaf["path"] else ""
+        groups_by_parent.setdefault(parent, []).append(leaf)
+
+    groups = []
+    for siblings in groups_by_parent.values():
+        for start in range(0, len(siblings), max(1, max_group_size)):
+            groups.append(siblings[start:start + max(1, max_group_size)])
+    return groups
+
+async def ask_judge(prompt, agent: Agent = None, deps: AgentDeps = None, model: str = None, system_prompt: str = None, output_type=Verdict, stop_when=None):
+    """
+    Send a judge prompt, asking for structured output: JSON mode natively, a validated output_type on the agent.
+    When native calls are streamed, `stop_when` (default: a complete single verdict) ends the stream early.
+    """
+    if agent is None:
+        if stop_when is None and output_type is Verdict:
+            stop_when = is_complete_verdict
+        return await run_llm_natively(model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}], response_format=JSON_OBJECT_RESPONSE_FORMAT, stop_when=stop_when)
+
+    tracker = current_budget()
+    if tracker is None:
+        return await run_agent(agent, prompt, deps, model=model, system_prompt=system_prompt, output_type=output_type)
+    try:
+        return await asyncio.wait_for(
+            run_agent(agent, prompt, deps, model=model, system_prompt=system_prompt, output_type=output_type),
+            timeout=tracker.remaining_seconds,
+        )
+    except asyncio.TimeoutError:
+        tracker.exhausted = f"{tracker.budget.max_seconds:g}s"
+    except Exception:
+        # The navigator tool raised AgentBudgetExceeded (possibly wrapped by the agent); anything else is a real error
+        if tracker.exhausted is None:
+            raise
+    return await force_final_verdict(prompt, deps, model, system_prompt, output_type, stop_when, tracker)
+
+async def force_final_verdict(prompt, deps: AgentDeps, model, system_prompt, output_type, stop_when, tracker):
+    """Tool-less judge call that settles a leaf once its agent run spent its budget, over the sections it had read"""
+    from tools import format_docs_sections
+
+    tracker.forced = True
+    paths = list({json.dumps(path): path for path in tracker.paths}.values())
+    sections = format_docs_sections(deps.docs_navigator, paths) if paths else "(no sections were read)"
+    forced_prompt = f"""
+{prompt}
+
+# LOOKUP BUDGET EXHAUSTED
+The documentation lookup budget for this evaluation ran out ({tracker.exhausted}), so `docs_navigator` is no longer available.
+Sections read so far:
+{sections}
+
+Give your final verdict now, from the documentation tree and these sections alone. Respond with the exact JSON format specified.
+""".strip()
+    return await ask_judge(forced_prompt, None, None, model, system_prompt, output_type, stop_when)
+
+def agent_budget(agent: Agent = None):
+    """Per-leaf budget of a judge call: only tool-using runs have one"""
+    return get_agent_budget() if agent is not None else None
+
+async def judge_single_leaf(leaf, docs_tree, agent: Agent = None, deps: AgentDeps = None, model: str = None, system_prompt: str = None, retriever: DocsRetriever = None, stage="judge", provenance: DocsProvenance = None):
+    """Evaluate a single requirement with one judge model"""
+    try:
+        with track_docs_fetches() as fetched:
+            docs_context = await render_docs_context(docs_tree, [leaf['requirement']], retriever)
+            prompt = f"""
+Evaluate this criteria against the documentation:
+
+Criteria: "{leaf['requirement']}"
+
+{docs_context}
+
+First, you need to find the relevant documentation section that covers this criteria through `docs_navigator` tool.
+Then, you need to evaluate if the criteria is mentioned. Respond with the exact JSON format specified.
+""".strip()
+
+            with usage_scope(stage=stage, leaf=leaf['path']) as usage, track_agent_budget(agent_budget(agent), usage) as spent:
+                final_output = await ask_judge(prompt, agent, deps, model, system_prompt)
+        input_tokens = usage.input_tokens
+        output_tokens = usage.output_tokens
+        
+        # Parse and validate the verdict, repairing near-valid JSON locally before falling back
+        try:
+            verdict = parse_verdict(final_output)
+            evaluation = {
+                "score": verdict.score,
+                "reasoning": verdict.reasoning,
+                "evidence": verdict.evidence,
+                "tokens": {"input": input_tokens, "output": output_tokens}
+            }
+            if verdict.confidence is not None:
+                evaluation["confidence"] = verdict.confidence
+            if provenance is not None:
+                evaluation["provenance"] = provenance.record(fetched, verdict.evidence)
+            if spent is not None:
+                evaluation["budget"] = spent.report()
+            return leaf['path'], evaluation
+                
+        except Exception as e:
+            # Fallback: look for score in text
+            tqdm.write(f"!! Fallback to text parsing for {leaf['requirement'][:30]} !!")
+            score = 1 if "\"score\": 1" in final_output.lower() or "adequately documented" in final_output.lower() else 0
+            evaluation = {
+                "score": score,
+                "reasoning": "[AUTOMATIC PARSING FALLBACK] - No valid JSON found",
+                "evidence": final_output[:500] if final_output else "No output received",
+                "tokens": {"input": input_tokens, "output": output_tokens}
+            }
+            if spent is not None:
+                evaluation["budget"] = spent.report()
+            return leaf['path'], evaluation
+    except Exception as e:
+        error_msg = str(e)
+        tqdm.write(f"!! Error evaluating {leaf['requirement'][:50]}: {error_msg} !!")
+        tqdm.write(traceback.format_exc())
+        
+        # Rate limits are already retried by the shared limiter in the LLM call layer,
+        # so an error reaching this point is final for this attempt
+        return leaf['path'], {
+            "score": 1,
+            "reasoning": f"[EVALUATION ERROR]: {error_msg}",
+            "evidence": f"Full error: {error_msg}",
+            "tokens": {"input": 0, "output": 0}
+        }
+
 async def re_evaluate_error_leaves(
     leaf_requirements, docs_tree,
     agent: Agent = None,
@@ -97,6 +308,10 @@ async def re_evaluate_error_leaves(
     max_retries=2,
     model: str = None,
     system_prompt: str = None,
+    batch_size=5,
+    retriever: DocsRetriever = None,
+    max_cost: float = None,
+    provenance: DocsProvenance = None,
     ):
     """Re-evaluate leaf requirements that had errors during initial evaluation"""
     error_leaves = []
@@ -105,11 +320,8 @@ async def re_evaluate_error_leaves(
     for leaf in leaf_requirements:
         path = leaf['path']
         if path in initial_evaluations:
-            evaluation = initial_evaluations[path]
             # Check if this was an error case
-            if ( "[AUTOMATIC PARSING FALLBACK]".lower() in evaluation.get("reasoning", "").lower() or
-                "[PARSING ERROR]".lower() in evaluation.get("reasoning", "").lower() or
-                "[EVALUATION ERROR]".lower() in evaluation.get("reasoning", "").lower()):
+            if is_error_evaluation(initial_evaluations[path]):
                 error_leaves.append(leaf)
     
     if not error_leaves:
@@ -125,6 +337,8 @@ async def re_evaluate_error_leaves(
     async def re_evaluate_single_requirement(leaf, retry_count=0):
         """Re-evaluate a single requirement with retry logic"""
         try:
+            with track_docs_fetches() as fetched:
+                docs_context = await render_docs_context(docs_tree, [leaf['requirement']], retriever)
             # Use a more explicit prompt for re-evaluation
             prompt = f"""
 RETRY EVALUATION - Previous attempt failed. Please be extra careful with the JSON format.
@@ -138,10 +352,7 @@ Evaluate this criteria against the documentation:
 
 Criteria: "{leaf['requirement']}"
 
-Documentation tree:
-```json
-{json.dumps(docs_tree, indent=2)}
-```
+{docs_context}
 
 IMPORTANT: You must respond with valid JSON in exactly this format:
 {{
@@ -154,39 +365,25 @@ IMPORTANT: You must respond with valid JSON in exactly this format:
 First, you need to find the relevant documentation section that covers this criteria through `docs_navigator` tool.
 Then, you need to evaluate if the criteria is mentioned.
 """.strip()
-            if agent is None:
-                final_output = await run_llm_natively(model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}])
-            else:
-                result = await agent.run(prompt, deps=deps)
-                final_output = result.output
-            input_tokens = 0  # Token counting would need to be implemented separately
-            output_tokens = 0
+            with track_docs_fetches(fetched), usage_scope(stage="judge_retry", leaf=leaf['path']) as usage, track_agent_budget(agent_budget(agent), usage) as spent:
+                final_output = await ask_judge(prompt, agent, deps, model, system_prompt)
+            input_tokens = usage.input_tokens
+            output_tokens = usage.output_tokens
             
-            # More robust JSON parsing
             try:
-                # Try to extract JSON more carefully
-                json_start = final_output.find('{')
-                json_end = final_output.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    eval_json = final_output[json_start:json_end]
-                    # Clean up the JSON string
-                    eval_json = eval_json.strip()
-                    evaluation = json.loads(eval_json)
-                    
-                    # Validate the JSON structure
-                    if "score" in evaluation and isinstance(evaluation["score"], int):
-                        return leaf['path'], {
-                            "score": evaluation.get("score", 0),
-                            "reasoning": evaluation.get("reasoning", ""),
-                            "evidence": evaluation.get("evidence", ""),
-                            "tokens": {"input": input_tokens, "output": output_tokens},
-                            "retry_count": retry_count + 1
-                        }
-                    else:
-                        raise ValueError("Invalid JSON structure - missing or invalid score")
-                else:
-                    raise ValueError("No JSON found in response")
+                verdict = parse_verdict(final_output)
+                evaluation = {
+                    "score": verdict.score,
+                    "reasoning": verdict.reasoning,
+                    "evidence": verdict.evidence,
+                    "tokens": {"input": input_tokens, "output": output_tokens},
+                    "retry_count": retry_count + 1
+                }
+                if provenance is not None:
+                    evaluation["provenance"] = provenance.record(fetched, verdict.evidence)
+                if spent is not None:
+                    evaluation["budget"] = spent.report()
+                return leaf['path'], evaluation
                     
             except Exception as parse_error:
                 if retry_count < max_retries:
@@ -222,12 +419,12 @@ Then, you need to evaluate if the criteria is mentioned.
     
     # Process error leaves with retries
     tqdm.write("Re-evaluating error leaves...")
-    retry_tasks = [re_evaluate_single_requirement(leaf) for leaf in error_leaves]
-    retry_results = await asyncio.gather(*retry_tasks, return_exceptions=True)
+    scheduler = SlidingWindowScheduler(batch_size)
+    retry_results = await scheduler.run(error_leaves, re_evaluate_single_requirement, should_stop=lambda: budget_exhausted(max_cost))
     
     # Process results
     successful_retries = 0
-    for result in retry_results:
+    for _, result, _ in retry_results:
         if isinstance(result, Exception):
             tqdm.write(f"!! Re-evaluation exception: {result} !!")
             continue
@@ -252,120 +449,133 @@ async def evaluate_leaf_requirements(
     max_retries=2,
     model: str = None,
     system_prompt: str = None,
+    checkpoint: EvaluationCheckpoint = None,
+    criteria_per_prompt=1,
+    retriever: DocsRetriever = None,
+    max_cost: float = None,
+    provenance: DocsProvenance = None,
+    running_score: RunningScore = None,
+    score_tolerance: float = None,
 ):
-    """Evaluate all leaf requirements against the documentation using batch processing"""
+    """
+    Evaluate all leaf requirements against the documentation with a sliding window of concurrent requests.
+
+    With criteria_per_prompt > 1, sibling leaves are judged together in one prompt that shares a
+    single copy of the documentation tree; leaves whose verdict is missing or malformed fall back
+    to per-leaf evaluation. With a retriever, prompts carry only the documentation sections ranked
+    most relevant to the criteria plus a compact skeleton of the tree. Once the current usage ledger
+    reaches max_cost, no new prompts are started.
+
+    With a running_score, prompts are started in order of the weight they carry in the overall
+    score, the score and its bounds are published as verdicts arrive, and no new prompts are
+    started once the bounds are within score_tolerance.
+    """
     evaluations = {}
     
     async def evaluate_single_requirement(leaf):
         """Evaluate a single requirement"""
-        try:
-            prompt = f"""
-Evaluate this criteria against the documentation:
+        return await judge_single_leaf(leaf, docs_tree, agent, deps, model, system_prompt, retriever, provenance=provenance)
+    
+    async def evaluate_requirement_group(group):
+        """Evaluate sibling requirements in one prompt, falling back to per-leaf evaluation where needed"""
+        if len(group) == 1:
+            return [await evaluate_single_requirement(group[0])]
 
-Criteria: "{leaf['requirement']}"
+        with track_docs_fetches() as fetched:
+            docs_context = await render_docs_context(docs_tree, [leaf['requirement'] for leaf in group], retriever)
+        criteria_list = "\n".join(f'{i}. "{leaf["requirement"]}"' for i, leaf in enumerate(group, start=1))
+        prompt = f"""
+Evaluate each of the following criteria against the documentation:
 
-Documentation tree:
-```json
-{json.dumps(docs_tree, indent=2)}
-```
+{criteria_list}
 
-First, you need to find the relevant documentation section that covers this criteria through `docs_navigator` tool.
-Then, you need to evaluate if the criteria is mentioned. Respond with the exact JSON format specified.
+{docs_context}
+
+First, you need to find the relevant documentation sections that cover these criteria through `docs_navigator` tool.
+Then, you need to evaluate each criteria independently. Respond with a JSON object holding one verdict per criteria, in this exact format:
+{{
+  "verdicts": [
+    {{
+      "id": <number of the criteria in the list above>,
+      "score": 0 or 1,
+      "reasoning": "Brief explanation of why this score was assigned",
+      "evidence": "Specific documentation sections or content that support the score"
+    }}
+  ]
+}}
 """.strip()
-            
-            if agent is None:
-                final_output = await run_llm_natively(model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}])
-            else:
-                result = await agent.run(prompt, deps=deps)
-                final_output = result.output
-            input_tokens = 0  # Token counting would need to be implemented separately
-            output_tokens = 0
-            
-            # Parse evaluation result
+
+        verdicts = {}
+        with track_docs_fetches(fetched), usage_scope(stage="judge_batched", leaf=",".join(leaf['path'] for leaf in group)) as usage, track_agent_budget(agent_budget(agent), usage, len(group)) as spent:
             try:
-                # Add debug logging
-                # tqdm.write(f"Debug - LLM output for {leaf['requirement'][:30]}: {final_output[:100]}...")
-                
-                # Extract JSON from output
-                json_start = final_output.find('{')
-                json_end = final_output.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    eval_json = final_output[json_start:json_end]
-                    # tqdm.write(f"Debug - Extracted JSON: {eval_json[:100]}...")
-                    evaluation = json.loads(eval_json)
-                    
-                    # Validate required fields
-                    if "score" not in evaluation:
-                        tqdm.write(f"!! Warning: No score field in evaluation for {leaf['requirement'][:30]} !!")
-                        evaluation["score"] = 0
-                    
-                    return leaf['path'], {
-                        "score": evaluation.get("score", 0),
-                        "reasoning": evaluation.get("reasoning", "No reasoning provided"),
-                        "evidence": evaluation.get("evidence", "No evidence provided"), 
-                        "tokens": {"input": input_tokens, "output": output_tokens}
-                    }
-                    
+                final_output = await ask_judge(prompt, agent, deps, model, system_prompt, output_type=BatchedVerdicts, stop_when=batched_verdicts_complete(len(group)))
+                verdicts = parse_batched_verdicts(final_output, len(group))
             except Exception as e:
-                # Fallback: look for score in text
-                tqdm.write(f"!! Fallback to text parsing for {leaf['requirement'][:30]} !!")
-                score = 1 if "\"score\": 1" in final_output.lower() or "adequately documented" in final_output.lower() else 0
-                return leaf['path'], {
-                    "score": score,
-                    "reasoning": "[AUTOMATIC PARSING FALLBACK] - No valid JSON found",
-                    "evidence": final_output[:500] if final_output else "No output received",
-                    "tokens": {"input": input_tokens, "output": output_tokens}
-                }
-        except Exception as e:
-            error_msg = str(e)
-            tqdm.write(f"!! Error evaluating {leaf['requirement'][:50]}: {error_msg} !!")
-            tqdm.write(traceback.format_exc())
-            
-            # Check if it's a rate limit error and add delay
-            if "429" in error_msg or "rate limit" in error_msg.lower():
-                tqdm.write("!! Rate limit detected, adding delay !!")
-                await asyncio.sleep(60)  # Wait 60 seconds for rate limit
-            
-            return leaf['path'], {
-                "score": 1,
-                "reasoning": f"[EVALUATION ERROR]: {error_msg}",
-                "evidence": f"Full error: {error_msg}",
-                "tokens": {"input": 0, "output": 0}
-            }
-    
-    # Process requirements in batches
-    total_batches = (len(leaf_requirements) + batch_size - 1) // batch_size
-    
-    for batch_idx in range(total_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min(start_idx + batch_size, len(leaf_requirements))
-        batch = leaf_requirements[start_idx:end_idx]
-        
-        tqdm.write(f"Processing batch {batch_idx + 1}/{total_batches} ({len(batch)} requirements)...")
-        
-        # Display what's being evaluated in this batch
-        for leaf in batch:
-            tqdm.write(f"  - {leaf['requirement'][:100]}...")
-        
-        # Process batch concurrently
-        batch_tasks = [evaluate_single_requirement(leaf) for leaf in batch]
-        batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-        
-        # Process results
-        for result in batch_results:
-            if isinstance(result, Exception):
-                tqdm.write(f"!! Batch evaluation error: {result} !!")
-                continue
-            
-            path, evaluation = result
+                tqdm.write(f"!! Batched evaluation failed for {len(group)} criteria, falling back to per-leaf evaluation: {e} !!")
+
+        results = []
+        for i, leaf in enumerate(group, start=1):
+            if i in verdicts:
+                verdict = verdicts[i]
+                results.append((leaf['path'], {
+                    "score": verdict.score,
+                    "reasoning": verdict.reasoning,
+                    "evidence": verdict.evidence,
+                    # The shared prompt's usage is split evenly across the criteria it judged
+                    "tokens": {"input": usage.input_tokens // len(group), "output": usage.output_tokens // len(group)},
+                    "batched_with": len(group),
+                }))
+                if provenance is not None:
+                    results[-1][1]["provenance"] = provenance.record(fetched, verdict.evidence)
+                if spent is not None:
+                    results[-1][1]["budget"] = spent.report()
+            else:
+                results.append(await evaluate_single_requirement(leaf))
+        return results
+
+    # Keep up to batch_size prompts in flight and start the next one as soon as a slot frees up
+    groups = group_sibling_leaves(leaf_requirements, criteria_per_prompt)
+    if running_score is not None:
+        groups.sort(key=lambda group: -sum(running_score.weights.get(leaf["path"], 0.0) for leaf in group))
+    tqdm.write(f"Evaluating {len(leaf_requirements)} requirements in {len(groups)} prompts with up to {batch_size} in flight...")
+    scheduler = SlidingWindowScheduler(batch_size)
+    progress = tqdm(total=len(leaf_requirements), desc="Evaluating")
+
+    def record_result(group, result, timing):
+        progress.update(len(group))
+        if isinstance(result, Exception):
+            tqdm.write(f"!! Evaluation error for {group[0]['requirement'][:50]}: {result} !!")
+            return
+        leaves_by_path = {leaf["path"]: leaf for leaf in group}
+        for path, evaluation in result:
+            evaluation["timing"] = {"queue_wait": timing.queue_wait, "latency": timing.latency}
             evaluations[path] = evaluation
-        
-        # Add a small delay between batches to be respectful to API limits
-        if batch_idx < total_batches - 1:
-            await asyncio.sleep(1)
+            if checkpoint is not None:
+                checkpoint.append(leaves_by_path[path], evaluation)
+            if running_score is not None:
+                running_score.record(path, evaluation["score"])
+        if running_score is not None:
+            progress.set_postfix_str(running_score.describe())
+            running_score.publish()
+
+    def should_stop():
+        return budget_exhausted(max_cost) or (running_score is not None and running_score.settled(score_tolerance))
+
+    await scheduler.run(groups, evaluate_requirement_group, on_result=record_result, should_stop=should_stop)
+    progress.close()
+    if scheduler.stopped_early:
+        if budget_exhausted(max_cost):
+            tqdm.write(f"!! Cost budget of ${max_cost:.2f} reached, {scheduler.not_started} prompts were not started !!")
+        else:
+            tqdm.write(f"Overall score settled ({running_score.describe()}), {scheduler.not_started} prompts were not started")
+
+    stats = scheduler.summary()
+    tqdm.write(
+        f"Scheduler: wall time {stats['wall_time']:.1f}s, "
+        f"queue wait mean {stats['queue_wait_mean']:.1f}s (p95 {stats['queue_wait_p95']:.1f}s), "
+        f"LLM latency mean {stats['latency_mean']:.1f}s (p50 {stats['latency_p50']:.1f}s, p95 {stats['latency_p95']:.1f}s)"
+    )
 
-    
     # Re-evaluate error cases if enabled
     if enable_retry:
         tqdm.write("Checking for error cases to re-evaluate...")
@@ -378,12 +588,215 @@ Then, you need to evaluate if the criteria is mentioned. Respond with the exact
             max_retries,
             model,
             system_prompt,
+            batch_size,
+            retriever,
+            max_cost,
+            provenance,
         )
         
         # Update evaluations with successful re-evaluations
+        leaves_by_path = {leaf["path"]: leaf for leaf in leaf_requirements}
         for path, re_evaluation in re_evaluations.items():
             evaluations[path] = re_evaluation
+            if checkpoint is not None:
+                checkpoint.append(leaves_by_path[path], re_evaluation)
+            if running_score is not None:
+                running_score.record(path, re_evaluation["score"])
+        if running_score is not None and re_evaluations:
+            running_score.publish()
+
+    return evaluations
+
+def is_valid_verdict(evaluation):
+    """Check if an evaluation is a well-formed binary verdict from a successful LLM call"""
+    return not is_error_evaluation(evaluation) and evaluation.get("score") in (0, 1)
+
+def adaptive_ensemble_settled(verdicts, escalated):
+    """
+    Decide whether the verdicts gathered so far are final.
+
+    There have to be at least as many valid verdicts as cheap judges, so a cheap verdict that
+    failed validation is always escalated and settles only once another judge has made up for it.
+    Unanimous valid verdicts are then final right away. A disagreement is final once at least one
+    escalation judge has voted and one score holds a strict majority.
+    """
+    valid_scores = [evaluation["score"] for _, evaluation in verdicts if is_valid_verdict(evaluation)]
+    if not valid_scores or len(valid_scores) < len(verdicts) - escalated:
+        return False
+    if len(set(valid_scores)) == 1:
+        return True
+    counts = sorted(Counter(valid_scores).values(), reverse=True)
+    return escalated > 0 and counts[0] > counts[1]
+
+async def evaluate_leaves_adaptively(
+    leaf_requirements,
+    docs_tree,
+    agents = None,
+    deps: AgentDeps = None,
+    judge_models = None,
+    escalation_models = None,
+    batch_size=5,
+    system_prompt: str = None,
+    checkpoint: EvaluationCheckpoint = None,
+    retriever: DocsRetriever = None,
+    max_cost: float = None,
+    method="majority_vote",
+    provenance: DocsProvenance = None,
+    running_score: RunningScore = None,
+):
+    """
+    Judge each leaf with the cheap judge_models first and call escalation_models one at a time
+    only where the cheap verdicts disagree or fail validation.
+
+    Each leaf evaluation carries the same individual_scores/std/num_llms fields as
+    combine_leaf_evaluations, plus the judges that voted on it. With a running_score, leaves are
+    started by the weight they carry in the overall score, which is published as verdicts arrive.
+    """
+    agents = agents or {}
+    evaluations = {}
+
+    async def judge_leaf(leaf):
+        results = await asyncio.gather(*(
+            judge_single_leaf(leaf, docs_tree, agents.get(model), deps, model, system_prompt, retriever, provenance=provenance)
+            for model in judge_models
+        ))
+        verdicts = [(model, evaluation) for model, (_, evaluation) in zip(judge_models, results)]
+
+        escalated = 0
+        for model in escalation_models:
+            if adaptive_ensemble_settled(verdicts, escalated) or budget_exhausted(max_cost):
+                break
+            _, evaluation = await judge_single_leaf(leaf, docs_tree, agents.get(model), deps, model, system_prompt, retriever, stage="judge_escalation", provenance=provenance)
+            verdicts.append((model, evaluation))
+            escalated += 1
+
+        # Invalid verdicts are dropped unless no judge produced a valid one, so the leaf stays flagged as an error
+        counted = [(model, evaluation) for model, evaluation in verdicts if is_valid_verdict(evaluation)] or verdicts
+        combined = combine_leaf_evaluations([{leaf['path']: evaluation} for _, evaluation in counted], method)[leaf['path']]
+        combined["judges"] = [model for model, _ in counted]
+        combined["escalations"] = escalated
+        combined["settled"] = adaptive_ensemble_settled(verdicts, escalated)
+        if provenance is not None:
+            combined["provenance"] = merge_provenance([evaluation.get("provenance") for _, evaluation in counted])
+        return combined
+
+    tqdm.write(
+        f"Adaptive ensemble: {len(leaf_requirements)} requirements, {len(judge_models)} judges per leaf, "
+        f"up to {len(escalation_models)} escalations on disagreement, {batch_size} leaves in flight..."
+    )
+    scheduler = SlidingWindowScheduler(batch_size)
+    progress = tqdm(total=len(leaf_requirements), desc="Evaluating")
+
+    def record_result(leaf, result, timing):
+        progress.update(1)
+        if isinstance(result, Exception):
+            tqdm.write(f"!! Evaluation error for {leaf['requirement'][:50]}: {result} !!")
+            return
+        result["timing"] = {"queue_wait": timing.queue_wait, "latency": timing.latency}
+        evaluations[leaf['path']] = result
+        if checkpoint is not None:
+            checkpoint.append(leaf, result)
+        if running_score is not None:
+            running_score.record(leaf['path'], result["score"])
+            progress.set_postfix_str(running_score.describe())
+            running_score.publish()
+
+    if running_score is not None:
+        leaf_requirements = running_score.order(leaf_requirements)
+    await scheduler.run(leaf_requirements, judge_leaf, on_result=record_result, should_stop=lambda: budget_exhausted(max_cost))
+    progress.close()
+    if scheduler.stopped_early:
+        tqdm.write(f"!! Cost budget of ${max_cost:.2f} reached, {scheduler.not_started} leaves were not started !!")
+
+    escalated_leaves = sum(1 for evaluation in evaluations.values() if evaluation["escalations"] > 0)
+    judge_calls = sum(len(judge_models) + evaluation["escalations"] for evaluation in evaluations.values())
+    full_calls = len(evaluations) * (len(judge_models) + len(escalation_models))
+    tqdm.write(
+        f"Adaptive ensemble: {escalated_leaves}/{len(evaluations)} leaves escalated, "
+        f"{judge_calls} judge calls instead of {full_calls} for the full ensemble"
+    )
+    return evaluations
+
+def cascade_needs_escalation(evaluation, confidence_threshold):
+    """Whether a cheap verdict goes to the stronger judge: invalid, without a confidence, or not confident enough"""
+    confidence = evaluation.get("confidence")
+    return not is_valid_verdict(evaluation) or confidence is None or confidence < confidence_threshold
+
+async def evaluate_leaves_with_cascade(
+    leaf_requirements,
+    docs_tree,
+    agents = None,
+    deps: AgentDeps = None,
+    cheap_model: str = None,
+    strong_model: str = None,
+    batch_size=5,
+    checkpoint: EvaluationCheckpoint = None,
+    retriever: DocsRetriever = None,
+    max_cost: float = None,
+    confidence_threshold=0.8,
+    provenance: DocsProvenance = None,
+    running_score: RunningScore = None,
+):
+    """
+    Judge each leaf with cheap_model first and with strong_model only when the cheap verdict is
+    invalid or below confidence_threshold.
+
+    The final evaluation is the strong verdict when there is a valid one, otherwise the cheap
+    verdict; both are kept under "cascade" together with whether the leaf was escalated.
+    With tools, `agents` holds the "cheap" agent (built with CASCADE_SYSTEM_PROMPT) and the "strong" one.
+    """
+    agents = agents or {}
+    evaluations = {}
+
+    async def judge_leaf(leaf):
+        _, cheap = await judge_single_leaf(leaf, docs_tree, agents.get("cheap"), deps, cheap_model, CASCADE_SYSTEM_PROMPT, retriever, provenance=provenance)
+        verdicts = [{"model": cheap_model, **cheap}]
+        final = cheap
+        escalated = cascade_needs_escalation(cheap, confidence_threshold) and not budget_exhausted(max_cost)
+        if escalated:
+            _, strong = await judge_single_leaf(leaf, docs_tree, agents.get("strong"), deps, strong_model, EVALUATION_SYSTEM_PROMPT, retriever, stage="judge_cascade", provenance=provenance)
+            verdicts.append({"model": strong_model, **strong})
+            if is_valid_verdict(strong) or not is_valid_verdict(cheap):
+                final = strong
+
+        evaluation = {key: value for key, value in final.items() if key != "tokens"}
+        evaluation["tokens"] = {
+            "input": sum(verdict["tokens"]["input"] for verdict in verdicts),
+            "output": sum(verdict["tokens"]["output"] for verdict in verdicts),
+        }
+        evaluation["cascade"] = {"escalated": escalated, "verdicts": verdicts}
+        return evaluation
+
+    tqdm.write(
+        f"Cascade: {len(leaf_requirements)} requirements judged by {cheap_model}, escalated to {strong_model} "
+        f"below confidence {confidence_threshold}, {batch_size} leaves in flight..."
+    )
+    scheduler = SlidingWindowScheduler(batch_size)
+    progress = tqdm(total=len(leaf_requirements), desc="Evaluating")
 
+    def record_result(leaf, result, timing):
+        progress.update(1)
+        if isinstance(result, Exception):
+            tqdm.write(f"!! Evaluation error for {leaf['requirement'][:50]}: {result} !!")
+            return
+        result["timing"] = {"queue_wait": timing.queue_wait, "latency": timing.latency}
+        evaluations[leaf['path']] = result
+        if checkpoint is not None:
+            checkpoint.append(leaf, result)
+        if running_score is not None:
+            running_score.record(leaf['path'], result["score"])
+            progress.set_postfix_str(running_score.describe())
+            running_score.publish()
+
+    if running_score is not None:
+        leaf_requirements = running_score.order(leaf_requirements)
+    await scheduler.run(leaf_requirements, judge_leaf, on_result=record_result, should_stop=lambda: budget_exhausted(max_cost))
+    progress.close()
+    if scheduler.stopped_early:
+        tqdm.write(f"!! Cost budget of ${max_cost:.2f} reached, {scheduler.not_started} leaves were not started !!")
+
+    escalated_leaves = sum(1 for evaluation in evaluations.values() if evaluation["cascade"]["escalated"])
+    tqdm.write(f"Cascade: {escalated_leaves}/{len(evaluations)} leaves escalated to {strong_model}")
     return evaluations
 
 def calculate_scores_bottom_up(rubrics, leaf_evaluations):
@@ -434,98 +847,221 @@ def calculate_scores_bottom_up(rubrics, leaf_evaluations):
     
     return scored_rubrics
 
+def load_leaf_evaluations_from_results(evaluation_file, leaf_requirements):
+    """Leaf evaluations stored in a scored rubrics file, kept only where the requirement text still matches"""
+    with open(evaluation_file, "r") as f:
+        scored_rubrics = json.load(f)
+    if isinstance(scored_rubrics, dict):
+        scored_rubrics = scored_rubrics.get("rubrics", [])
+
+    requirements = {leaf["path"]: leaf["requirement"] for leaf in leaf_requirements}
+    evaluations = {}
+
+    def traverse(items, path=""):
+        for i, item in enumerate(items):
+            current_path = f"{path}.{i}" if path else str(i)
+            if is_leaf_node(item):
+                if "evaluation" in item and requirements.get(current_path) == item.get("requirements"):
+                    evaluations[current_path] = item["evaluation"]
+            else:
+                traverse(item["sub_tasks"], current_path)
+
+    traverse(scored_rubrics)
+    return evaluations
+
+def load_reusable_evaluations(checkpoint, leaf_requirements, evaluation_file=None, provenance: DocsProvenance = None):
+    """
+    Verdicts from earlier runs that do not need to be judged again.
+
+    Comes from the checkpoint, or from a finished results file when there is no checkpoint (the
+    checkpoint is then seeded with it). Error verdicts are never reused. With a provenance, verdicts
+    whose documentation inputs changed since they were made are returned separately as stale.
+
+    Returns:
+        Tuple of (reusable evaluations by path, set of stale paths)
+    """
+    previous = checkpoint.load(leaf_requirements)
+    if not previous and evaluation_file and os.path.exists(evaluation_file):
+        previous = load_leaf_evaluations_from_results(evaluation_file, leaf_requirements)
+        for leaf in leaf_requirements:
+            if leaf["path"] in previous:
+                checkpoint.append(leaf, previous[leaf["path"]])
+
+    reusable = {path: evaluation for path, evaluation in previous.items() if not is_error_evaluation(evaluation)}
+    stale = set()
+    if provenance is not None:
+        stale = {path for path, evaluation in reusable.items() if not provenance.is_current(evaluation.get("provenance"))}
+    return {path: evaluation for path, evaluation in reusable.items() if path not in stale}, stale
+
 # --- Run ---
-async def run(args):
-    # Setup paths automatically from repo name
-    base_path = config.get_data_path(args.repo_name)
-    docs_path = os.path.join(base_path, args.reference)
-    docs_tree_path = os.path.join(docs_path, "docs_tree.json")
-    output_dir = base_path
-    
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    # Load docs tree
-    with open(docs_tree_path, "r") as f:
-        docs_tree = json.load(f)
-    
-    # New evaluation logic
-    # Load existing rubrics
-    rubrics_file = args.rubrics_file or os.path.join(output_dir, "rubrics", "combined_rubrics.json")
-    
-    if not os.path.exists(rubrics_file):
-        print(f"Rubrics file not found: {rubrics_file}")
+_logfire_configured = False
+
+def configure_logfire():
+    """Set up logfire tracing of agent runs, once per process"""
+    global _logfire_configured
+    if _logfire_configured:
         return
-    
-    with open(rubrics_file, "r") as f:
-        rubrics = json.load(f)
-        if "rubrics" in rubrics:
-            rubrics = rubrics["rubrics"]
-    
-    print(f"Loaded rubrics from: {rubrics_file}")
+    _logfire_configured = True
+    try:
+        import logfire
+        logfire.configure()
+        logfire.instrument_pydantic_ai()
+    except Exception as e:
+        print(f"Failed to configure logfire: {e}")
 
-    # check if evaluation file already exists
-    evaluation_folder = os.path.join(output_dir, args.reference, "evaluation_results")
-    if not os.path.exists(evaluation_folder):
-        os.makedirs(evaluation_folder)
+def build_evaluation_agent(model, system_prompt=EVALUATION_SYSTEM_PROMPT):
+    """Tool-using judge agent that navigates the documentation; the agent sends `system_prompt` with every run"""
+    from pydantic_ai import Agent
+    from tools import AgentDeps, docs_navigator_tool
+
+    configure_logfire()
+    tools = [docs_navigator_tool]
+    return Agent(
+        model=get_llm(model),
+        deps_type=AgentDeps,
+        system_prompt=system_prompt,
+        tools=tools
+    )
+
+def sanitize_model_name(model):
+    """Model name as used in result file names (slashes in the model name would create subfolders)"""
+    return model.replace("/", "_") if model else "default"
+
+def model_evaluation_file(evaluation_folder, model):
+    """Results file of one judge model"""
+    return os.path.join(evaluation_folder, f"{sanitize_model_name(model)}.json")
+
+def parse_model_concurrency(spec, models, default):
+    """Parse 'model=N,model=N' into a per-model in-flight limit, defaulting to --batch-size"""
+    limits = {model: default for model in models}
+    for entry in (spec or "").split(","):
+        if "=" in entry:
+            name, value = entry.rsplit("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+async def evaluate_model(args, model, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder, batch_size, triage=None):
+    """
+    Evaluate all leaves with one judge model and save its scored rubrics; returns the evaluation file or None.
+    `triage` holds the LeafTriage decision of every leaf when --triage is on.
+    """
     # Sanitize model name to avoid path issues with forward slashes
-    sanitized_model = args.model.replace("/", "_") if args.model else "default"
-    evaluation_file = os.path.join(evaluation_folder, f"{sanitized_model}.json")
+    sanitized_model = sanitize_model_name(model)
+    evaluation_file = model_evaluation_file(evaluation_folder, model)
     
-    if os.path.exists(evaluation_file):
+    if os.path.exists(evaluation_file) and not args.incremental:
         print(f"Evaluation file already exists: {evaluation_file}")
-        return
+        return evaluation_file
 
     # Setup evaluation agent
-    deps = AgentDeps(docs_path)
-    
-    if args.use_tools:
-        tools = [docs_navigator_tool]
-        agent = Agent(
-            model=get_llm(args.model),
-            deps_type=AgentDeps,
-            system_prompt=EVALUATION_SYSTEM_PROMPT,
-            tools=tools
-        )
-    
-    else:
-        tools = []
-        agent = None
-    
-    
-    # Collect all leaf requirements
-    leaf_requirements = collect_leaf_requirements(rubrics)
-    print(f"Found {len(leaf_requirements)} leaf requirements to evaluate")
+    agent = build_evaluation_agent(model) if args.use_tools else None
+
+    # Resume from the checkpoint of an interrupted run: only missing or errored leaves are evaluated,
+    # plus, with --incremental, leaves whose documentation inputs changed since their verdict
+    checkpoint = EvaluationCheckpoint(os.path.join(evaluation_folder, "checkpoints", f"{sanitized_model}.jsonl"))
+    completed, stale = load_reusable_evaluations(
+        checkpoint, leaf_requirements, evaluation_file, provenance if args.incremental else None
+    )
+    if args.triage != "resolve":
+        # Leaves resolved by triage in an earlier run get a real verdict unless triage may resolve them again
+        completed = {path: evaluation for path, evaluation in completed.items() if not evaluation.get("reasoning", "").startswith("[TRIAGE]")}
+    # Leaves are judged by the weight they carry in the overall score, which is published as they finish
+    running_score = RunningScore(effective_weights(rubrics), os.path.join(evaluation_folder, "progress", f"{sanitized_model}.json"))
+    for path, evaluation in completed.items():
+        running_score.record(path, evaluation.get("score", 0))
+    pending_leaves = running_score.order([leaf for leaf in leaf_requirements if leaf["path"] not in completed])
+    if triage is not None and args.triage == "resolve":
+        # Obvious leaves are scored from the triage decision and checkpointed like any other verdict
+        resolved = [leaf for leaf in pending_leaves if triage[leaf["path"]].decision]
+        for leaf in resolved:
+            evaluation = LeafTriage.evaluation(triage[leaf["path"]])
+            checkpoint.append(leaf, evaluation)
+            running_score.record(leaf["path"], evaluation["score"])
+        pending_leaves = [leaf for leaf in pending_leaves if not triage[leaf["path"]].decision]
+        print(f"[{model}] Triage resolved {len(resolved)} leaves without the judge, {len(pending_leaves)} left for {model}")
+    if completed or stale:
+        print(f"[{model}] Resuming from checkpoint {checkpoint.path}: {len(completed)} leaves done, "
+              f"{len(stale)} stale after docs changes, {len(pending_leaves)} to evaluate")
+    if not pending_leaves and os.path.exists(evaluation_file):
+        print(f"[{model}] Evaluation is up to date: {evaluation_file}")
+        return evaluation_file
     
     # Evaluate each leaf requirement
-    print("Starting evaluation...")
-    leaf_evaluations = await evaluate_leaf_requirements(
-        leaf_requirements,
+    print(f"[{model}] Starting evaluation...")
+    new_evaluations = await evaluate_leaf_requirements(
+        pending_leaves,
         docs_tree,
         agent,
         deps,
-        args.batch_size,
+        batch_size,
         args.enable_retry,
         args.max_retries,
-        args.model,
+        model,
         EVALUATION_SYSTEM_PROMPT,
+        checkpoint,
+        args.criteria_per_prompt,
+        retriever,
+        args.max_cost,
+        provenance,
+        running_score,
+        args.score_tolerance,
     )
 
+    # Build the final results from everything the checkpoint has recorded, except stale verdicts
+    # that were not judged again (e.g. because the cost budget ran out)
+    leaf_evaluations = checkpoint.load(leaf_requirements)
+    for path in stale - set(new_evaluations):
+        leaf_evaluations.pop(path, None)
+
+    # Save the cost ledger of this model's calls next to the results
+    ledger = current_usage_ledger()
+    model_usage = ledger.by_model.get(model or config.MODEL, Usage())
+    usage_file = os.path.join(evaluation_folder, "usage", f"{sanitized_model}.json")
+    Path(os.path.dirname(usage_file)).mkdir(parents=True, exist_ok=True)
+    with open(usage_file, "w") as f:
+        json.dump(ledger.summary(), f, indent=2)
+    print(f"[{model}] Usage ledger saved to: {usage_file}")
+
+    budgeted = [evaluation["budget"] for evaluation in leaf_evaluations.values() if "budget" in evaluation]
+    if budgeted:
+        forced = sum(1 for budget in budgeted if budget["forced_verdict"])
+        most_calls = max(budget["tool_calls"] for budget in budgeted)
+        slowest = max(budget["seconds"] for budget in budgeted)
+        print(f"[{model}] Agent budget: {forced}/{len(budgeted)} leaves ran out and got a forced verdict "
+              f"(at most {most_calls} tool calls, slowest leaf {slowest:.1f}s)")
+
+    missing = [leaf["path"] for leaf in leaf_requirements if leaf["path"] not in leaf_evaluations]
+    if missing and budget_exhausted(args.max_cost):
+        print(f"[{model}] Cost budget of ${args.max_cost:.2f} reached with {len(missing)} leaves left; "
+              f"rerun with a higher --max-cost to resume from {checkpoint.path}")
+        return None
+    if missing and running_score.settled(args.score_tolerance):
+        # Leaves that were never started get the evaluated leaves' weighted mean, which keeps the overall
+        # score inside the published bounds; they are not checkpointed, so --incremental judges them later
+        print(f"[{model}] Overall score settled within {args.score_tolerance} ({running_score.describe()}) "
+              f"with {len(missing)} leaves unevaluated; rerun with --incremental to judge them")
+        fill_score = running_score.estimate if running_score.estimate is not None else 0.5
+        for path in missing:
+            leaf_evaluations[path] = {
+                "score": fill_score,
+                "reasoning": "Not evaluated: the run stopped once the overall score was within --score-tolerance",
+                "evidence": "",
+                "tokens": {"input": 0, "output": 0},
+                "estimated": True,
+            }
+
+    if triage is not None:
+        report_triage(args, model, triage, leaf_evaluations, evaluation_folder)
+
     # Calculate scores bottom-up
-    print("Calculating scores...")
+    print(f"[{model}] Calculating scores...")
     scored_rubrics = calculate_scores_bottom_up(rubrics, leaf_evaluations)
     
     # Save results
     with open(evaluation_file, "w") as f:
         json.dump(scored_rubrics, f, indent=2)
     
-    print(f"Evaluation results saved to: {evaluation_file}")
-    
-    # Calculate and display summary statistics
-    total_tokens = sum(eval_data.get("tokens", {}).get("input", 0) + eval_data.get("tokens", {}).get("output", 0) 
-                      for eval_data in leaf_evaluations.values())
-    total_cost = sum(eval_data.get("tokens", {}).get("input", 0) * 3/1e6 + eval_data.get("tokens", {}).get("output", 0) * 15/1e6 
-                    for eval_data in leaf_evaluations.values())
+    print(f"[{model}] Evaluation results saved to: {evaluation_file}")
     
     # Count retry statistics
     retry_count = sum(1 for eval_data in leaf_evaluations.values() if eval_data.get("retry_count", 0) > 0)
@@ -533,21 +1069,415 @@ async def run(args):
                      if any(keyword in eval_data.get("reasoning", "").lower() for keyword in ["error", "failed"]))
     
     print("-" * 100)
-    print("EVALUATION SUMMARY:")
+    print(f"EVALUATION SUMMARY ({model or config.MODEL}):")
     print(f"Total leaf requirements evaluated: {len(leaf_requirements)}")
+    print(f"Leaves resumed from checkpoint: {len(completed)}")
+    if args.incremental:
+        print(f"Leaves re-evaluated after docs changes: {len(stale)}")
     print(f"Requirements that needed retry: {retry_count}")
     print(f"Requirements with final errors: {error_count}")
-    print(f"Total tokens used: {total_tokens}")
-    print(f"Total cost: ${total_cost:.4f}")
+    # Usage of this run only; resumed leaves were paid for earlier
+    print(f"Total tokens used: {model_usage.input_tokens + model_usage.output_tokens} (input {model_usage.input_tokens}, output {model_usage.output_tokens})")
+    print(f"Total cost: ${model_usage.cost:.4f}")
     
     # Calculate overall score
     overall_score = sum(item["score"] * item["weight"] for item in scored_rubrics) / sum(item["weight"] for item in scored_rubrics)
     print(f"Overall documentation score: {overall_score:.4f}")
     print("-" * 100)
+    return evaluation_file
+
+def report_triage(args, model, triage, leaf_evaluations, evaluation_folder):
+    """Attach triage decisions to the judged leaves and save how often they agreed with the LLM"""
+    for path, evaluation in leaf_evaluations.items():
+        if path in triage and "triage" not in evaluation:
+            evaluation["triage"] = asdict(triage[path])
+    agreement = LeafTriage.agreement(triage, {path: evaluation for path, evaluation in leaf_evaluations.items() if is_valid_verdict(evaluation)})
+    report = {
+        "mode": args.triage,
+        "covered_threshold": args.triage_covered,
+        "absent_threshold": args.triage_absent,
+        "agreement": agreement,
+        "decisions": {path: asdict(decision) for path, decision in triage.items()},
+    }
+    sanitized_model = sanitize_model_name(model)
+    triage_file = os.path.join(evaluation_folder, "triage", f"{sanitized_model}.json")
+    Path(os.path.dirname(triage_file)).mkdir(parents=True, exist_ok=True)
+    with open(triage_file, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for label in ("covered", "absent"):
+        stats = agreement[label]
+        rate = f"{stats['agreement']:.0%}" if stats["agreement"] is not None else "-"
+        print(f"[{model}] Triage '{label}': {stats['flagged']} leaves flagged, judge agreed on {stats['agreed']}/{stats['judged']} ({rate})")
+    print(f"[{model}] Triage report saved to: {triage_file}")
+
+async def evaluate_model_sample(args, model, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder, batch_size):
+    """Judge a stratified sample of the leaves with one model and save the estimated overall score; returns the sample file"""
+    sanitized_model = sanitize_model_name(model)
+    sample = StratifiedSample(leaf_requirements, effective_weights(rubrics), args.sample, args.sample_seed)
+    sampled_leaves = sample.leaves
+    # The per-item minimum can push the sample above the requested fraction on small rubrics
+    sampled_fraction = len(sampled_leaves) / len(leaf_requirements) if leaf_requirements else 0.0
+    print(f"[{model}] Sampling {len(sampled_leaves)} of {len(leaf_requirements)} leaves ({sampled_fraction:.0%}, {args.sample:.0%} requested) "
+          f"across {len(sample.strata)} top-level items (seed {args.sample_seed})")
+
+    agent = build_evaluation_agent(model) if args.use_tools else None
+    # Sampled verdicts stay out of the checkpoint, so a sample never passes for a partial full run
+    evaluations = await evaluate_leaf_requirements(
+        sampled_leaves,
+        docs_tree,
+        agent,
+        deps,
+        batch_size,
+        args.enable_retry,
+        args.max_retries,
+        model,
+        EVALUATION_SYSTEM_PROMPT,
+        None,
+        args.criteria_per_prompt,
+        retriever,
+        args.max_cost,
+        provenance,
+    )
+
+    estimate = sample.estimate({path: evaluation["score"] for path, evaluation in evaluations.items()}, args.confidence)
+    model_usage = current_usage_ledger().by_model.get(model or config.MODEL, Usage())
+    result = {
+        "model": model or config.MODEL,
+        "fraction": args.sample,
+        "sampled_fraction": sampled_fraction,
+        "seed": args.sample_seed,
+        **estimate,
+        "cost": model_usage.cost,
+        "leaf_evaluations": evaluations,
+    }
+    sample_file = os.path.join(evaluation_folder, "samples", f"{sanitized_model}_sample{args.sample:g}_seed{args.sample_seed}.json")
+    Path(os.path.dirname(sample_file)).mkdir(parents=True, exist_ok=True)
+    with open(sample_file, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print("-" * 100)
+    print(f"SAMPLE SUMMARY ({model or config.MODEL}):")
+    print(f"Leaves judged: {estimate['sampled_leaves']} of {estimate['total_leaves']}")
+    print(f"Estimated overall score: {estimate['estimate']:.4f} ± {estimate['std_error']:.4f} "
+          f"({estimate['confidence']:.0%} interval [{estimate['lower']:.4f}, {estimate['upper']:.4f}])")
+    print(f"Total cost: ${model_usage.cost:.4f}")
+    print(f"Sample results saved to: {sample_file}")
+    print("-" * 100)
+    return sample_file
+
+async def evaluate_cascade(args, cheap_model, strong_model, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder):
+    """
+    Evaluate all leaves with the cheap-to-strong cascade and save its scored rubrics; returns the evaluation file or None.
+    The result goes to evaluation_results/cascade/, so it is not mistaken for one more judge when per-model results are combined.
+    """
+    cascade_name = f"cascade_{sanitize_model_name(cheap_model)}_to_{sanitize_model_name(strong_model)}"
+    evaluation_file = model_evaluation_file(os.path.join(evaluation_folder, "cascade"), f"{cheap_model}_to_{strong_model}")
+    Path(os.path.dirname(evaluation_file)).mkdir(parents=True, exist_ok=True)
+    if os.path.exists(evaluation_file) and not args.incremental:
+        print(f"Evaluation file already exists: {evaluation_file}")
+        return evaluation_file
+
+    agents = {}
+    if args.use_tools:
+        # The cheap agent has to be asked for a confidence, or no leaf could stay with it
+        agents = {"cheap": build_evaluation_agent(cheap_model, CASCADE_SYSTEM_PROMPT), "strong": build_evaluation_agent(strong_model)}
+
+    checkpoint = EvaluationCheckpoint(os.path.join(evaluation_folder, "checkpoints", f"{cascade_name}.jsonl"))
+    completed, stale = load_reusable_evaluations(
+        checkpoint, leaf_requirements, evaluation_file, provenance if args.incremental else None
+    )
+    running_score = RunningScore(effective_weights(rubrics), os.path.join(evaluation_folder, "progress", f"{cascade_name}.json"))
+    for path, evaluation in completed.items():
+        running_score.record(path, evaluation.get("score", 0))
+    pending_leaves = [leaf for leaf in leaf_requirements if leaf["path"] not in completed]
+    if completed or stale:
+        print(f"Resuming from checkpoint {checkpoint.path}: {len(completed)} leaves done, "
+              f"{len(stale)} stale after docs changes, {len(pending_leaves)} to evaluate")
+    if not pending_leaves and os.path.exists(evaluation_file):
+        print(f"Evaluation is up to date: {evaluation_file}")
+        return evaluation_file
+
+    print("Starting cascade evaluation...")
+    new_evaluations = await evaluate_leaves_with_cascade(
+        pending_leaves,
+        docs_tree,
+        agents,
+        deps,
+        cheap_model,
+        strong_model,
+        args.batch_size,
+        checkpoint,
+        retriever,
+        args.max_cost,
+        args.confidence_threshold,
+        provenance,
+        running_score,
+    )
+
+    leaf_evaluations = checkpoint.load(leaf_requirements)
+    for path in stale - set(new_evaluations):
+        leaf_evaluations.pop(path, None)
+
+    ledger = current_usage_ledger()
+    usage_file = os.path.join(evaluation_folder, "usage", f"{cascade_name}.json")
+    Path(os.path.dirname(usage_file)).mkdir(parents=True, exist_ok=True)
+    with open(usage_file, "w") as f:
+        json.dump(ledger.summary(), f, indent=2)
+    print(f"Usage ledger saved to: {usage_file}")
+
+    missing = [leaf["path"] for leaf in leaf_requirements if leaf["path"] not in leaf_evaluations]
+    if missing and budget_exhausted(args.max_cost):
+        print(f"Cost budget of ${args.max_cost:.2f} reached with {len(missing)} leaves left; "
+              f"rerun with a higher --max-cost to resume from {checkpoint.path}")
+        return None
+
+    scored_rubrics = calculate_scores_bottom_up(rubrics, leaf_evaluations)
+    with open(evaluation_file, "w") as f:
+        json.dump(scored_rubrics, f, indent=2)
+
+    escalated = sum(1 for evaluation in leaf_evaluations.values() if evaluation.get("cascade", {}).get("escalated"))
+    overall_score = sum(item["score"] * item["weight"] for item in scored_rubrics) / sum(item["weight"] for item in scored_rubrics)
+    print(f"Cascade results saved to: {evaluation_file}")
+    print("-" * 100)
+    print("CASCADE SUMMARY:")
+    print(f"Total leaf requirements evaluated: {len(leaf_requirements)}")
+    print(f"Leaves escalated to {strong_model}: {escalated} ({escalated / max(1, len(leaf_evaluations)):.1%})")
+    for model in (cheap_model, strong_model):
+        model_usage = ledger.by_model.get(model, Usage())
+        print(f"  - {model}: {model_usage.requests} requests, ${model_usage.cost:.4f}")
+    print(f"Total cost: ${ledger.total_cost:.4f}")
+    print(f"Overall documentation score: {overall_score:.4f}")
+    print("-" * 100)
+    return evaluation_file
+
+async def evaluate_adaptive_ensemble(args, judge_models, escalation_models, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder):
+    """Evaluate all leaves with the adaptive ensemble and save the combined results; returns the results file or None"""
+    evaluation_file = os.path.join(evaluation_folder, "combined_adaptive_ensemble.json")
+    if os.path.exists(evaluation_file) and not args.incremental:
+        print(f"Evaluation file already exists: {evaluation_file}")
+        return evaluation_file
+
+    agents = {model: build_evaluation_agent(model) for model in judge_models + escalation_models} if args.use_tools else {}
+
+    checkpoint = EvaluationCheckpoint(os.path.join(evaluation_folder, "checkpoints", "adaptive_ensemble.jsonl"))
+    completed, stale = load_reusable_evaluations(
+        checkpoint, leaf_requirements, evaluation_file, provenance if args.incremental else None
+    )
+    running_score = RunningScore(effective_weights(rubrics), os.path.join(evaluation_folder, "progress", "adaptive_ensemble.json"))
+    for path, evaluation in completed.items():
+        running_score.record(path, evaluation.get("score", 0))
+    pending_leaves = [leaf for leaf in leaf_requirements if leaf["path"] not in completed]
+    if completed or stale:
+        print(f"Resuming from checkpoint {checkpoint.path}: {len(completed)} leaves done, "
+              f"{len(stale)} stale after docs changes, {len(pending_leaves)} to evaluate")
+    if not pending_leaves and os.path.exists(evaluation_file):
+        print(f"Evaluation is up to date: {evaluation_file}")
+        return evaluation_file
+
+    print("Starting adaptive ensemble evaluation...")
+    new_evaluations = await evaluate_leaves_adaptively(
+        pending_leaves,
+        docs_tree,
+        agents,
+        deps,
+        judge_models,
+        escalation_models,
+        args.batch_size,
+        EVALUATION_SYSTEM_PROMPT,
+        checkpoint,
+        retriever,
+        args.max_cost,
+        args.combination_method,
+        provenance,
+        running_score,
+    )
+
+    leaf_evaluations = checkpoint.load(leaf_requirements)
+    for path in stale - set(new_evaluations):
+        leaf_evaluations.pop(path, None)
+
+    ledger = current_usage_ledger()
+    usage_file = os.path.join(evaluation_folder, "usage", "adaptive_ensemble.json")
+    Path(os.path.dirname(usage_file)).mkdir(parents=True, exist_ok=True)
+    with open(usage_file, "w") as f:
+        json.dump(ledger.summary(), f, indent=2)
+    print(f"Usage ledger saved to: {usage_file}")
+
+    missing = [leaf["path"] for leaf in leaf_requirements if leaf["path"] not in leaf_evaluations]
+    if missing and budget_exhausted(args.max_cost):
+        print(f"Cost budget of ${args.max_cost:.2f} reached with {len(missing)} leaves left; "
+              f"rerun with a higher --max-cost to resume from {checkpoint.path}")
+        return None
+
+    result, _ = finalize_combined_results(rubrics, leaf_evaluations, args.combination_method, len(judge_models) + len(escalation_models))
+    metadata = result["combination_metadata"]
+    metadata["judge_models"] = judge_models
+    metadata["escalation_models"] = escalation_models
+    metadata["escalated_leaves"] = sum(1 for evaluation in leaf_evaluations.values() if evaluation.get("escalations", 0) > 0)
+    metadata["unsettled_leaves"] = sum(1 for evaluation in leaf_evaluations.values() if not evaluation.get("settled", True))
+    with open(evaluation_file, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"Adaptive ensemble results saved to: {evaluation_file}")
+    print("-" * 100)
+    print("ADAPTIVE ENSEMBLE SUMMARY:")
+    print(f"Total leaf requirements evaluated: {len(leaf_requirements)}")
+    print(f"Leaves escalated beyond the cheap judges: {metadata['escalated_leaves']}")
+    print(f"Leaves still split after all escalations: {metadata['unsettled_leaves']}")
+    print(f"Total cost: ${ledger.total_cost:.4f}")
+    print(f"Overall combined score: {metadata['overall_score']:.4f} ± {metadata['overall_std']:.4f}")
+    print("-" * 100)
+    return evaluation_file
+
+async def run(args):
+    # Setup paths automatically from repo name
+    base_path = config.get_data_path(args.repo_name)
+    docs_path = os.path.join(base_path, args.reference)
+    docs_tree_path = os.path.join(docs_path, "docs_tree.json")
+    output_dir = base_path
+    
+    # Create output directory if it doesn't exist
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    # Load docs tree
+    with open(docs_tree_path, "r") as f:
+        docs_tree = json.load(f)
+    
+    # New evaluation logic
+    # Load existing rubrics
+    rubrics_file = args.rubrics_file or os.path.join(output_dir, "rubrics", "combined_rubrics.json")
+    
+    if not os.path.exists(rubrics_file):
+        print(f"Rubrics file not found: {rubrics_file}")
+        return
+    
+    with open(rubrics_file, "r") as f:
+        rubrics = json.load(f)
+        if "rubrics" in rubrics:
+            rubrics = rubrics["rubrics"]
+    
+    print(f"Loaded rubrics from: {rubrics_file}")
+
+    evaluation_folder = os.path.join(output_dir, args.reference, "evaluation_results")
+    if not os.path.exists(evaluation_folder):
+        os.makedirs(evaluation_folder)
+
+    models = [model.strip() for model in args.models.split(",") if model.strip()] if args.models else [args.model]
+    concurrency = parse_model_concurrency(args.model_concurrency, models, args.batch_size)
+
+    response_cache = configure_response_cache(args.cache_mode)
+    hedger = configure_hedging(args.hedge_fraction, args.hedge_percentile)
+    leaf_budget = configure_agent_budget(args.max_tool_calls, args.max_leaf_tokens, args.max_leaf_seconds)
+    if leaf_budget is not None and not args.use_tools:
+        print("Per-leaf agent budgets only apply with --use-tools; ignoring them")
+    if args.stream:
+        config.LLM_STREAM = True
+
+    # Nothing to do when every model already has its results (checked before loading the docs)
+    if not (args.incremental or args.adaptive_ensemble or args.combine or args.sample or args.cascade_model):
+        evaluation_files = [model_evaluation_file(evaluation_folder, model) for model in models]
+        if all(os.path.exists(evaluation_file) for evaluation_file in evaluation_files):
+            for evaluation_file in evaluation_files:
+                print(f"Evaluation file already exists: {evaluation_file}")
+            return
+
+    from tools import AgentDeps
+
+    # Docs, navigator and retriever are loaded once and shared by every judge model
+    deps = AgentDeps(docs_path)
+    
+    retriever = None
+    if args.retrieval_top_k > 0:
+        retriever = DocsRetriever(docs_tree, deps.docs_navigator.structured_docs, top_k=args.retrieval_top_k)
+        print(f"Retrieval enabled: top {args.retrieval_top_k} of {len(retriever.sections)} documentation sections per criteria")
+        if args.retrieval_embeddings:
+            await retriever.prepare_embeddings()
+
+    # Content hashes of the docs each verdict relied on, so --incremental can skip unchanged leaves
+    provenance = DocsProvenance(docs_tree, deps.docs_navigator.structured_docs, retriever.skeleton if retriever else None)
+
+    # Collect all leaf requirements
+    leaf_requirements = collect_leaf_requirements(rubrics)
+    print(f"Found {len(leaf_requirements)} leaf requirements to evaluate")
+
+    triage = None
+    if args.triage != "off":
+        triage_retriever = retriever
+        if triage_retriever is None:
+            triage_retriever = DocsRetriever(docs_tree, deps.docs_navigator.structured_docs)
+            if args.retrieval_embeddings:
+                await triage_retriever.prepare_embeddings()
+        triage = await LeafTriage(triage_retriever, args.triage_covered, args.triage_absent).assess(leaf_requirements)
+        decided = Counter(decision.decision for decision in triage.values())
+        print(f"Triage ({args.triage}): {decided['covered']} leaves look covered, {decided['absent']} look absent, "
+              f"{decided[None]} need the judge")
+    if args.sample:
+        # A sample only estimates the score, so it writes no evaluation files to combine
+        await asyncio.gather(*(
+            in_ledger_scope(evaluate_model_sample(args, model, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder, concurrency[model]))
+            for model in models
+        ))
+        evaluation_files = []
+    elif args.cascade_model:
+        evaluation_files = [await evaluate_cascade(args, models[0], args.cascade_model, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder)]
+    elif args.adaptive_ensemble:
+        args.combination_method = args.combination_method or "majority_vote"
+        escalation_models = [model.strip() for model in (args.escalation_models or "").split(",") if model.strip()]
+        evaluation_files = [await evaluate_adaptive_ensemble(args, models, escalation_models, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder)]
+    else:
+        if len(models) > 1:
+            print(f"Evaluating {len(models)} models concurrently: " + ", ".join(f"{model} ({concurrency[model]} in flight)" for model in models))
+        evaluation_files = await asyncio.gather(*(
+            in_ledger_scope(evaluate_model(args, model, rubrics, leaf_requirements, docs_tree, deps, retriever, provenance, evaluation_folder, concurrency[model], triage))
+            for model in models
+        ))
+
+    ledger = current_usage_ledger()
+    if len(models) > 1:
+        print(f"Total cost across models: ${ledger.total_cost:.4f}")
+    for stage, stage_usage in ledger.by_stage.items():
+        print(f"  - {stage}: {stage_usage.requests} requests, ${stage_usage.cost:.4f}")
+    if response_cache.enabled:
+        cache_stats = response_cache.stats()
+        print(f"Response cache ({cache_stats['mode']}): {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['writes']} writes")
+    for model, stream_stats in get_stream_profiler().summary().items():
+        print(f"  - {model} streaming: {stream_stats['stopped_early']} of {stream_stats['streams']} streams stopped at the verdict, "
+              f"time to first token p50 {stream_stats['ttft_p50']:.2f}s (p95 {stream_stats['ttft_p95']:.2f}s), "
+              f"time to verdict p50 {stream_stats['time_to_answer_p50']:.2f}s (p95 {stream_stats['time_to_answer_p95']:.2f}s)")
+    if hedger.enabled:
+        hedge_stats = hedger.stats()
+        print(f"Hedging: {hedge_stats['hedged']} of {hedge_stats['calls']} requests hedged ({hedge_stats['hedged_fraction']:.1%}), duplicate answered first {hedge_stats['hedge_wins']} times")
+    router = get_router()
+    if len(router.endpoints) > 1:
+        route_stats = router.stats()
+        print(f"Endpoints: {route_stats['failovers']} failovers")
+        for name, endpoint_stats in route_stats["endpoints"].items():
+            latency = f"{endpoint_stats['latency']:.2f}s" if endpoint_stats["latency"] is not None else "-"
+            print(f"  - {name}: {endpoint_stats['requests']} requests, {endpoint_stats['failures']} failures, "
+                  f"{endpoint_stats['ejections']} ejections, latency {latency}{'' if endpoint_stats['healthy'] else ' (ejected)'}")
+
+    # Optionally write the combined file directly instead of running combine_evaluations.py afterwards
+    if args.combine and len(models) > 1 and not args.adaptive_ensemble:
+        if not all(evaluation_files):
+            print("Skipping combination: not every model finished its evaluation")
+            return
+        evaluations = []
+        for evaluation_file in evaluation_files:
+            with open(evaluation_file, "r") as f:
+                evaluations.append(json.load(f))
+        result, _, _ = build_combined_results(evaluations, args.combination_method or "average")
+        combined_file = os.path.join(evaluation_folder, "combined_evaluation_results.json")
+        with open(combined_file, "w") as f:
+            json.dump(result, f, indent=2)
+        metadata = result["combination_metadata"]
+        print(f"Combined evaluation results saved to: {combined_file}")
+        print(f"Overall combined score: {metadata['overall_score']:.4f} ± {metadata['overall_std']:.4f}")
 
 
 if __name__ == "__main__":
     args = parse_args()
-    asyncio.run(run(args))
+    config.print_settings()
+    asyncio.run(closing_clients(run(args)))
 
 
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+import judge
+from llm import closing_clients, get_rate_limiter, get_usage_ledger, ledger_scope
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate a matrix of repos x references x models in one process")
+    parser.add_argument("--repos", default="all", help="Comma-separated repository names, or 'all' for every repo with rubrics in the data directory (default: all)")
+    parser.add_argument("--references", default="all", help="Comma-separated reference folders (e.g. 'deepwiki,codewiki'), or 'all' for every folder with a docs_tree.json (default: all)")
+    parser.add_argument("--models", required=True, help="Comma-separated list of judge models")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="Maximum LLM requests in flight across the whole matrix (default: 32)")
+    parser.add_argument("--provider-limits", help="Per-provider or per-model in-flight limits as 'provider=N,model=N' (e.g. 'gemini=8,kimi-k2-instruct=4')")
+    parser.add_argument("--max-jobs", type=int, default=0, help="Maximum (repo, reference) jobs loaded at once; 0 loads them all (default: 0)")
+    parser.add_argument("--judge-args", default="", help="Extra arguments passed to every judge run, e.g. \"--use-tools --criteria-per-prompt 4\"")
+    parser.add_argument("--summary-file", help="Where to write the run summary (default: <data dir>/benchmark_runs/<timestamp>.json)")
+    return parser.parse_args()
+
+def find_rubrics_file(repo_name):
+    """Rubrics of a repo: the generated combined_rubrics.json, or the rubrics.json shipped with the dataset"""
+    for candidate in (("rubrics", "combined_rubrics.json"), ("rubrics.json",)):
+        path = config.get_data_path(repo_name, *candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+def discover_matrix(repos, references):
+    """List the (repo, reference, rubrics file) jobs that have both rubrics and a documentation tree"""
+    if repos == "all":
+        repo_names = sorted(name for name in os.listdir(config.DATA_DIR) if find_rubrics_file(name))
+    else:
+        repo_names = [name.strip() for name in repos.split(",") if name.strip()]
+
+    matrix = []
+    for repo_name in repo_names:
+        rubrics_file = find_rubrics_file(repo_name)
+        if rubrics_file is None:
+            print(f"Skipping {repo_name}: no rubrics found")
+            continue
+
+        if references == "all":
+            repo_path = config.get_data_path(repo_name)
+            reference_names = sorted(
+                name for name in os.listdir(repo_path)
+                if os.path.exists(os.path.join(repo_path, name, "docs_tree.json"))
+            )
+        else:
+            reference_names = [name.strip() for name in references.split(",") if name.strip()]
+
+        for reference in reference_names:
+            if not os.path.exists(config.get_data_path(repo_name, reference, "docs_tree.json")):
+                print(f"Skipping {repo_name}/{reference}: docs_tree.json not found")
+                continue
+            matrix.append((repo_name, reference, rubrics_file))
+    return matrix
+
+def parse_limits(spec):
+    """Parse 'name=N,name=N' into a dict"""
+    limits = {}
+    for entry in (spec or "").split(","):
+        if "=" in entry:
+            name, value = entry.rsplit("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+async def run(args):
+    matrix = discover_matrix(args.repos, args.references)
+    if not matrix:
+        print("No (repo, reference) pairs with rubrics and a docs_tree.json found")
+        return
+
+    # In-flight limits live in the shared rate limiter, so they hold across every job and model
+    limiter = get_rate_limiter()
+    limiter.configure_in_flight(args.max_in_flight, parse_limits(args.provider_limits))
+
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    print(f"Evaluating {len(matrix)} (repo, reference) pairs x {len(models)} models with at most {args.max_in_flight} requests in flight")
+
+    job_slots = asyncio.Semaphore(args.max_jobs) if args.max_jobs > 0 else None
+    job_results = []
+
+    async def run_job(repo_name, reference, rubrics_file):
+        # Each job may keep the whole global budget busy; the limiter decides who actually runs
+        judge_args = judge.parse_args(
+            ["--repo-name", repo_name, "--reference", reference, "--rubrics-file", rubrics_file, "--models", ",".join(models),
+             "--batch-size", str(args.max_in_flight)] + args.judge_args.split()
+        )
+        started = time.monotonic()
+        # Jobs share the process, so each one reports and budgets (--max-cost) against a ledger of its own
+        with ledger_scope() as job_ledger:
+            try:
+                if job_slots is None:
+                    await judge.run(judge_args)
+                else:
+                    async with job_slots:
+                        await judge.run(judge_args)
+                status = "done"
+            except Exception as e:
+                print(f"!! {repo_name}/{reference} failed: {e} !!")
+                status = f"failed: {e}"
+        job_results.append({
+            "repo_name": repo_name,
+            "reference": reference,
+            "status": status,
+            "wall_time": time.monotonic() - started,
+            "usage": job_ledger.summary(include_leaves=False),
+        })
+
+    started = time.monotonic()
+    await asyncio.gather(*(run_job(*job) for job in matrix))
+    wall_time = time.monotonic() - started
+
+    ledger = get_usage_ledger()
+    summary = {
+        "models": models,
+        "max_in_flight": args.max_in_flight,
+        "provider_limits": parse_limits(args.provider_limits),
+        "wall_time": wall_time,
+        "peak_in_flight": limiter.peak_in_flight,
+        "slot_wait": limiter.slot_wait,
+        "rate_limit_wait": limiter.total_wait,
+        "rate_limit_hits": limiter.rate_limit_hits,
+        "jobs": sorted(job_results, key=lambda job: (job["repo_name"], job["reference"])),
+        # Leaf paths repeat across jobs, so per-leaf usage is only in each job's usage/<model>.json
+        "usage": ledger.summary(include_leaves=False),
+    }
+
+    summary_file = args.summary_file or config.get_data_path("benchmark_runs", f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(summary_file), exist_ok=True)
+    with open(summary_file, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    failed = [job for job in job_results if job["status"] != "done"]
+    print("=" * 100)
+    print("BENCHMARK SUMMARY:")
+    print(f"Jobs: {len(job_results)} ({len(failed)} failed)")
+    print(f"Wall time: {wall_time:.1f}s, peak requests in flight: {limiter.peak_in_flight}")
+    print(f"Time queued for in-flight slots: {limiter.slot_wait:.1f}s, for rate limits: {limiter.total_wait:.1f}s, summed over requests ({limiter.rate_limit_hits} 429s)")
+    print(f"Total cost: ${ledger.total_cost:.4f}")
+    print(f"Summary saved to: {summary_file}")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config.print_settings()
+    asyncio.run(closing_clients(run(args)))
@@ -0,0 +1,54 @@
+from .cache import CACHE_MODES, ResponseCache, configure_response_cache, get_response_cache
+from .clients import ClientRegistry, close_clients, closing_clients, get_client_registry, get_openai_client
+from .hedging import Hedger, configure_hedging, get_hedger, timed_call
+from .rate_limiter import (
+    RateLimiter,
+    call_with_rate_limit,
+    estimate_tokens,
+    get_rate_limiter,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
+from .routing import Endpoint, EndpointRouter, get_router, is_failover_error
+from .stats import percentile
+from .streaming import JSONValueDetector, StreamProfiler, StreamResult, get_stream_profiler, read_stream
+from .usage import Usage, UsageLedger, current_usage_ledger, get_usage_ledger, ledger_scope, record_usage, usage_scope
+
+__all__ = [
+    "CACHE_MODES",
+    "ResponseCache",
+    "configure_response_cache",
+    "get_response_cache",
+    "ClientRegistry",
+    "close_clients",
+    "closing_clients",
+    "get_client_registry",
+    "get_openai_client",
+    "Hedger",
+    "configure_hedging",
+    "get_hedger",
+    "timed_call",
+    "RateLimiter",
+    "call_with_rate_limit",
+    "estimate_tokens",
+    "get_rate_limiter",
+    "is_rate_limit_error",
+    "retry_after_seconds",
+    "Endpoint",
+    "EndpointRouter",
+    "get_router",
+    "is_failover_error",
+    "percentile",
+    "JSONValueDetector",
+    "StreamProfiler",
+    "StreamResult",
+    "get_stream_profiler",
+    "read_stream",
+    "Usage",
+    "UsageLedger",
+    "current_usage_ledger",
+    "get_usage_ledger",
+    "ledger_scope",
+    "record_usage",
+    "usage_scope",
+]
@@ -0,0 +1,59 @@
+from typing import Callable, Optional
+
+from pydantic_ai.models import Model
+from pydantic_ai.models.wrapper import WrapperModel
+
+from .hedging import get_hedger, timed_call
+from .rate_limiter import call_with_rate_limit, estimate_tokens, get_rate_limiter
+from .routing import Endpoint, get_router
+from .usage import record_usage
+
+
+class RateLimitedModel(WrapperModel):
+    """
+    Send every agent request, including each step of a tool loop, through the shared rate limiter.
+
+    Kept out of `llm/__init__` so that importing the call layer does not import pydantic_ai.
+    """
+
+    def __init__(
+        self,
+        wrapped: Model,
+        key: str,
+        resolve_alternate: Callable[[str], Model] = None,
+        resolve_endpoints: Callable[[str], Optional[Callable[[Endpoint], Model]]] = None,
+    ):
+        """
+        Args:
+            wrapped: Model that actually sends the requests
+            key: Model name the budgets and usage are kept under
+            resolve_alternate: Returns the model for another name, used when a hedged copy goes to an alternate model
+            resolve_endpoints: Returns how to build a model name on one endpoint of the router, or None
+                for models that are not routed; requests then go to `wrapped` directly
+        """
+        super().__init__(wrapped)
+        self.key = key
+        self.resolve_alternate = resolve_alternate
+        self.resolve_endpoints = resolve_endpoints
+
+    async def request(self, messages, *args, **kwargs):
+        import config
+        limiter = get_rate_limiter()
+        hedger = get_hedger()
+        tokens = estimate_tokens(*(getattr(part, "content", None) for message in messages for part in message.parts))
+
+        async def send(key, on_start):
+            # A hedged copy may go to an alternate model, which has its own budgets
+            wrapped = self.wrapped if key == self.key or self.resolve_alternate is None else self.resolve_alternate(key)
+            on_endpoint = self.resolve_endpoints(key) if self.resolve_endpoints is not None else None
+            if on_endpoint is None:
+                request = lambda: wrapped.request(messages, *args, **kwargs)
+            else:
+                request = lambda: get_router().call(key, lambda endpoint: on_endpoint(endpoint).request(messages, *args, **kwargs))
+            call = timed_call(hedger, key, request, on_start)
+            return key, await call_with_rate_limit(limiter, key, call, tokens=tokens, max_retries=config.LLM_MAX_RATE_LIMIT_RETRIES)
+
+        key, response = await hedger.run(self.key, send)
+        limiter.record_usage(key, tokens, response.usage.input_tokens + response.usage.output_tokens)
+        record_usage(key, response.usage.input_tokens, response.usage.output_tokens)
+        return response
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+CACHE_MODES = ("off", "read_write", "read_only")
+
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of LLM responses.
+
+    Entries live under `<cache_dir>/<key[:2]>/<key>.json`, where the key is a SHA-256 of the
+    model, system prompt, messages and transcript mode. Reads refresh the file's mtime so that
+    size-based eviction drops the least recently used entries first.
+    """
+
+    def __init__(self, cache_dir: str, mode: str = "read_write", max_bytes: int = 1_000_000_000):
+        """
+        Args:
+            cache_dir: Directory that holds the cache entries
+            mode: One of "off", "read_write" or "read_only"
+            max_bytes: Evict least recently used entries once the cache grows beyond this size
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Invalid cache mode: {mode} (expected one of {CACHE_MODES})")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Optional[str], messages: List[Dict[str, Any]], transcript_mode: str) -> str:
+        """Hash everything that determines the response into a stable cache key"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "system_prompt": system_prompt,
+                "messages": messages,
+                "transcript_mode": transcript_mode,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None on a miss"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        if self.mode == "read_write":
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        self.hits += 1
+        return entry["response"]
+
+    def put(self, key: str, response: str, metadata: Optional[Dict[str, Any]] = None):
+        """Store a response; a no-op in read-only or off mode"""
+        if self.mode != "read_write" or response is None:
+            return
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size_before = self._current_size()
+        entry = {"response": response, "metadata": metadata or {}, "created_at": time.time()}
+
+        # Write atomically so concurrent runs never read a half-written entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        self.writes += 1
+
+        self._size = size_before - previous_size + os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(os.path.getsize(path) for path, _ in self._entries())
+        return self._size
+
+    def _entries(self):
+        """Yield (path, mtime) for every entry in the cache directory"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".json"):
+                    path = os.path.join(shard_dir, name)
+                    try:
+                        yield path, os.path.getmtime(path)
+                    except OSError:
+                        continue
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under 90% of max_bytes"""
+        target = int(self.max_bytes * 0.9)
+        for path, _ in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self._size <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+_shared_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache configured from config.py"""
+    global _shared_cache
+    if _shared_cache is None:
+        import config
+        _shared_cache = ResponseCache(config.LLM_CACHE_DIR, config.LLM_CACHE_MODE, config.LLM_CACHE_MAX_BYTES)
+    return _shared_cache
+
+
+def configure_response_cache(mode: Optional[str] = None) -> ResponseCache:
+    """Override the cache mode for this process (e.g. from a CLI flag)"""
+    cache = get_response_cache()
+    if mode is not None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Invalid cache mode: {mode} (expected one of {CACHE_MODES})")
+        cache.mode = mode
+    return cache
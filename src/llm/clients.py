@@ -0,0 +1,125 @@
+import asyncio
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+ClientKey = Tuple[str, str, str]
+
+
+class ClientRegistry:
+    """
+    Long-lived HTTP clients shared by every LLM call in the process.
+
+    Building an `AsyncOpenAI` client per request throws away its connection pool, so each
+    call pays for a new TCP connection and TLS handshake. Clients are kept per
+    (base_url, api_key, provider) instead, each on its own `httpx.AsyncClient` whose pool
+    size, keep-alive and timeouts come from config. `close` shuts them all down; a client
+    that was closed, or that belongs to an earlier event loop, is simply rebuilt on next use.
+
+    httpx and openai are only imported once the first client is built, so CLIs that exit early
+    never pay for them.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 600.0,
+        connect_timeout: float = 10.0,
+    ):
+        import httpx
+        self.limits = httpx.Limits(
+            max_connections=max_connections or None,
+            max_keepalive_connections=max_keepalive_connections or None,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._http_clients: Dict[ClientKey, "httpx.AsyncClient"] = {}
+        self._openai_clients: Dict[ClientKey, "AsyncOpenAI"] = {}
+        self._loop = None
+        self.created = 0
+
+    def _check_loop(self):
+        """Drop clients created under another event loop; their connections cannot be reused"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is not self._loop:
+            self._http_clients.clear()
+            self._openai_clients.clear()
+            self._loop = loop
+
+    def http_client(self, base_url: str = "", api_key: str = "", provider: str = "openai") -> "httpx.AsyncClient":
+        """Pooled httpx client for one (base_url, api_key, provider)"""
+        import httpx
+        self._check_loop()
+        key = (base_url or "", api_key or "", provider)
+        client = self._http_clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._http_clients[key] = client
+            self._openai_clients.pop(key, None)
+            self.created += 1
+        return client
+
+    def openai_client(self, base_url: str, api_key: str, provider: str = "openai") -> "AsyncOpenAI":
+        """Pooled AsyncOpenAI client for an OpenAI-compatible endpoint"""
+        from openai import AsyncOpenAI
+        key = (base_url or "", api_key or "", provider)
+        http_client = self.http_client(*key)
+        client = self._openai_clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, timeout=self.timeout)
+            self._openai_clients[key] = client
+        return client
+
+    async def close(self):
+        """Close every pooled connection"""
+        clients = list(self._http_clients.values())
+        self._http_clients.clear()
+        self._openai_clients.clear()
+        for client in clients:
+            if not client.is_closed:
+                await client.aclose()
+
+
+_shared_registry: Optional[ClientRegistry] = None
+
+
+def get_client_registry() -> ClientRegistry:
+    """Return the process-wide client registry configured from config.py"""
+    global _shared_registry
+    if _shared_registry is None:
+        import config
+        _shared_registry = ClientRegistry(
+            config.LLM_HTTP_MAX_CONNECTIONS,
+            config.LLM_HTTP_MAX_KEEPALIVE,
+            config.LLM_HTTP_KEEPALIVE_EXPIRY,
+            config.LLM_HTTP_TIMEOUT,
+            config.LLM_HTTP_CONNECT_TIMEOUT,
+        )
+    return _shared_registry
+
+
+def get_openai_client(base_url: str = None, api_key: str = None, provider: str = "openai") -> "AsyncOpenAI":
+    """Shared AsyncOpenAI client, by default for the proxy configured in config.py"""
+    import config
+    return get_client_registry().openai_client(base_url or config.BASE_URL, api_key or config.API_KEY, provider)
+
+
+async def close_clients():
+    """Close the shared HTTP clients; call once when an entry point is done with the LLMs"""
+    if _shared_registry is not None:
+        await _shared_registry.close()
+
+
+async def closing_clients(awaitable):
+    """Await an entry point's main coroutine, then close the shared HTTP clients"""
+    try:
+        return await awaitable
+    finally:
+        await close_clients()
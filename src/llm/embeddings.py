@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends from concurrent processes are not serialised
+    fcntl = None
+
+from .clients import get_openai_client
+from .rate_limiter import call_with_rate_limit, estimate_tokens, get_rate_limiter, is_rate_limit_error
+from .routing import get_router
+from .usage import record_usage
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy is imported inside the methods, and this module is kept out of llm/__init__, so that
+# importing the call layer does not load numpy
+
+
+def text_key(text: str) -> str:
+    """Store key of one input text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Persistent vectors of one embedding model, memory-mapped from a compact float32 file.
+
+    `<directory>/vectors.f32` holds one row of `dim` float32 values per text, in append order, and
+    `<directory>/keys.tsv` maps each text's SHA-256 to its row. Rows are only ever appended (under a
+    file lock where available), so several processes can share the store and readers never see a
+    row before its key.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.tsv")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._matrix = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                self.dim = json.load(f)["dim"]
+        self._load_new_keys()
+
+    def _load_new_keys(self):
+        """Read keys appended since the last call (possibly by another process)"""
+        if not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            f.seek(self._keys_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # a concurrent writer is still appending this line
+                key, row = line.rstrip("\n").split("\t")
+                self.rows[key] = int(row)
+                self._keys_offset += len(line.encode("utf-8"))
+
+    def _mapped(self) -> "np.ndarray":
+        import numpy as np
+
+        needed = max(self.rows.values(), default=-1) + 1
+        if self._matrix is None or self._matrix.shape[0] < needed:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(needed, self.dim))
+        return self._matrix
+
+    def get(self, keys: List[str]) -> Dict[str, "np.ndarray"]:
+        """Stored vectors of whichever `keys` are known"""
+        if any(key not in self.rows for key in keys):
+            self._load_new_keys()
+        found = [key for key in keys if key in self.rows]
+        if not found:
+            return {}
+        matrix = self._mapped()
+        return {key: matrix[self.rows[key]] for key in found}
+
+    def append(self, keys: List[str], vectors: "np.ndarray"):
+        """Persist new vectors, one row per key"""
+        import numpy as np
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.dim = vectors.shape[1]
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension changed from {self.dim} to {vectors.shape[1]} for {self.directory}")
+
+        with open(self.vectors_path, "ab") as vectors_file, open(self.keys_path, "a", encoding="utf-8") as keys_file:
+            if fcntl is not None:
+                fcntl.flock(vectors_file, fcntl.LOCK_EX)
+            try:
+                first_row = os.fstat(vectors_file.fileno()).st_size // (4 * self.dim)
+                vectors_file.write(vectors.tobytes())
+                vectors_file.flush()
+                keys_file.write("".join(f"{key}\t{first_row + i}\n" for i, key in enumerate(keys)))
+                keys_file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(vectors_file, fcntl.LOCK_UN)
+        self._load_new_keys()
+
+
+class EmbeddingService:
+    """
+    Embed texts once: inputs are de-duplicated, looked up in the persistent store, and only the
+    missing ones are sent, split into `batch_size` chunks that run `max_concurrency` at a time.
+
+    Concurrent callers asking for the same text share one request. Rate limits go through the
+    shared limiter; other transient failures are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        store: Optional[EmbeddingStore] = None,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+    ):
+        self.model = model
+        self.store = store
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._memory: Dict[str, "np.ndarray"] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.requests = 0
+        self.embedded = 0
+        self.store_hits = 0
+        self.memory_hits = 0
+
+    async def _request(self, texts: List[str]) -> "np.ndarray":
+        import numpy as np
+        import config
+
+        async def call():
+            return await get_router().call(
+                self.model,
+                lambda endpoint: get_openai_client(endpoint.base_url, endpoint.api_key).embeddings.create(input=texts, model=self.model),
+            )
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await call_with_rate_limit(
+                    get_rate_limiter(),
+                    self.model,
+                    call,
+                    tokens=estimate_tokens(*texts),
+                    max_retries=config.LLM_MAX_RATE_LIMIT_RETRIES,
+                )
+                break
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                client_error = isinstance(status, int) and 400 <= status < 500
+                if attempt >= self.max_retries or client_error or is_rate_limit_error(e):
+                    raise
+                await asyncio.sleep(2 ** attempt)
+        self.requests += 1
+        usage = getattr(response, "usage", None)
+        record_usage(self.model, getattr(usage, "prompt_tokens", 0) or 0, 0)
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in data], dtype=np.float32)
+
+    async def _embed_chunk(self, keys: List[str], texts: List[str]):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._slots:
+                vectors = await self._request(texts)
+            if self.store is not None:
+                self.store.append(keys, vectors)
+            for key, vector in zip(keys, vectors):
+                self._memory[key] = vector
+                self._pending.pop(key).set_result(vector)
+            self.embedded += len(keys)
+        except BaseException as e:
+            for key in keys:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            raise
+
+    async def embed(self, texts: List[str]) -> "np.ndarray":
+        """Vectors of `texts` as a float32 matrix, one row per input (duplicates included)"""
+        import numpy as np
+
+        keys = [text_key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+
+        missing = [key for key in unique if key not in self._memory and key not in self._pending]
+        self.memory_hits += len(unique) - len(missing)
+        if missing and self.store is not None:
+            stored = self.store.get(missing)
+            self._memory.update(stored)
+            self.store_hits += len(stored)
+            missing = [key for key in missing if key not in stored]
+
+        loop = asyncio.get_running_loop()
+        for key in missing:
+            self._pending[key] = loop.create_future()
+        chunks = [missing[start:start + self.batch_size] for start in range(0, len(missing), self.batch_size)]
+        tasks = [asyncio.ensure_future(self._embed_chunk(chunk, [unique[key] for key in chunk])) for chunk in chunks]
+        if tasks:
+            await asyncio.gather(*tasks)
+        # Texts that another caller was already embedding
+        waiting = {key: self._pending[key] for key in unique if key not in self._memory and key in self._pending}
+        for key, future in waiting.items():
+            self._memory[key] = await future
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([self._memory[key] for key in keys])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "embedded": self.embedded,
+            "store_hits": self.store_hits,
+            "memory_hits": self.memory_hits,
+        }
+
+
+_services: Dict[str, EmbeddingService] = {}
+
+
+def get_embedding_service(model: Optional[str] = None) -> EmbeddingService:
+    """Return the process-wide embedding service of `model` (default: config.EMBEDDING_MODEL)"""
+    import config
+
+    model = model or config.EMBEDDING_MODEL
+    if model not in _services:
+        store = None
+        if config.LLM_EMBEDDING_CACHE:
+            store = EmbeddingStore(os.path.join(config.LLM_EMBEDDING_CACHE_DIR, model.replace("/", "_")))
+        _services[model] = EmbeddingService(
+            model,
+            store,
+            batch_size=config.LLM_EMBEDDING_BATCH_SIZE,
+            max_concurrency=config.LLM_EMBEDDING_CONCURRENCY,
+        )
+    return _services[model]
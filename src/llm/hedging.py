@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from .stats import percentile
+
+T = TypeVar("T")
+
+# A leg sends one copy of the request to `key`; it calls `on_start` (if given) once the request
+# has its rate-limit budget and in-flight slot, i.e. when it is actually on the wire
+Leg = Callable[[str, Optional[Callable[[], None]]], Awaitable[T]]
+
+
+class Hedger:
+    """
+    Duplicate requests that are slower than usual and keep whichever copy answers first.
+
+    Latencies are observed per key (model name). Once a key has `min_samples` of them, a request
+    still unanswered after the `percentile`-th observed latency (but at least `min_delay` seconds)
+    gets a second copy, sent to the key's alternate model when one is configured. At most
+    `max_fraction` of all calls are hedged, which caps the extra spend; 0 disables hedging.
+    """
+
+    def __init__(
+        self,
+        max_fraction: float = 0.0,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        min_delay: float = 2.0,
+        alternates: Optional[Dict[str, str]] = None,
+        window: int = 500,
+    ):
+        self.max_fraction = max_fraction
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.alternates = alternates or {}
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_fraction > 0
+
+    def observe(self, key: str, latency: float):
+        """Record how long one request to `key` took once it was sent"""
+        self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a request to `key`, or None while too few latencies are known"""
+        latencies = self._latencies.get(key)
+        if not latencies or len(latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(latencies, self.percentile))
+
+    def _within_budget(self) -> bool:
+        return self.hedged + 1 <= self.max_fraction * self.calls
+
+    async def run(self, key: str, leg: Leg) -> T:
+        """Send `leg(key)`, hedging it with a second leg if it is slow; returns the first successful answer"""
+        self.calls += 1
+        delay = self.delay(key) if self.enabled else None
+        if delay is None:
+            return await leg(key, None)
+
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(leg(key, sent.set))
+        hedge = None
+        try:
+            # The hedge timer starts when the primary is sent, not while it queues for a slot
+            sent_waiter = asyncio.ensure_future(sent.wait())
+            await asyncio.wait({primary, sent_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            sent_waiter.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or not self._within_budget():
+                return await primary
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(leg(self.alternates.get(key, key), None))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both copies failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedged_fraction": self.hedged / self.calls if self.calls else 0.0,
+        }
+
+
+def timed_call(hedger: Hedger, key: str, call: Callable[[], Awaitable[T]], on_start: Optional[Callable[[], None]] = None) -> Callable[[], Awaitable[T]]:
+    """Wrap one request so that it reports when it is sent and feeds its latency to the hedger"""
+    async def run_call():
+        if on_start is not None:
+            on_start()
+        started = time.monotonic()
+        result = await call()
+        hedger.observe(key, time.monotonic() - started)
+        return result
+    return run_call
+
+
+_shared_hedger: Optional[Hedger] = None
+
+
+def get_hedger() -> Hedger:
+    """Return the process-wide hedger configured from config.py"""
+    global _shared_hedger
+    if _shared_hedger is None:
+        import config
+        _shared_hedger = Hedger(
+            config.LLM_HEDGE_MAX_FRACTION,
+            config.LLM_HEDGE_PERCENTILE,
+            config.LLM_HEDGE_MIN_SAMPLES,
+            config.LLM_HEDGE_MIN_DELAY,
+            config.LLM_HEDGE_ALTERNATES,
+        )
+    return _shared_hedger
+
+
+def configure_hedging(max_fraction: Optional[float] = None, percentile: Optional[float] = None) -> Hedger:
+    """Override the hedging budget or trigger percentile for this process (e.g. from CLI flags)"""
+    hedger = get_hedger()
+    if max_fraction is not None:
+        if not 0 <= max_fraction <= 1:
+            raise ValueError(f"Invalid hedge fraction: {max_fraction} (expected 0 to 1)")
+        hedger.max_fraction = max_fraction
+    if percentile is not None:
+        if not 0 < percentile < 100:
+            raise ValueError(f"Invalid hedge percentile: {percentile} (expected between 0 and 100)")
+        hedger.percentile = percentile
+    return hedger
@@ -0,0 +1,271 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _TokenBucket:
+    """A per-minute budget that refills continuously"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be consumed (amounts above capacity wait for a full bucket)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Correct a previous estimate once the real amount is known (may go negative)"""
+        self.tokens -= delta
+
+
+@dataclass
+class _LimitState:
+    requests: Optional[_TokenBucket]
+    tokens: Optional[_TokenBucket]
+    blocked_until: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets shared by every LLM call in the process.
+
+    Budgets are kept per key (model name). Limits are resolved from the overrides by exact
+    model name first, then by provider prefix (`gemini` for `gemini/gemini-2.5-pro`), then
+    fall back to the defaults. A limit of 0 disables that budget. When a provider answers
+    with 429, `penalize` pauses every caller of that key until Retry-After has elapsed.
+
+    Concurrency is bounded too: at most `max_in_flight` requests run at once across all keys,
+    and an override with `in_flight` caps the requests in flight for that model or provider
+    (shared by every model of the provider when set on the prefix).
+    """
+
+    def __init__(
+        self,
+        default_rpm: int = 0,
+        default_tpm: int = 0,
+        overrides: Optional[Dict[str, Dict[str, int]]] = None,
+        max_in_flight: int = 0,
+    ):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.overrides = overrides or {}
+        self.max_in_flight = max_in_flight
+        self._states: Dict[str, _LimitState] = {}
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self.total_wait = 0.0
+        self.rate_limit_hits = 0
+        self.slot_wait = 0.0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def configure_in_flight(self, max_in_flight: Optional[int] = None, per_key: Optional[Dict[str, int]] = None):
+        """Set the global and per-model/provider in-flight limits (call before any request is made)"""
+        if max_in_flight is not None:
+            self.max_in_flight = max_in_flight
+            self._global_slots = None
+        for name, limit in (per_key or {}).items():
+            self.overrides.setdefault(name, {})["in_flight"] = limit
+            self._slots.pop(name, None)
+
+    def _limits_for(self, key: str) -> Dict[str, int]:
+        limits = {"rpm": self.default_rpm, "tpm": self.default_tpm}
+        provider = key.split("/", 1)[0] if "/" in key else None
+        for candidate in (provider, key):
+            if candidate and candidate in self.overrides:
+                limits.update(self.overrides[candidate])
+        return limits
+
+    def _state(self, key: str) -> _LimitState:
+        if key not in self._states:
+            limits = self._limits_for(key)
+            self._states[key] = _LimitState(
+                requests=_TokenBucket(limits["rpm"]) if limits.get("rpm") else None,
+                tokens=_TokenBucket(limits["tpm"]) if limits.get("tpm") else None,
+            )
+        return self._states[key]
+
+    async def acquire(self, key: str, tokens: int = 0) -> float:
+        """
+        Wait until one request with an estimated `tokens` fits the budgets of `key`.
+
+        Returns:
+            Seconds spent waiting
+        """
+        state = self._state(key)
+        waited = 0.0
+        async with state.lock:
+            while True:
+                now = time.monotonic()
+                wait = state.blocked_until - now
+                if state.requests is not None:
+                    wait = max(wait, state.requests.wait_time(1, now))
+                if state.tokens is not None:
+                    wait = max(wait, state.tokens.wait_time(tokens, now))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+                waited += wait
+            if state.requests is not None:
+                state.requests.consume(1)
+            if state.tokens is not None:
+                state.tokens.consume(tokens)
+        self.total_wait += waited
+        return waited
+
+    def _slot_owner(self, key: str) -> Optional[str]:
+        """The override whose in_flight limit applies to `key`: the exact model first, then its provider"""
+        provider = key.split("/", 1)[0] if "/" in key else None
+        for candidate in (key, provider):
+            if candidate and self.overrides.get(candidate, {}).get("in_flight"):
+                return candidate
+        return None
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        """Hold one in-flight request of `key` within the global and per-model/provider limits"""
+        semaphores = []
+        owner = self._slot_owner(key)
+        if owner is not None:
+            if owner not in self._slots:
+                self._slots[owner] = asyncio.Semaphore(self.overrides[owner]["in_flight"])
+            semaphores.append(self._slots[owner])
+        # The provider slot is taken before the global one, so a request queued behind a busy
+        # provider does not hold a global slot another provider could use
+        if self.max_in_flight:
+            if self._global_slots is None:
+                self._global_slots = asyncio.Semaphore(self.max_in_flight)
+            semaphores.append(self._global_slots)
+
+        started = time.monotonic()
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+            self.slot_wait += time.monotonic() - started
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
+
+    def record_usage(self, key: str, estimated_tokens: int, actual_tokens: int):
+        """Reconcile the token budget with the usage the provider actually reported"""
+        state = self._state(key)
+        if state.tokens is not None and actual_tokens:
+            state.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def penalize(self, key: str, retry_after: float):
+        """Block all callers of `key` for `retry_after` seconds"""
+        state = self._state(key)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+        self.rate_limit_hits += 1
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Recognise 429s from openai, litellm and pydantic_ai exceptions"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    if "ratelimit" in type(error).__name__.lower():
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract the Retry-After delay carried by a provider error, if any"""
+    headers = getattr(error, "headers", None)
+    response = getattr(error, "response", None)
+    if not headers and response is not None:
+        headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    headers = {str(k).lower(): v for k, v in dict(headers).items()}
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000.0
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        value = headers["retry-after"]
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def estimate_tokens(*texts: Any) -> int:
+    """Cheap token estimate (about 4 characters per token) used before the real usage is known"""
+    return sum(len(str(text)) for text in texts if text) // 4
+
+
+async def call_with_rate_limit(
+    limiter: RateLimiter,
+    key: str,
+    call: Callable[[], Awaitable[T]],
+    tokens: int = 0,
+    max_retries: int = 5,
+    default_backoff: float = 10.0,
+) -> T:
+    """
+    Run `call` inside the budgets and in-flight limits of `key`, retrying on 429 after the
+    provider's Retry-After.
+
+    The 429 pauses the whole key rather than only this caller, so concurrent requests stop
+    hitting the same limit while the provider recovers.
+    """
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(key, tokens)
+        try:
+            async with limiter.slot(key):
+                return await call()
+        except Exception as e:
+            if attempt >= max_retries or not is_rate_limit_error(e):
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = min(60.0, default_backoff * (2 ** attempt))
+            limiter.penalize(key, delay)
+    raise RuntimeError("unreachable")
+
+
+_shared_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter configured from config.py"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        import config
+        _shared_limiter = RateLimiter(config.LLM_RPM, config.LLM_TPM, config.LLM_RATE_LIMITS, config.LLM_MAX_IN_FLIGHT)
+    return _shared_limiter
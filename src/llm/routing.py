@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .rate_limiter import is_rate_limit_error, retry_after_seconds
+
+T = TypeVar("T")
+
+
+@dataclass
+class Endpoint:
+    """One OpenAI-compatible endpoint (proxy or provider) and its health"""
+    name: str
+    base_url: str
+    api_key: str
+    weight: float = 1.0
+    models: Optional[List[str]] = None       # model names or prefixes it serves; None serves every model
+    latency: Optional[float] = None          # EWMA of successful request latencies, in seconds
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejection_streak: int = 0                 # ejections since the last success; sets the next ejection's length
+    ejected_until: float = 0.0
+
+    def serves(self, model: str) -> bool:
+        return self.models is None or any(model == name or model.startswith(name.rstrip("/") + "/") for name in self.models)
+
+    def healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+def is_failover_error(error: Exception) -> bool:
+    """Errors worth retrying on another endpoint: 429s, server errors, timeouts and lost connections"""
+    if is_rate_limit_error(error):
+        return True
+    status = getattr(error, "status_code", None)
+    if not isinstance(status, int):
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status in (408, 409)
+    # No HTTP status at all: only lost connections and timeouts (openai, httpx, litellm or plain OSError)
+    name = type(error).__name__.lower()
+    return isinstance(error, (OSError, asyncio.TimeoutError)) or "connect" in name or "timeout" in name or "transport" in name
+
+
+class EndpointRouter:
+    """
+    Spread requests for a model over every endpoint that serves it, in proportion to their weights.
+
+    Each request goes to a healthy endpoint; if it fails with a 429, a server error or a lost
+    connection, it is retried once on each of the other healthy endpoints before the error is
+    raised. An endpoint that fails `eject_after` times in a row (or answers 429 with a Retry-After)
+    is ejected for `eject_seconds`, doubling with each consecutive ejection up to `max_eject_seconds`.
+    When every endpoint of a model is ejected, the one that comes back first is used anyway, so
+    requests are never stalled by the router itself.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        max_eject_seconds: float = 300.0,
+        latency_alpha: float = 0.2,
+        seed: Optional[int] = None,
+    ):
+        if not endpoints:
+            raise ValueError("EndpointRouter needs at least one endpoint")
+        self.endpoints = endpoints
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.latency_alpha = latency_alpha
+        self.failovers = 0
+        self._random = random.Random(seed)
+
+    def endpoints_for(self, model: str) -> List[Endpoint]:
+        """Endpoints that serve `model`, falling back to all of them when none declares it"""
+        serving = [endpoint for endpoint in self.endpoints if endpoint.serves(model)]
+        return serving or self.endpoints
+
+    def choose(self, model: str, exclude: Optional[List[Endpoint]] = None) -> Optional[Endpoint]:
+        """Pick the endpoint for the next request to `model`, or None when every candidate is excluded"""
+        exclude = exclude or []
+        candidates = [endpoint for endpoint in self.endpoints_for(model) if endpoint not in exclude]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        healthy = [endpoint for endpoint in candidates if endpoint.healthy(now)]
+        if not healthy:
+            return min(candidates, key=lambda endpoint: endpoint.ejected_until)
+        weights = [max(endpoint.weight, 0.0) for endpoint in healthy]
+        if not any(weights):
+            return self._random.choice(healthy)
+        return self._random.choices(healthy, weights=weights)[0]
+
+    def record_success(self, endpoint: Endpoint, latency: float):
+        endpoint.consecutive_failures = 0
+        endpoint.ejection_streak = 0
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency += self.latency_alpha * (latency - endpoint.latency)
+
+    def record_failure(self, endpoint: Endpoint, error: Exception):
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        retry_after = retry_after_seconds(error) if is_rate_limit_error(error) else None
+        if retry_after is not None or endpoint.consecutive_failures >= self.eject_after:
+            duration = min(self.max_eject_seconds, self.eject_seconds * (2 ** endpoint.ejection_streak))
+            if retry_after is not None:
+                duration = min(self.max_eject_seconds, retry_after)
+            endpoint.ejected_until = time.monotonic() + duration
+            endpoint.ejections += 1
+            endpoint.ejection_streak += 1
+            endpoint.consecutive_failures = 0
+
+    async def call(self, model: str, send: Callable[[Endpoint], Awaitable[T]]) -> T:
+        """Run `send(endpoint)` on a chosen endpoint, failing over to the others on transient errors"""
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+        while True:
+            endpoint = self.choose(model, tried)
+            if endpoint is None:
+                raise last_error
+            if tried:
+                self.failovers += 1
+            tried.append(endpoint)
+            endpoint.requests += 1
+            endpoint.in_flight += 1
+            started = time.monotonic()
+            try:
+                result = await send(endpoint)
+            except Exception as e:
+                if not is_failover_error(e):
+                    raise
+                self.record_failure(endpoint, e)
+                last_error = e
+                continue
+            finally:
+                endpoint.in_flight -= 1
+            self.record_success(endpoint, time.monotonic() - started)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "failovers": self.failovers,
+            "endpoints": {
+                endpoint.name: {
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                    "ejections": endpoint.ejections,
+                    "healthy": endpoint.healthy(now),
+                    "latency": endpoint.latency,
+                }
+                for endpoint in self.endpoints
+            },
+        }
+
+
+def endpoints_from_config(entries: List[Dict[str, Any]], base_url: str, api_key: str) -> List[Endpoint]:
+    """
+    Build endpoints from LLM_ENDPOINTS entries, e.g.
+    '[{"base_url": "http://proxy-a:4000/", "api_key_env": "PROXY_A_KEY", "weight": 2}, {"base_url": "http://proxy-b:4000/", "models": ["gemini"]}]'.
+
+    Without entries, BASE_URL/API_KEY form the only endpoint.
+    """
+    if not entries:
+        return [Endpoint("default", base_url, api_key)]
+    endpoints = []
+    for i, entry in enumerate(entries):
+        if "base_url" not in entry:
+            raise ValueError(f"LLM_ENDPOINTS entry {i} has no base_url: {entry}")
+        key = entry.get("api_key")
+        if key is None and entry.get("api_key_env"):
+            key = os.getenv(entry["api_key_env"])
+        endpoints.append(Endpoint(
+            name=entry.get("name") or entry["base_url"],
+            base_url=entry["base_url"],
+            api_key=key or api_key,
+            weight=float(entry.get("weight", 1.0)),
+            models=entry.get("models"),
+        ))
+    return endpoints
+
+
+_shared_router: Optional[EndpointRouter] = None
+
+
+def get_router() -> EndpointRouter:
+    """Return the process-wide endpoint router configured from config.py"""
+    global _shared_router
+    if _shared_router is None:
+        import config
+        _shared_router = EndpointRouter(
+            endpoints_from_config(config.LLM_ENDPOINTS, config.BASE_URL, config.API_KEY),
+            config.LLM_ENDPOINT_EJECT_AFTER,
+            config.LLM_ENDPOINT_EJECT_SECONDS,
+        )
+    return _shared_router
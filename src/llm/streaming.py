@@ -0,0 +1,164 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .stats import percentile
+
+
+class JSONValueDetector:
+    """
+    Find complete top-level JSON objects or arrays in text that arrives in pieces.
+
+    Brackets are counted outside of string literals only, so braces inside reasoning text do
+    not confuse it. Prose or code fences around the JSON are skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk of text; returns the JSON values completed by it"""
+        completed = []
+        offset = len(self.text)
+        self.text += chunk
+        for index, char in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._depth:
+                    self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._start = index
+                self._depth += 1
+            elif char in "}]" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(self.text[self._start:index + 1])
+        return completed
+
+
+@dataclass
+class StreamResult:
+    """What was read from one streamed completion"""
+    content: str
+    prompt_tokens: Optional[int] = None      # None when the stream was cut before the usage chunk
+    completion_tokens: Optional[int] = None
+    stopped_early: bool = False
+    time_to_first_token: Optional[float] = None
+    time_to_answer: Optional[float] = None   # until the accepted JSON value, or the end of the stream
+
+
+def _chunk_text(chunk: Any) -> str:
+    choices = getattr(chunk, "choices", None) or []
+    delta = getattr(choices[0], "delta", None) if choices else None
+    return getattr(delta, "content", None) or ""
+
+
+def _accepts(stop_when: Callable[[str], bool], value: str) -> bool:
+    """stop_when(value), treating a predicate error as "not complete yet" so it never fails the call"""
+    try:
+        return bool(stop_when(value))
+    except Exception:
+        return False
+
+
+async def read_stream(stream: Any, stop_when: Optional[Callable[[str], bool]] = None) -> StreamResult:
+    """
+    Read a streamed chat completion (openai or litellm) into a StreamResult.
+
+    With `stop_when`, every complete JSON value is offered to it as soon as its closing bracket
+    arrives; the first one it accepts becomes the content and the stream is closed, so the
+    model stops generating (and billing) whatever it would have written after it. A value that
+    makes `stop_when` raise counts as not accepted, and the stream is read on.
+    """
+    started = time.monotonic()
+    detector = JSONValueDetector() if stop_when else None
+    parts = []
+    result = StreamResult(content="")
+    try:
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:
+                result.prompt_tokens = getattr(usage, "prompt_tokens", None)
+                result.completion_tokens = getattr(usage, "completion_tokens", None)
+            text = _chunk_text(chunk)
+            if not text:
+                continue
+            if result.time_to_first_token is None:
+                result.time_to_first_token = time.monotonic() - started
+            parts.append(text)
+            if detector is not None:
+                accepted = next((value for value in detector.feed(text) if _accepts(stop_when, value)), None)
+                if accepted is not None:
+                    result.content = accepted
+                    result.stopped_early = True
+                    break
+    finally:
+        close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception:
+                pass
+    result.time_to_answer = time.monotonic() - started
+    if not result.stopped_early:
+        result.content = "".join(parts)
+    return result
+
+
+@dataclass
+class _ModelStreams:
+    first_token: List[float] = field(default_factory=list)
+    answer: List[float] = field(default_factory=list)
+    streams: int = 0
+    stopped_early: int = 0
+
+
+class StreamProfiler:
+    """Time-to-first-token and time-to-answer of every streamed completion, per model"""
+
+    def __init__(self):
+        self.by_model: Dict[str, _ModelStreams] = {}
+
+    def record(self, model: str, result: StreamResult):
+        streams = self.by_model.setdefault(model, _ModelStreams())
+        streams.streams += 1
+        streams.stopped_early += int(result.stopped_early)
+        if result.time_to_first_token is not None:
+            streams.first_token.append(result.time_to_first_token)
+        if result.time_to_answer is not None:
+            streams.answer.append(result.time_to_answer)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            model: {
+                "streams": streams.streams,
+                "stopped_early": streams.stopped_early,
+                "ttft_p50": percentile(streams.first_token, 50),
+                "ttft_p95": percentile(streams.first_token, 95),
+                "time_to_answer_p50": percentile(streams.answer, 50),
+                "time_to_answer_p95": percentile(streams.answer, 95),
+            }
+            for model, streams in self.by_model.items()
+        }
+
+
+_shared_profiler: Optional[StreamProfiler] = None
+
+
+def get_stream_profiler() -> StreamProfiler:
+    """Return the process-wide stream profiler"""
+    global _shared_profiler
+    if _shared_profiler is None:
+        _shared_profiler = StreamProfiler()
+    return _shared_profiler
@@ -0,0 +1,150 @@
+import contextvars
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_PRICES = {"default": {"input": 3.0, "output": 15.0}}  # USD per million tokens
+
+
+@dataclass
+class Usage:
+    """Token usage and cost accumulated over one or more LLM calls"""
+    requests: int = 0
+    cached_requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, input_tokens: int, output_tokens: int, cost: float, cached: bool = False):
+        self.requests += 1
+        self.cached_requests += int(cached)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost += cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Stage, leaf and active collectors of the current task; asyncio tasks inherit a copy
+_usage_context: contextvars.ContextVar[Tuple[Optional[str], Optional[str], Tuple[Usage, ...]]] = contextvars.ContextVar(
+    "usage_context", default=(None, None, ())
+)
+
+
+class UsageLedger:
+    """
+    Aggregate token usage per model, stage and leaf, priced against a per-million-token table.
+
+    Prices are looked up by exact model name, then by the name without its provider prefix
+    (`gpt-4.1` for `openai/gpt-4.1`), then under "default".
+    """
+
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None):
+        self.prices = {**DEFAULT_PRICES, **(prices or {})}
+        self.total = Usage()
+        self.by_model: Dict[str, Usage] = {}
+        self.by_stage: Dict[str, Usage] = {}
+        self.by_leaf: Dict[str, Usage] = {}
+
+    def price_for(self, model: str) -> Dict[str, float]:
+        for candidate in (model, model.split("/", 1)[-1], "default"):
+            if candidate in self.prices:
+                return self.prices[candidate]
+        return DEFAULT_PRICES["default"]
+
+    def cost_of(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        price = self.price_for(model)
+        return (input_tokens * price.get("input", 0.0) + output_tokens * price.get("output", 0.0)) / 1e6
+
+    def record(self, model: str, input_tokens: int, output_tokens: int, stage: Optional[str] = None, leaf: Optional[str] = None, cached: bool = False) -> float:
+        """Add one call to every aggregate it belongs to and return its cost"""
+        cost = 0.0 if cached else self.cost_of(model, input_tokens, output_tokens)
+        buckets = [self.total, self.by_model.setdefault(model, Usage())]
+        if stage:
+            buckets.append(self.by_stage.setdefault(stage, Usage()))
+        if leaf:
+            buckets.append(self.by_leaf.setdefault(leaf, Usage()))
+        for bucket in buckets:
+            bucket.add(input_tokens, output_tokens, cost, cached)
+        return cost
+
+    @property
+    def total_cost(self) -> float:
+        return self.total.cost
+
+    def summary(self, include_leaves: bool = True) -> Dict[str, Any]:
+        result = {
+            "prices_per_million_tokens": self.prices,
+            "total": self.total.to_dict(),
+            "by_model": {model: usage.to_dict() for model, usage in self.by_model.items()},
+            "by_stage": {stage: usage.to_dict() for stage, usage in self.by_stage.items()},
+        }
+        if include_leaves:
+            result["by_leaf"] = {leaf: usage.to_dict() for leaf, usage in self.by_leaf.items()}
+        return result
+
+
+_shared_ledger: Optional[UsageLedger] = None
+
+# Ledgers of the enclosing ledger_scope blocks, innermost last
+_scoped_ledgers: contextvars.ContextVar[Tuple[UsageLedger, ...]] = contextvars.ContextVar("scoped_ledgers", default=())
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide usage ledger priced from config.py"""
+    global _shared_ledger
+    if _shared_ledger is None:
+        import config
+        _shared_ledger = UsageLedger(config.LLM_PRICES)
+    return _shared_ledger
+
+
+def current_usage_ledger() -> UsageLedger:
+    """Ledger of the innermost ledger_scope, or the process-wide ledger outside of one"""
+    scoped = _scoped_ledgers.get()
+    return scoped[-1] if scoped else get_usage_ledger()
+
+
+@contextmanager
+def ledger_scope():
+    """
+    Give the block its own ledger, broken down by model, stage and leaf like the shared one.
+
+    Every call made inside the block (including in tasks it starts) is recorded there as well
+    as in the shared ledger and any enclosing scope, so concurrent jobs or judge models can
+    report and budget their own spend.
+    """
+    ledger = UsageLedger(get_usage_ledger().prices)
+    token = _scoped_ledgers.set(_scoped_ledgers.get() + (ledger,))
+    try:
+        yield ledger
+    finally:
+        _scoped_ledgers.reset(token)
+
+
+@contextmanager
+def usage_scope(stage: Optional[str] = None, leaf: Optional[str] = None):
+    """
+    Attribute LLM calls made inside the block to a stage and/or leaf.
+
+    Yields a Usage that collects only the calls made within this block (nested scopes
+    collect into every enclosing scope too).
+    """
+    parent_stage, parent_leaf, collectors = _usage_context.get()
+    usage = Usage()
+    token = _usage_context.set((stage or parent_stage, leaf or parent_leaf, collectors + (usage,)))
+    try:
+        yield usage
+    finally:
+        _usage_context.reset(token)
+
+
+def record_usage(model: str, input_tokens: int, output_tokens: int, cached: bool = False):
+    """Record one LLM call in the shared ledger, in every enclosing ledger_scope and in every active usage_scope"""
+    stage, leaf, collectors = _usage_context.get()
+    cost = get_usage_ledger().record(model, input_tokens, output_tokens, stage, leaf, cached)
+    for ledger in _scoped_ledgers.get():
+        ledger.record(model, input_tokens, output_tokens, stage, leaf, cached)
+    for usage in collectors:
+        usage.add(input_tokens, output_tokens, cost, cached)
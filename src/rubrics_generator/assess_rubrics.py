@@ -4,11 +4,13 @@ import asyncio
 import argparse
 from typing import List, Dict
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from collections import Counter
 
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
-from utils import get_embeddings
+from utils import embed_texts
+from llm import closing_clients
 
 
 class RubricReliabilityAssessor:
@@ -51,6 +53,12 @@ class RubricReliabilityAssessor:
         if len(individual_rubrics) < 2:
             return {"error": "Need at least 2 individual rubrics files for consistency analysis"}
         
+        # Embed every requirement of every model once up front; the pairwise comparisons below
+        # then read the vectors from the embedding service instead of re-sending them per pair
+        all_requirements = {text for _, rubrics in individual_rubrics for text in self._extract_all_requirements(rubrics)}
+        if all_requirements:
+            await embed_texts(sorted(all_requirements))
+
         # Calculate pairwise similarities
         similarities = []
         structural_similarities = []
@@ -93,29 +101,19 @@ class RubricReliabilityAssessor:
         if texts1 == texts2:
             return 1.0
         
-        # Get embeddings
-        all_texts = texts1 + texts2
-        embeddings = await get_embeddings(all_texts)
-        
-        # Split embeddings
-        emb1 = embeddings[:len(texts1)]
-        emb2 = embeddings[len(texts1):]
-        
-        # Best matching pairs (Hungarian-like approach)
-        # For each embedding in emb1, find best match in emb2
-        max_similarities = []
-        for e1 in emb1:
-            best_sim = max(cosine_similarity([e1], [e2])[0][0] for e2 in emb2)
-            max_similarities.append(best_sim)
-        
-        # For each embedding in emb2, find best match in emb1  
-        for e2 in emb2:
-            best_sim = max(cosine_similarity([e1], [e2])[0][0] for e1 in emb1)
-            max_similarities.append(best_sim)
-        
+        emb1 = await embed_texts(texts1)
+        emb2 = await embed_texts(texts2)
+        emb1 = emb1 / np.maximum(np.linalg.norm(emb1, axis=1, keepdims=True), 1e-12)
+        emb2 = emb2 / np.maximum(np.linalg.norm(emb2, axis=1, keepdims=True), 1e-12)
+
+        # Best matching pairs (Hungarian-like approach): cosine similarity of every pair at once,
+        # then the best match of each requirement in emb1 (row max) and in emb2 (column max)
+        cosine = emb1 @ emb2.T
+        max_similarities = np.concatenate([cosine.max(axis=1), cosine.max(axis=0)])
+
         # Average the best matches
-        best_match_similarity = np.mean(max_similarities)
-        
+        best_match_similarity = float(np.mean(max_similarities))
+
         return best_match_similarity
     
     def _calculate_structural_similarity(self, rubrics1: List[Dict], rubrics2: List[Dict]) -> float:
@@ -243,6 +241,7 @@ def parse_args():
 
 async def main():
     args = parse_args()
+    config.print_settings()
     
     assessor = RubricReliabilityAssessor(args.repo_name)
     
@@ -304,4 +303,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(closing_clients(main()))
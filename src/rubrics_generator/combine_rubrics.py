@@ -12,6 +12,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
 from utils import run_llm_natively
+from llm import closing_clients
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Combine rubrics generated from multiple LLMs using semantic analysis")
@@ -234,6 +235,7 @@ def calculate_rubrics_statistics(rubrics: List[Dict]) -> Dict:
 
 async def main():
     args = parse_args()
+    config.print_settings()
 
     # Save combined results
     base_path = config.get_data_path(args.repo_name, "rubrics")
@@ -306,4 +308,4 @@ async def main():
     print("-" * 100)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(closing_clients(main()))
\ No newline at end of file
@@ -4,14 +4,11 @@ import argparse
 import os
 from pathlib import Path
 
-from pydantic_ai import Agent
-
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils import get_llm, run_llm_natively
+from utils import get_llm, run_agent
+from llm import closing_clients
 import config
-from tools import AgentDeps, docs_navigator_tool
-from rubrics_generator.visualize_rubrics import visualize_rubrics
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Generate hierarchical rubrics from documentation")
@@ -181,6 +178,11 @@ async def run(args):
     if os.path.exists(os.path.join(output_dir, f"{sanitized_model}.json")):
         print(f"Rubrics already generated for {args.model}")
         return
+
+    # Imported only once there is work to do, as they take a while to load
+    from pydantic_ai import Agent
+    from tools import AgentDeps, docs_navigator_tool
+    from rubrics_generator.visualize_rubrics import visualize_rubrics
     
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -214,8 +216,14 @@ Given the docs tree:
 
     deps = AgentDeps(docs_path)
 
-    final_output = await agent.run(prompt, deps=deps)
-    final_output = final_output.output
+    final_output = await run_agent(
+        agent,
+        prompt,
+        deps,
+        model=args.model,
+        system_prompt=system_prompt,
+        transcript_mode="tools" if args.use_tools else "no_tools",
+    )
     
     # Parse and save rubrics
     try:
@@ -253,6 +261,7 @@ Given the docs tree:
 
 if __name__ == "__main__":
     args = parse_args()
-    asyncio.run(run(args))
+    config.print_settings()
+    asyncio.run(closing_clients(run(args)))
 
 
@@ -1,3 +1,3 @@
-from .docs_navigator import AgentDeps, docs_navigator_tool
+from .docs_navigator import AgentDeps, docs_navigator_tool, format_docs_sections
 
-__all__ = ["AgentDeps", "docs_navigator_tool"]
\ No newline at end of file
+__all__ = ["AgentDeps", "docs_navigator_tool", "format_docs_sections"]
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from pydantic_ai import RunContext, Tool
 
 from utils import truncate_tokens
+from evaluation import charge_docs_lookup, record_docs_fetch
 
 
 class DocsNavigator:
@@ -266,9 +267,18 @@ async def run_docs_navigator(ctx: RunContext[AgentDeps], paths: List[List[Any]])
         paths: List of lists of keys/indices to navigate to the desired content (e.g., [['subpages', 2, 'subpages', 0, 'content', 'Getting Started'], ['subpages', 2, 'subpages', 1, 'content', 'Getting Started']]). Each list is a path to a specific content node in the documentation tree.
     """
 
+    # Raises AgentBudgetExceeded once the leaf's budget is spent, which ends the agent run
+    note = charge_docs_lookup(paths)
+    for path in paths:
+        record_docs_fetch(path)
+    return format_docs_sections(ctx.deps.docs_navigator, paths) + (note or "")
+
+
+def format_docs_sections(docs_navigator: DocsNavigator, paths: List[List[Any]]) -> str:
+    """Content of the docs sections at `paths`, as the docs_navigator tool returns it"""
     formatted_results = ""
     for path in paths:
-        result = ctx.deps.docs_navigator.get_content(path)
+        result = docs_navigator.get_content(path)
         formatted_results += "--------------------------------\n"
         formatted_results += f"Path: {path}\n"
         formatted_results += f"Content: \n{json.dumps(result['content'], indent=2)}\n"
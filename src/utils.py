@@ -1,18 +1,23 @@
 import asyncio
-from openai import AsyncOpenAI
-from pydantic_ai_litellm import LiteLLMModel
-import tiktoken
 import os
-from litellm import completion
+from functools import lru_cache
 
 import config
+from llm import call_with_rate_limit, estimate_tokens, get_hedger, get_openai_client, get_rate_limiter, get_router, get_response_cache, get_stream_profiler, read_stream, record_usage, timed_call
 
-enc = tiktoken.encoding_for_model("gpt-4")
+# The tokenizer and the LLM SDKs (tiktoken, litellm, pydantic_ai) are imported on first use,
+# so that CLIs answering --help or exiting early start without loading them
+
+@lru_cache(maxsize=None)
+def _get_encoder():
+    import tiktoken
+    return tiktoken.encoding_for_model("gpt-4")
 
 def truncate_tokens(text: str) -> str:
     """
     Count the number of tokens in a text.
     """
+    enc = _get_encoder()
     tokens = enc.encode(text)
 
     # count tokens
@@ -25,8 +30,38 @@ def truncate_tokens(text: str) -> str:
 
     return text
 
-def get_llm(model: str = None) -> LiteLLMModel:
-    """Initialize and return the specified LLM using LiteLLM"""
+# Models are stateless wrappers around LiteLLM, which keeps its own pooled provider clients
+_llm_instances = {}
+
+def get_llm(model: str = None) -> "RateLimitedModel":
+    """Return the specified LLM using LiteLLM, wrapped in the shared rate limiter (built once per model)"""
+    from llm.agent_model import RateLimitedModel
+
+    model = model or config.MODEL
+    if model not in _llm_instances:
+        _llm_instances[model] = RateLimitedModel(_build_litellm_model(model), model, lambda key: get_llm(key).wrapped, _endpoint_models)
+    return _llm_instances[model]
+
+# Prefixes of providers reached directly with their own keys; every other model goes through the
+# configured endpoints (BASE_URL or LLM_ENDPOINTS) and can be routed between them
+_DIRECT_PROVIDER_PREFIXES = ("iflow/", "github_copilot/", "gemini/")
+_endpoint_instances = {}
+
+def _endpoint_models(model: str):
+    """Build `model` for a given endpoint of the router, or None for providers reached directly"""
+    if model.startswith(_DIRECT_PROVIDER_PREFIXES):
+        return None
+
+    def for_endpoint(endpoint):
+        key = (model, endpoint.name)
+        if key not in _endpoint_instances:
+            _endpoint_instances[key] = _build_litellm_model(model, endpoint)
+        return _endpoint_instances[key]
+    return for_endpoint
+
+def _build_litellm_model(model: str = None, endpoint=None) -> "LiteLLMModel":
+    """Initialize and return the specified LLM using LiteLLM (on `endpoint` instead of BASE_URL if given)"""
+    from pydantic_ai_litellm import LiteLLMModel
 
     model_name = model or config.MODEL
     
@@ -68,38 +103,154 @@ def get_llm(model: str = None) -> LiteLLMModel:
 
     model = LiteLLMModel(
         model_name=model_name,
-        api_key=config.API_KEY,
-        base_url=config.BASE_URL
+        api_key=endpoint.api_key if endpoint else config.API_KEY,
+        api_base=endpoint.base_url if endpoint else config.BASE_URL,
+        custom_llm_provider="openai"
     )
     return model
     
-async def run_llm_natively(model: str = None, prompt: str = None, messages: list[dict] = None) -> str:
+# Models that rejected `response_format`; they are asked again without it and then skipped
+_MODELS_WITHOUT_JSON_MODE = set()
+
+async def run_llm_natively(model: str = None, prompt: str = None, messages: list[dict] = None, response_format: dict = None, stream: bool = None, stop_when=None) -> str:
+    """
+    Send a chat completion directly (no agent) through the cache, rate limiter and hedger.
+
+    With `stream` (default: config.LLM_STREAM) the answer is streamed; `stop_when` is then offered
+    each complete JSON value as it arrives, and the first one it accepts is returned right away,
+    cancelling the rest of the generation.
+    """
     model=model or config.MODEL
+    stream = config.LLM_STREAM if stream is None else stream
+    if not config.LLM_JSON_MODE or model in _MODELS_WITHOUT_JSON_MODE:
+        response_format = None
     if messages is None:
         messages = [{"role": "user", "content": prompt}]
 
-    if model.startswith("github_copilot/"):
-        response = completion(
-            model=model,
-            messages=messages,
-            extra_headers={
-                "editor-version": "vscode/1.90.0",
-                "Copilot-Integration-Id": "vscode-chat"
-            }
-        )        
-        return response.choices[0].message.content
+    cache = get_response_cache()
+    if cache.enabled:
+        system_prompt = "\n".join(m["content"] for m in messages if m.get("role") == "system") or None
+        cache_key = cache.make_key(model, system_prompt, [m for m in messages if m.get("role") != "system"], "native_json" if response_format else "native")
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_usage(model, 0, 0, cached=True)
+            return cached
 
-    client = AsyncOpenAI(
-        base_url=config.BASE_URL,
-        api_key=config.API_KEY,
-    )
+    limiter = get_rate_limiter()
+    tokens = estimate_tokens(*(message.get("content") for message in messages))
 
-    response = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-    )
+    # Only send response_format when asked, so providers without JSON mode see the same request as before
+    format_kwargs = {"response_format": response_format} if response_format else {}
+    stream_kwargs = {"stream": True, "stream_options": {"include_usage": True}} if stream else {}
+
+    def request_for(leg_model):
+        if leg_model.startswith("github_copilot/"):
+            from litellm import acompletion
+
+            # litellm's async API, so Copilot calls run concurrently instead of blocking the event loop
+            async def call():
+                return await acompletion(
+                    model=leg_model,
+                    messages=messages,
+                    **format_kwargs,
+                    **stream_kwargs,
+                    extra_headers={
+                        "editor-version": "vscode/1.90.0",
+                        "Copilot-Integration-Id": "vscode-chat"
+                    }
+                )
+        else:
+            # Spread over the configured endpoints, failing over when one is down or out of quota
+            async def call():
+                return await get_router().call(leg_model, lambda endpoint: get_openai_client(endpoint.base_url, endpoint.api_key).chat.completions.create(
+                    model=leg_model,
+                    messages=messages,
+                    **format_kwargs,
+                    **stream_kwargs,
+                ))
 
-    return response.choices[0].message.content
+        if not stream:
+            return call
+
+        async def call_streaming():
+            result = await read_stream(await call(), stop_when)
+            get_stream_profiler().record(leg_model, result)
+            return result
+        return call_streaming
+
+    # Slow requests may be hedged with a second copy (possibly to an alternate model); see llm/hedging.py
+    hedger = get_hedger()
+
+    async def send(leg_model, on_start):
+        call = timed_call(hedger, leg_model, request_for(leg_model), on_start)
+        return leg_model, await call_with_rate_limit(limiter, leg_model, call, tokens=tokens, max_retries=config.LLM_MAX_RATE_LIMIT_RETRIES)
+
+    try:
+        answered_by, response = await hedger.run(model, send)
+    except Exception as e:
+        if not response_format or "response_format" not in str(e):
+            raise
+        print(f"{model} does not support response_format, falling back to plain completions: {e}")
+        _MODELS_WITHOUT_JSON_MODE.add(model)
+        format_kwargs.clear()
+        answered_by, response = await hedger.run(model, send)
+    if stream:
+        content = response.content
+        # A stream cut short never receives its usage chunk, so its tokens are estimated
+        prompt_tokens = response.prompt_tokens if response.prompt_tokens is not None else tokens
+        completion_tokens = response.completion_tokens if response.completion_tokens is not None else estimate_tokens(content)
+        limiter.record_usage(answered_by, tokens, prompt_tokens + completion_tokens)
+        record_usage(answered_by, prompt_tokens, completion_tokens)
+    else:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            limiter.record_usage(answered_by, tokens, getattr(usage, "total_tokens", 0) or 0)
+            record_usage(answered_by, getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0)
+        content = response.choices[0].message.content
+    if cache.enabled:
+        cache.put(cache_key, content, {"model": model})
+    return content
+
+def agent_system_prompt(agent, default: str = None) -> str:
+    """Static system prompt a pydantic_ai agent sends with every run, or `default` when it has none"""
+    prompts = getattr(agent, "_system_prompts", None)
+    return "\n\n".join(prompts) if prompts else default
+
+async def run_agent(agent, prompt: str, deps=None, model: str = None, system_prompt: str = None, transcript_mode: str = "tools", **run_kwargs) -> str:
+    """
+    Run a pydantic_ai agent and return its output, going through the persistent response cache.
+    With a structured `output_type` in run_kwargs, the validated output is returned serialized as JSON.
+
+    `transcript_mode` distinguishes agent runs that may call tools from plain ones, since the
+    same prompt can produce different answers depending on what the agent was allowed to read.
+    The agent sends the system prompt it was built with; `system_prompt` only keys the cache when it has none.
+    """
+    model = model or config.MODEL
+    # Key the cache on the system prompt the agent actually sends, which is fixed when the agent is built
+    system_prompt = agent_system_prompt(agent, system_prompt)
+    output_type = run_kwargs.get("output_type")
+    if output_type is not None:
+        # Structured runs answer in a different shape, so they never share cache entries with text runs
+        transcript_mode = f"{transcript_mode}:{getattr(output_type, '__name__', repr(output_type))}"
+    cache = get_response_cache()
+    if cache.enabled:
+        cache_key = cache.make_key(model, system_prompt, [{"role": "user", "content": prompt}], transcript_mode)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_usage(model, 0, 0, cached=True)
+            return cached
+
+    result = await agent.run(prompt, deps=deps, **run_kwargs)
+    output = result.output
+    if not isinstance(output, str):
+        from pydantic_core import to_json
+
+        # Structured output is returned as JSON text so cached and fresh runs look the same to callers
+        output = to_json(output).decode()
+
+    if cache.enabled:
+        cache.put(cache_key, output, {"model": model, "transcript_mode": transcript_mode})
+    return output
 
 if __name__ == "__main__":
     result = asyncio.run(run_llm_natively(model="gpt-oss-120b", messages=[{"role": "system", "content": "You are a helpful assistant."}, {"role": "user", "content": "Hello, world!"}]))
@@ -109,17 +260,11 @@ if __name__ == "__main__":
 # Embeddings
 # ------------------------------------------------------------
 
-async def get_embeddings(texts: list[str]) -> list[list[float]]:
-    client = AsyncOpenAI(
-        base_url=config.BASE_URL,
-        api_key=config.API_KEY,
-    )
-    response = await client.embeddings.create(
-        input=texts,
-        model=config.EMBEDDING_MODEL,
-    )
-
-    return [embedding.embedding for embedding in response.data]
-
+async def embed_texts(texts: list[str]) -> "np.ndarray":
+    """Embed `texts` as a float32 matrix (one row each) through the chunked, cached service in llm/embeddings.py"""
+    from llm.embeddings import get_embedding_service
 
+    return await get_embedding_service(config.EMBEDDING_MODEL).embed(texts)
 
+async def get_embeddings(texts: list[str]) -> list[list[float]]:
+    return (await embed_texts(texts)).tolist()